@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+冷启动耗时基准测试
+
+在新的解释器进程中分别运行 import convert_core、--version、--help，以及纯文本题库的 --dry-run 和转换，
+对比按需导入（当前实现）与启动时就导入 openpyxl、lxml、olefile 和进程池（旧版行为，
+在子进程中预先导入这些库来模拟）的耗时，并列出各场景实际加载了哪些格式库。
+
+使用方法：
+    python3 benchmarks/bench_import.py
+    python3 benchmarks/bench_import.py --repeat 30
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+TIKU_DIR = os.path.dirname(BENCH_DIR)
+SCRIPT = os.path.join(TIKU_DIR, 'convert_all_questions_motibang.py')
+
+# 旧版在模块导入时加载的格式库
+EAGER_IMPORTS = 'import openpyxl, openpyxl.cell, openpyxl.styles, lxml.etree, olefile, concurrent.futures'
+FORMAT_MODULES = ('openpyxl', 'lxml', 'olefile', 'concurrent.futures')
+
+# 子进程执行的代码：运行场景，结束后把已加载的格式库写到标准错误的最后一行
+_CHILD = '''
+import sys, runpy
+{preload}
+sys.path.insert(0, {tiku!r})
+try:
+    if {argv!r} is None:
+        import convert_core
+    else:
+        sys.argv = {argv!r}
+        runpy.run_path({script!r}, run_name='__main__')
+except SystemExit:
+    pass
+sys.stdout.flush()
+sys.stderr.write('\\n' + ','.join(m for m in {modules!r} if m in sys.modules) + '\\n')
+'''
+
+
+def run_child(argv, eager):
+    """在新进程中运行一个场景，返回 (耗时秒数, 已加载的格式库列表)"""
+    code = _CHILD.format(preload=EAGER_IMPORTS if eager else '', tiku=TIKU_DIR, argv=argv,
+                         script=SCRIPT, modules=FORMAT_MODULES)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', code], stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, text=True, encoding='utf-8', check=True)
+    elapsed = time.perf_counter() - start
+    loaded = result.stderr.rstrip('\n').rsplit('\n', 1)[-1]
+    return elapsed, [m for m in loaded.split(',') if m]
+
+
+def measure(argv, eager, repeat):
+    """返回 (耗时中位数, 最佳耗时, 已加载的格式库)"""
+    times = []
+    loaded = []
+    for _ in range(repeat):
+        elapsed, loaded = run_child(argv, eager)
+        times.append(elapsed)
+    return statistics.median(times), min(times), loaded
+
+
+def make_text_corpus(path):
+    """写一个小的纯文本题库"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(1, 51):
+            f.write(f'{i}、列车制动系统检查的第{i}项内容是（A）。\nA、闸瓦 B、轴承 C、车钩 D、转向架\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='冷启动耗时基准测试')
+    parser.add_argument('--repeat', type=int, default=15, help='每项运行次数，取中位数（默认15）')
+    parser.add_argument('-o', '--output', help='把结果另存为 JSON')
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error('运行次数至少为1')
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        text_path = os.path.join(work_dir, '文本题库.txt')
+        make_text_corpus(text_path)
+        scenarios = [
+            ('import convert_core', None),
+            ('--version', [SCRIPT, '--version']),
+            ('--help', [SCRIPT, '--help']),
+            ('txt --dry-run', [SCRIPT, '--dry-run', '--no-cache', text_path]),
+            ('txt 转换', [SCRIPT, '--no-cache', '-o', work_dir, text_path]),
+        ]
+
+        results = {}
+        print(f'Python {sys.version.split()[0]}，每项 {args.repeat} 次取中位数（秒）')
+        print(f'{"场景":<18}{"按需导入":>10}{"启动时导入":>12}{"节省":>9}  按需导入时加载的格式库')
+        for name, argv in scenarios:
+            lazy, lazy_best, loaded = measure(argv, False, args.repeat)
+            eager, eager_best, _ = measure(argv, True, args.repeat)
+            results[name] = {
+                'lazy': round(lazy, 4), 'lazy_best': round(lazy_best, 4),
+                'eager': round(eager, 4), 'eager_best': round(eager_best, 4),
+                'loaded': loaded,
+            }
+            print(f'{name:<20}{lazy:>10.3f}{eager:>12.3f}{eager - lazy:>+9.3f}  {", ".join(loaded) or "无"}')
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f'\n结果已保存到: {args.output}')
+
+
+if __name__ == '__main__':
+    main()
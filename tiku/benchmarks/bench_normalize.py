@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+normalize_text 吞吐量基准测试
+
+在多MB文本上对比逐字符实现（旧版）与查表实现的吞吐量，并校验两者输出完全一致。
+分别测量需要转换的原始文本和已经规范化的文本（幂等路径）。
+
+使用方法：
+    python3 benchmarks/bench_normalize.py
+    python3 benchmarks/bench_normalize.py --size-mb 16 --repeat 5
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from convert_core import normalize_text  # noqa: E402
+
+
+def normalize_text_reference(text):
+    """旧版逐字符实现，作为正确性与性能对照"""
+    if not text:
+        return ''
+
+    result = []
+    for char in text:
+        code = ord(char)
+        if 0xFF21 <= code <= 0xFF3A:
+            result.append(chr(code - 0xFF21 + ord('A')))
+        elif 0xFF41 <= code <= 0xFF5A:
+            result.append(chr(code - 0xFF41 + ord('a')))
+        elif 0xFF10 <= code <= 0xFF19:
+            result.append(chr(code - 0xFF10 + ord('0')))
+        elif code == 0x3000:
+            result.append(' ')
+        elif char == '．':
+            result.append('.')
+        elif char == '，':
+            result.append(',')
+        elif char == '：':
+            result.append(':')
+        elif char == '；':
+            result.append(';')
+        elif char == '（':
+            result.append('(')
+        elif char == '）':
+            result.append(')')
+        else:
+            result.append(char)
+    return ''.join(result)
+
+
+def make_corpus(size_mb, seed=20240101):
+    """生成约 size_mb 兆字节（UTF-8）的题库风格文本，混合中文、全角字母数字和全角标点"""
+    rng = random.Random(seed)
+    hanzi = '车辆检修工列车制动轴承转向架电气系统安全规程维护检查故障处理标准作业流程'
+    fullwidth = 'ＡＢＣＤａｂｃｄ０１２３４５６７８９．，：；（）　'
+    ascii_chars = 'ABCDabcd0123456789.,:;() '
+    pool = hanzi * 6 + fullwidth + ascii_chars + '\n'
+    target = size_mb * 1024 * 1024 // 3  # 中文在 UTF-8 中约占3字节
+    return ''.join(rng.choice(pool) for _ in range(target))
+
+
+def measure(func, text, repeat):
+    """返回 (最佳耗时秒数, 输出结果)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='normalize_text 吞吐量基准测试')
+    parser.add_argument('--size-mb', type=int, default=8, help='输入文本大小（MB，默认8）')
+    parser.add_argument('--repeat', type=int, default=3, help='每项重复次数，取最佳（默认3）')
+    args = parser.parse_args()
+
+    text = make_corpus(args.size_mb)
+    size_mb = len(text.encode('utf-8')) / (1024 * 1024)
+    print(f'输入: {len(text)} 字符 / {size_mb:.1f} MB')
+
+    ref_time, ref_result = measure(normalize_text_reference, text, args.repeat)
+    new_time, new_result = measure(normalize_text, text, args.repeat)
+    if ref_result != new_result:
+        print('✗ 输出不一致！')
+        sys.exit(1)
+
+    normalized = new_result
+    idem_time, idem_result = measure(normalize_text, normalized, args.repeat)
+    if idem_result != normalized:
+        print('✗ 幂等性校验失败！')
+        sys.exit(1)
+
+    print(f'{"实现":<16}{"耗时(s)":>10}{"吞吐(MB/s)":>14}')
+    print(f'{"逐字符(旧版)":<14}{ref_time:>10.3f}{size_mb / ref_time:>14.1f}')
+    print(f'{"查表":<16}{new_time:>10.3f}{size_mb / new_time:>14.1f}')
+    print(f'{"查表(已规范化)":<13}{idem_time:>10.3f}{size_mb / idem_time:>14.1f}')
+    print(f'加速比: {ref_time / new_time:.1f}x，输出一致')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,664 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成题库生成工具
+
+按固定随机种子生成任意规模的题库文件，覆盖转换脚本支持的全部输入版式，
+用于基准测试和大文件回归验证。题型比例、全角字符噪声、答案写法和重复题比例均可配置，
+相同参数多次生成的题目内容完全一致（docx / txt / doc 逐字节一致）。
+
+支持的版式：
+- mid:     车辆检修工练习题-中级.xlsx（单工作表，选项A-L各占一列）
+- summary: 车辆题库汇总2024.xlsx（按题型分工作表，前两行为标题和表头）
+- xlsx:    通用练习.xlsx（表头之后每行一题，题目文本在同一个单元格中）
+- crh6:    CRH6竞赛题库.docx（选择/填空、判断、简答三个单列表格）
+- docx:    通用题库.docx（每行一个段落，按题号分题）
+- txt:     文本题库.txt（带题号的纯文本）
+- doc:     题库.doc（Word 97-2003 二进制文档，选择、判断、填空、简答四个区块）
+
+使用方法：
+    python3 benchmarks/make_corpus.py -o corpus
+    python3 benchmarks/make_corpus.py -o corpus -n 200000 --layouts txt,docx --seed 7
+    python3 benchmarks/make_corpus.py -o corpus --mix 单选题=1,判断题=1 --noise 0.5 --dup-rate 0.2
+"""
+
+import os
+import time
+import random
+import struct
+import zipfile
+import itertools
+import argparse
+import datetime
+import tempfile
+from xml.sax.saxutils import escape
+
+import openpyxl
+
+QUESTION_TYPES = ('单选题', '多选题', '判断题', '填空题', '简答题')
+DEFAULT_MIX = '单选题=40,多选题=15,判断题=20,填空题=10,简答题=15'
+ANSWER_STYLES = ('paren', 'comma', 'bare')
+DEFAULT_SEED = 20240101
+
+# 题干、选项用词；不含字母、问号和 "判断题" 等区块标题，避免被解析器误认为标记
+_SUBJECTS = ('车辆', '列车', '转向架', '制动系统', '轴承', '轮对', '车钩', '缓冲器', '受电弓', '牵引电机',
+             '空调机组', '蓄电池', '风缸', '闸瓦', '踏面', '司机室', '电气柜', '齿轮箱', '空气弹簧', '减振器')
+_ACTIONS = ('检修', '检查', '更换', '调整', '清洁', '紧固', '测量', '试验', '维护', '润滑')
+_LINKS = ('的', '在', '时', '应', '必须', '不得', '进行', '及', '按照', '对')
+_QUALIFIERS = ('作业前', '运行中', '入库后', '日常', '定期', '故障时', '规定范围内', '标准流程下', '安全规程要求的')
+_NUMBER_SEPARATORS = ('、', '.', '．')
+_OPTION_SEPARATORS = ('、', '.', '．')
+_JUDGMENT_WORDS = (('√', '×'), ('对', '错'), ('正确', '错误'))
+_DIFFICULTIES = ('易', '中', '难')
+# 全角噪声：半角字母、数字、标点和空格转为全角
+_FULLWIDTH = {code: code + 0xFEE0 for code in range(0x21, 0x7F) if chr(code) not in '_'}
+_FULLWIDTH[0x20] = 0x3000
+
+_DUP_POOL = 4096  # 重复题从最多这么多道已生成题目中抽取（蓄水池抽样）
+_SPOOL_READ = 1024 * 1024
+_ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+_FIXED_TIME = datetime.datetime(2024, 1, 1)
+
+
+# ========== 题目生成 ==========
+def make_phrase(rng, low, high):
+    """由主语、动作、连接词拼出 low~high 个词的短语"""
+    pools = (_SUBJECTS, _ACTIONS, _LINKS, _QUALIFIERS)
+    return ''.join(rng.choice(pools[i % 4] if rng.random() < 0.7 else rng.choice(pools))
+                   for i in range(rng.randint(low, high)))
+
+
+def make_question(rng, q_type):
+    """
+    生成一道抽象题目，与具体版式无关
+    style 是渲染时使用的随机种子，重复题按同一种子渲染，版式中的写法也完全相同
+    """
+    q = {'type': q_type, 'stem': make_phrase(rng, 5, 12), 'style': rng.getrandbits(32)}
+    if q_type == '单选题':
+        count = rng.choice((2, 3, 4, 4, 4, 4))
+        q['options'] = [make_phrase(rng, 1, 3) for _ in range(count)]
+        q['answer'] = 'ABCD'[rng.randrange(count)]
+    elif q_type == '多选题':
+        count = rng.choice((4, 5, 5))
+        q['options'] = [make_phrase(rng, 1, 3) for _ in range(count)]
+        q['answer'] = ''.join(sorted(rng.sample('ABCDE'[:count], rng.randint(2, min(4, count)))))
+    elif q_type == '判断题':
+        q['answer'] = rng.random() < 0.5
+    elif q_type == '填空题':
+        blanks = rng.randint(1, 3)
+        q['parts'] = [make_phrase(rng, 1, 4) for _ in range(blanks + 1)]
+        q['answers'] = [make_phrase(rng, 1, 2) for _ in range(blanks)]
+    else:
+        q['answer'] = '。'.join(make_phrase(rng, 4, 10) for _ in range(rng.randint(1, 3))) + '。'
+    return q
+
+
+def iter_questions(rng, count, mix, dup_rate):
+    """
+    按题型比例产出 count 道题目
+    mix: {题型: 权重}；dup_rate: 每道题是已生成题目的完全重复的概率
+    """
+    types = list(mix)
+    weights = [mix[t] for t in types]
+    pool = []
+    generated = 0
+    for _ in range(count):
+        if pool and rng.random() < dup_rate:
+            yield rng.choice(pool)
+            continue
+        q = make_question(rng, rng.choices(types, weights)[0])
+        generated += 1
+        if len(pool) < _DUP_POOL:
+            pool.append(q)
+        else:
+            slot = rng.randrange(generated)
+            if slot < _DUP_POOL:
+                pool[slot] = q
+        yield q
+
+
+def add_noise(text, rng, noise):
+    """以 noise 的概率把整段文本的半角字母、数字、标点和空格转为全角"""
+    return text.translate(_FULLWIDTH) if rng.random() < noise else text
+
+
+def judgment_word(q, r):
+    """判断题答案写法：√/×、对/错、正确/错误 三选一"""
+    return r.choice(_JUDGMENT_WORDS)[0 if q['answer'] else 1]
+
+
+def format_answer(answer, style):
+    """
+    题目文本中的答案标记
+    paren: 答案：（AB）  comma: 答案:(A,B)  bare: 答案：AB
+    answer 为字符串（选择、判断）或列表（填空）
+    """
+    if style == 'comma':
+        items = answer if isinstance(answer, list) else list(answer) if answer.isascii() else [answer]
+        return f'答案:({",".join(items)})'
+    if isinstance(answer, list):
+        answer = ('，' if style == 'paren' else '、').join(answer)
+    return f'答案：（{answer}）' if style == 'paren' else f'答案：{answer}'
+
+
+def render_text(q, number, styles, noise):
+    """
+    渲染为纯文本版式的题目，返回行列表
+    题号后必须有空白，解析器才会把它当作新题目的开始
+    """
+    r = random.Random(q['style'])
+    style = r.choice(styles)
+    prefix = f'{number}{r.choice(_NUMBER_SEPARATORS)}{r.choice((" ", "  ", chr(0x3000)))}'
+    q_type = q['type']
+    if q_type in ('单选题', '多选题'):
+        sep = r.choice(_OPTION_SEPARATORS)
+        options = [f'{"ABCDEFGHIJKL"[i]}{sep}{opt}' for i, opt in enumerate(q['options'])]
+        answer = format_answer(q['answer'], style)
+        stem = f'{q["stem"]}{r.choice(("（ ）", "（  ）", ""))}'
+        layout = r.randrange(3)
+        if layout == 0:
+            lines = [f'{stem}{answer}', r.choice(('  ', '\t')).join(options)]
+        elif layout == 1:
+            lines = [f'{stem}{answer}'] + options
+        else:
+            lines = [stem] + options + [answer]
+    elif q_type == '判断题':
+        lines = [f'{q["stem"]}。{format_answer(judgment_word(q, r), style)}']
+    elif q_type == '填空题':
+        blank = r.choice(('____', '______', '（ ）'))
+        lines = [f'{blank.join(q["parts"])}。{format_answer(q["answers"], style)}']
+    else:
+        if r.random() < 0.5:
+            lines = [f'{q["stem"]}？', q['answer']]
+        else:
+            lines = [f'{q["stem"]}？{q["answer"]}']
+    lines[0] = prefix + lines[0]
+    return [add_noise(line, r, noise) for line in lines]
+
+
+class _Spool:
+    """按区块暂存文本的临时文件，版式要求各区块依次出现而题目按随机顺序生成时使用"""
+
+    def __init__(self, keys):
+        self._files = {key: tempfile.TemporaryFile('w+', encoding='utf-8') for key in keys}
+
+    def write(self, key, text):
+        self._files[key].write(text)
+
+    def read(self, key):
+        """逐块读出区块内容"""
+        f = self._files[key]
+        f.seek(0)
+        while True:
+            data = f.read(_SPOOL_READ)
+            if not data:
+                return
+            yield data
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+
+
+# ========== Excel 版式 ==========
+def _new_workbook():
+    wb = openpyxl.Workbook(write_only=True)
+    wb.properties.created = wb.properties.modified = _FIXED_TIME
+    return wb
+
+
+def _excel_choice_answer(q, r, noise):
+    """Excel 单元格中的选择题答案：AB / A,B / ab 三种写法，可能带全角噪声"""
+    answer = r.choice((q['answer'], ','.join(q['answer']), q['answer'].lower()))
+    return add_noise(answer, r, noise)
+
+
+def write_mid_level_excel(path, questions, config):
+    """中级练习题：序号、试题内容、选项A-L、答案、题型，只含单选、多选、判断题"""
+    wb = _new_workbook()
+    ws = wb.create_sheet('练习题')
+    ws.append(['序号', '试题内容'] + [f'选项{c}' for c in 'ABCDEFGHIJKL'] + ['答案', '题型'])
+    count = 0
+    for count, q in enumerate(questions, 1):
+        r = random.Random(q['style'])
+        if q['type'] == '判断题':
+            ws.append([count, q['stem']] + [None] * 12 + [judgment_word(q, r), '判断题'])
+        else:
+            options = q['options'] + [None] * (12 - len(q['options']))
+            ws.append([count, q['stem']] + options + [_excel_choice_answer(q, r, config.noise), q['type']])
+    wb.save(path)
+    return count
+
+
+# 汇总表各工作表：(工作表名, 表头)
+_SUMMARY_SHEETS = (
+    ('选择题', ['序号', '类型', '试题', 'A', 'B', 'C', 'D', '答案', '难度']),
+    ('多选题', ['序号', '类型', '试题', 'A', 'B', 'C', 'D', 'E', '答案']),
+    ('判断题', ['序号', '类型', '试题', '答案']),
+    ('填空题', ['序号', '类型', '试题', '答案']),
+    ('简答题', ['序号', '类型', '试题', '答案']),
+    ('论述题', ['序号', '类型', '试题', '答案']),
+)
+
+
+def write_summary_excel(path, questions, config):
+    """2024题库汇总：按题型分工作表，第1行标题、第2行表头，题目从第3行开始"""
+    wb = _new_workbook()
+    sheets = {}
+    for name, header in _SUMMARY_SHEETS:
+        ws = wb.create_sheet(name)
+        ws.append([f'{name}（共享题库）'])
+        ws.append(header)
+        sheets[name] = [ws, 0]
+
+    count = 0
+    for count, q in enumerate(questions, 1):
+        r = random.Random(q['style'])
+        q_type = q['type']
+        if q_type in ('单选题', '多选题'):
+            name = '选择题' if q_type == '单选题' else '多选题'
+            width = 4 if q_type == '单选题' else 5
+            sep = r.choice(_OPTION_SEPARATORS)
+            # 选项单元格可能带字母前缀
+            options = [f'{"ABCDE"[i]}{sep}{opt}' if r.random() < 0.3 else opt
+                       for i, opt in enumerate(q['options'])]
+            cells = options + [None] * (width - len(options)) + [_excel_choice_answer(q, r, config.noise)]
+            if name == '选择题':
+                cells.append(r.choice(_DIFFICULTIES))
+            text = q['stem']
+        elif q_type == '判断题':
+            name, text, cells = '判断题', q['stem'], [judgment_word(q, r)]
+        elif q_type == '填空题':
+            name, text = '填空题', '____'.join(q['parts'])
+            cells = [r.choice(('、', '，', ';')).join(q['answers'])]
+        else:
+            name, text, cells = r.choice(('简答题', '论述题')), q['stem'] + '？', [q['answer']]
+        sheet = sheets[name]
+        sheet[1] += 1
+        sheet[0].append([sheet[1], q_type, text] + cells)
+    wb.save(path)
+    return count
+
+
+def write_generic_excel(path, questions, config):
+    """通用Excel：表头 "题目" 之后每行一题，题目文本（含选项和答案）在同一个单元格中"""
+    wb = _new_workbook()
+    ws = wb.create_sheet('题目')
+    ws.append(['题目', '备注'])
+    count = 0
+    for count, q in enumerate(questions, 1):
+        r = random.Random(q['style'] ^ 0x5F5F)
+        lines = render_text(q, count, config.answer_styles, config.noise)
+        ws.append(['\n'.join(lines), r.choice((None, None, '重点'))])
+    wb.save(path)
+    return count
+
+
+# ========== Word 版式 ==========
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.'
+    'wordprocessingml.document.main+xml"/>'
+    '</Types>')
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+    'officeDocument" Target="word/document.xml"/>'
+    '</Relationships>')
+_DOCX_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>')
+_DOCX_TAIL = '<w:sectPr/></w:body></w:document>'
+_DOCX_TABLE_HEAD = ('<w:tbl><w:tblPr><w:tblW w:w="0" w:type="auto"/></w:tblPr>'
+                    '<w:tblGrid><w:gridCol w:w="8300"/></w:tblGrid>')
+
+
+def docx_paragraph(text):
+    """单个段落的 XML，制表符转为 w:tab"""
+    if not text:
+        return '<w:p/>'
+    runs = '<w:tab/>'.join(f'<w:t xml:space="preserve">{escape(part)}</w:t>' if part else ''
+                           for part in text.split('\t'))
+    return f'<w:p><w:r>{runs}</w:r></w:p>'
+
+
+def docx_cell_row(lines):
+    """单列表格的一行，每行文本是单元格中的一个段落"""
+    return f'<w:tr><w:tc>{"".join(docx_paragraph(line) for line in lines)}</w:tc></w:tr>'
+
+
+def write_docx(path, chunks):
+    """把正文 XML 片段依次写入 docx，不在内存中拼接整个文档"""
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(zipfile.ZipInfo('[Content_Types].xml', _ZIP_DATE), _DOCX_CONTENT_TYPES,
+                    zipfile.ZIP_DEFLATED)
+        zf.writestr(zipfile.ZipInfo('_rels/.rels', _ZIP_DATE), _DOCX_RELS, zipfile.ZIP_DEFLATED)
+        info = zipfile.ZipInfo('word/document.xml', _ZIP_DATE)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        with zf.open(info, 'w', force_zip64=True) as f:
+            f.write(_DOCX_HEAD.encode('utf-8'))
+            for chunk in chunks:
+                f.write(chunk.encode('utf-8'))
+            f.write(_DOCX_TAIL.encode('utf-8'))
+
+
+def write_generic_docx(path, questions, config):
+    """通用docx：标题段落之后每行一个段落"""
+    count = 0
+
+    def body():
+        nonlocal count
+        yield docx_paragraph('第一部分 试题')
+        for count, q in enumerate(questions, 1):
+            lines = render_text(q, count, config.answer_styles, config.noise)
+            yield ''.join(docx_paragraph(line) for line in lines)
+
+    write_docx(path, body())
+    return count
+
+
+def write_crh6_docx(path, questions, config):
+    """CRH6竞赛题库：表格0为选择题和填空题，表格1为判断题，表格2为简答题，每行一题"""
+    spool = _Spool(range(3))
+    numbers = [0, 0, 0]
+    count = 0
+    try:
+        for count, q in enumerate(questions, 1):
+            table = {'判断题': 1, '简答题': 2}.get(q['type'], 0)
+            numbers[table] += 1
+            spool.write(table, docx_cell_row(render_text(q, numbers[table], config.answer_styles,
+                                                         config.noise)))
+
+        def body():
+            for table, title in enumerate(('一、选择题和填空题', '二、判断题', '三、简答题')):
+                yield docx_paragraph(title)
+                yield _DOCX_TABLE_HEAD
+                yield from spool.read(table)
+                yield '</w:tbl>'
+                # 相邻表格之间需要段落，否则打开时会被合并为一个表格
+                yield '<w:p/>'
+
+        write_docx(path, body())
+    finally:
+        spool.close()
+    return count
+
+
+# ========== 纯文本版式 ==========
+def write_text_file(path, questions, config):
+    """带题号的纯文本，题目之间随机空行"""
+    count = 0
+    with open(path, 'w', encoding=config.txt_encoding, newline='\n') as f:
+        f.write('试题汇编\n')
+        for count, q in enumerate(questions, 1):
+            r = random.Random(q['style'] ^ 0x5F5F)
+            f.write('\n'.join(render_text(q, count, config.answer_styles, config.noise)))
+            f.write(r.choice(('\n', '\n\n', '\n  \n')))
+    return count
+
+
+# ========== Word 97-2003 二进制版式 ==========
+# 复合文档（CFB v4，4096 字节扇区）：WordDocument 流、1Table 流依次存放，
+# 目录和 FAT 扇区写在文件末尾，最后回填文件头，整个文档边生成边写出
+_CFB_SECTOR = 4096
+_CFB_FREESECT = 0xFFFFFFFF
+_CFB_ENDOFCHAIN = 0xFFFFFFFE
+_CFB_FATSECT = 0xFFFFFFFD
+_CFB_NOSTREAM = 0xFFFFFFFF
+_CFB_MAX_FAT = 109  # 文件头中的 DIFAT 最多记录 109 个 FAT 扇区，约 436MB
+_DOC_TEXT_OFFSET = 1024  # 正文在 WordDocument 流中的起始偏移，之前为 FIB
+_DOC_CCP_TEXT = 64 + 12
+_DOC_FC_CLX = 154 + 33 * 8
+_DOC_SECTIONS = (('choice', '一、选择题'), ('judgment', '二、判断题'), ('fill', '三、填空题'), ('essay', '四、简答题'))
+_DOC_SECTION_OF = {'单选题': 'choice', '判断题': 'judgment', '填空题': 'fill', '简答题': 'essay'}
+
+
+def _doc_fib():
+    """最小的 Word97 FIB：fWhichTblStm 指向 1Table，ccpText、fcClx/lcbClx 写出后回填"""
+    fib = bytearray(_DOC_TEXT_OFFSET)
+    struct.pack_into('<HH', fib, 0, 0xA5EC, 0x00C1)
+    struct.pack_into('<H', fib, 0x0A, 0x0004 | 0x0200)
+    struct.pack_into('<H', fib, 32, 14)
+    struct.pack_into('<H', fib, 62, 22)
+    struct.pack_into('<H', fib, 152, 93)
+    return fib
+
+
+def render_doc(q, number, noise):
+    """
+    渲染为 .doc 版式的段落列表
+    选择题答案在题干后的括号中，判断题答案在句末括号中，简答题答案在下一段 "答：" 之后
+    """
+    r = random.Random(q['style'])
+    sep = r.choice(_NUMBER_SEPARATORS)
+    # 噪声：全角/半角括号混用、选项之间用全角空格
+    left, right = ('(', ')') if r.random() < noise else ('（', '）')
+    if q['type'] == '单选题':
+        opt_sep = r.choice(_OPTION_SEPARATORS)
+        options = [f'{"ABCD"[i]}{opt_sep}{opt}' for i, opt in enumerate(q['options'])]
+        stem = f'{number}{sep}{q["stem"]}{left} {q["answer"]} {right}。'
+        if r.random() < 0.3:
+            return [stem] + options
+        return [stem, (chr(0x3000) * 2 if r.random() < noise else '  ').join(options)]
+    if q['type'] == '判断题':
+        return [f'{number}{sep}{q["stem"]}。{left}{"√" if q["answer"] else "×"}{right}']
+    if q['type'] == '填空题':
+        return [f'{number}{sep}{"____".join(q["parts"])}。']
+    return [f'{number}{sep}{q["stem"]}？', f'答：{q["answer"]}']
+
+
+def _cfb_dir_entry(name, entry_type, left, right, child, start, size):
+    entry = bytearray(128)
+    encoded = name.encode('utf-16-le') + b'\0\0'
+    entry[:len(encoded)] = encoded
+    struct.pack_into('<HBB', entry, 64, len(encoded), entry_type, 1)
+    struct.pack_into('<III', entry, 68, left, right, child)
+    struct.pack_into('<IQ', entry, 116, start, size)
+    return bytes(entry)
+
+
+def _write_padded(f, size):
+    """补零到扇区边界，返回占用的扇区数"""
+    sectors = max(1, -(-size // _CFB_SECTOR))
+    f.write(b'\0' * (sectors * _CFB_SECTOR - size))
+    return sectors
+
+
+def write_doc_file(path, questions, config):
+    """Word97 .doc：选择、判断、填空、简答四个区块，正文为单个 UTF-16LE 分段"""
+    spool = _Spool(key for key, _ in _DOC_SECTIONS)
+    numbers = dict.fromkeys(_DOC_SECTION_OF.values(), 0)
+    count = 0
+    try:
+        for count, q in enumerate(questions, 1):
+            section = _DOC_SECTION_OF[q['type']]
+            numbers[section] += 1
+            spool.write(section, ''.join(p + '\r' for p in render_doc(q, numbers[section], config.noise)))
+
+        with open(path, 'wb') as f:
+            f.write(b'\0' * _CFB_SECTOR)  # 文件头占位
+
+            # WordDocument 流
+            f.write(_doc_fib())
+            ccp_text = 0
+            word_size = _DOC_TEXT_OFFSET
+            for key, title in _DOC_SECTIONS:
+                for chunk in itertools.chain((title + '\r',), spool.read(key)):
+                    data = chunk.encode('utf-16-le')
+                    f.write(data)
+                    ccp_text += len(data) // 2
+                    word_size += len(data)
+            word_sectors = _write_padded(f, word_size)
+
+            # 1Table 流：CLX 只有一个 Pcdt，整个正文是一个未压缩分段
+            plc = struct.pack('<II', 0, ccp_text) + struct.pack('<HIH', 0, _DOC_TEXT_OFFSET, 0)
+            clx = b'\x02' + struct.pack('<I', len(plc)) + plc
+            # 流的大小不能小于 4096 字节，否则会被当作存放在迷你流中
+            table = (bytes(512) + clx).ljust(_CFB_SECTOR, b'\0')
+            f.write(table)
+            table_sectors = _write_padded(f, len(table))
+            word_size = max(word_size, _CFB_SECTOR)
+
+            # 目录：根、WordDocument、1Table（按名称长度排序，1Table 是 WordDocument 的左兄弟）
+            dir_sector = word_sectors + table_sectors
+            entries = [
+                _cfb_dir_entry('Root Entry', 5, _CFB_NOSTREAM, _CFB_NOSTREAM, 1, _CFB_ENDOFCHAIN, 0),
+                _cfb_dir_entry('WordDocument', 2, 2, _CFB_NOSTREAM, _CFB_NOSTREAM, 0, word_size),
+                _cfb_dir_entry('1Table', 2, _CFB_NOSTREAM, _CFB_NOSTREAM, _CFB_NOSTREAM, word_sectors, len(table)),
+            ]
+            empty = _cfb_dir_entry('', 0, _CFB_NOSTREAM, _CFB_NOSTREAM, _CFB_NOSTREAM, 0, 0)
+            f.write(b''.join(entries) + empty * (_CFB_SECTOR // 128 - len(entries)))
+
+            # FAT：各流的扇区链，最后是 FAT 扇区自身
+            per_fat = _CFB_SECTOR // 4
+            fat_sectors = 1
+            while (dir_sector + 1 + fat_sectors) > fat_sectors * per_fat:
+                fat_sectors += 1
+            if fat_sectors > _CFB_MAX_FAT:
+                raise ValueError('题目过多，超出 .doc 文件的大小上限，请减少题目数')
+            fat = []
+            for start, length in ((0, word_sectors), (word_sectors, table_sectors), (dir_sector, 1)):
+                fat.extend(range(start + 1, start + length))
+                fat.append(_CFB_ENDOFCHAIN)
+            fat.extend([_CFB_FATSECT] * fat_sectors)
+            fat.extend([_CFB_FREESECT] * (fat_sectors * per_fat - len(fat)))
+            f.write(struct.pack(f'<{len(fat)}I', *fat))
+
+            # 回填文件头和 FIB
+            header = bytearray(_CFB_SECTOR)
+            header[0:8] = bytes.fromhex('D0CF11E0A1B11AE1')
+            struct.pack_into('<HHHHH', header, 24, 0x3E, 4, 0xFFFE, 12, 6)
+            struct.pack_into('<III', header, 40, 1, fat_sectors, dir_sector)
+            struct.pack_into('<IIIIII', header, 52, 0, 4096, _CFB_ENDOFCHAIN, 0, _CFB_ENDOFCHAIN, 0)
+            difat = list(range(dir_sector + 1, dir_sector + 1 + fat_sectors))
+            struct.pack_into('<109I', header, 76, *(difat + [_CFB_FREESECT] * (_CFB_MAX_FAT - fat_sectors)))
+            f.seek(0)
+            f.write(header)
+            f.seek(_CFB_SECTOR + _DOC_CCP_TEXT)
+            f.write(struct.pack('<i', ccp_text))
+            f.seek(_CFB_SECTOR + _DOC_FC_CLX)
+            f.write(struct.pack('<II', 512, len(clx)))
+    finally:
+        spool.close()
+    return count
+
+
+# ========== 命令行 ==========
+# 版式名称 -> (输出文件名, 生成函数, 支持的题型)
+LAYOUTS = {
+    'mid': ('车辆检修工练习题-中级.xlsx', write_mid_level_excel, ('单选题', '多选题', '判断题')),
+    'summary': ('车辆题库汇总2024.xlsx', write_summary_excel, QUESTION_TYPES),
+    'xlsx': ('通用练习.xlsx', write_generic_excel, QUESTION_TYPES),
+    'crh6': ('CRH6竞赛题库.docx', write_crh6_docx, QUESTION_TYPES),
+    'docx': ('通用题库.docx', write_generic_docx, QUESTION_TYPES),
+    'txt': ('文本题库.txt', write_text_file, QUESTION_TYPES),
+    'doc': ('题库.doc', write_doc_file, ('单选题', '判断题', '填空题', '简答题')),
+}
+
+
+def parse_mix(value):
+    """解析 "单选题=40,判断题=20" 形式的题型比例"""
+    mix = {}
+    for item in value.split(','):
+        name, sep, weight = item.partition('=')
+        name = name.strip()
+        if name not in QUESTION_TYPES or not sep:
+            raise argparse.ArgumentTypeError(f'无效的题型比例: {item}（题型: {"、".join(QUESTION_TYPES)}）')
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f'无效的权重: {item}')
+        if mix[name] < 0:
+            raise argparse.ArgumentTypeError(f'权重不能为负: {item}')
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError('题型比例不能全为0')
+    return mix
+
+
+def parse_choices(value, choices, label):
+    """解析逗号分隔的名称列表，并检查是否都在 choices 中"""
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in choices]
+    if unknown or not names:
+        raise argparse.ArgumentTypeError(f'未知的{label}: {", ".join(unknown)}（可选: {", ".join(choices)}）')
+    return names
+
+
+def parse_rate(value):
+    """0~1 之间的概率"""
+    try:
+        rate = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'无效的比例: {value}')
+    if not 0 <= rate <= 1:
+        raise argparse.ArgumentTypeError(f'比例须在0到1之间: {value}')
+    return rate
+
+
+def generate_layout(layout, output_dir, config):
+    """
+    生成一个版式的题库文件，返回 (文件路径, 题目数)
+    每个版式使用独立的随机数序列，只生成部分版式时内容不变
+    """
+    file_name, writer, supported = LAYOUTS[layout]
+    mix = {t: w for t, w in config.mix.items() if t in supported and w > 0}
+    if not mix:
+        return None, 0
+    rng = random.Random(f'{config.seed}:{layout}')
+    path = os.path.join(output_dir, file_name)
+    count = writer(path, iter_questions(rng, config.count, mix, config.dup_rate), config)
+    return path, count
+
+
+def create_argument_parser():
+    """命令行参数；基准测试脚本也用它构造默认的生成配置"""
+    parser = argparse.ArgumentParser(
+        description='合成题库生成工具',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='版式:\n' + '\n'.join(f'  {name:<8} {file_name}' for name, (file_name, _, _) in LAYOUTS.items())
+    )
+    parser.add_argument('-o', '--output-dir', default='corpus', help='输出目录（默认 corpus）')
+    parser.add_argument('-n', '--count', type=int, default=1000, help='每个文件的题目数（默认1000）')
+    parser.add_argument('--layouts', type=lambda v: parse_choices(v, LAYOUTS, '版式'),
+                        default=list(LAYOUTS), help='要生成的版式，逗号分隔（默认全部）')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help=f'随机种子（默认{DEFAULT_SEED}）')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f'题型比例（默认 {DEFAULT_MIX}），版式不支持的题型自动忽略')
+    parser.add_argument('--noise', type=parse_rate, default=0.2,
+                        help='题目带全角字母、数字、标点噪声的比例（默认0.2）')
+    parser.add_argument('--answer-styles', type=lambda v: parse_choices(v, ANSWER_STYLES, '答案写法'),
+                        default=['paren', 'comma'],
+                        help='文本版式中的答案写法，逗号分隔：paren 答案：（AB）、comma 答案:(A,B)、'
+                             'bare 答案：AB（选择题答案无法识别）；默认 paren,comma')
+    parser.add_argument('--dup-rate', type=parse_rate, default=0.05, help='重复题比例（默认0.05）')
+    parser.add_argument('--txt-encoding', default='utf-8', help='纯文本版式的编码（默认utf-8）')
+    return parser
+
+
+def main():
+    parser = create_argument_parser()
+    args = parser.parse_args()
+
+    if args.count < 0:
+        parser.error('题目数不能为负')
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    total = 0
+    for layout in args.layouts:
+        start = time.perf_counter()
+        path, count = generate_layout(layout, args.output_dir, args)
+        if path is None:
+            print(f'{layout:<8} 跳过：题型比例中没有该版式支持的题型')
+            continue
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f'{layout:<8} {count:>9} 题 {size_mb:>9.1f} MB {time.perf_counter() - start:>7.1f}s  {path}')
+        total += count
+    print(f'共生成 {total} 道题目')
+
+
+if __name__ == '__main__':
+    main()
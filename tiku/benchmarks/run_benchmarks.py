@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析、去重、验证和写出的基准测试
+
+用 make_corpus.py 按固定种子生成各版式的题库，在多个题目规模下分别测量：
+- 各解析器：parse_mid_level_excel、parse_2024_summary_excel、parse_generic_excel、
+  parse_crh6_docx、parse_generic_docx、parse_text_file、parse_doc_file
+- normalize_text（纯文本题库的原始文本）、deduplicate_questions、validate_questions
+- 两种 Excel 输出：convert_to_motibang_excel、convert_to_shuatidadang_excel
+- .tqb 中间文件的写出和读回：write_question_bank、parse_question_bank
+
+每项记录最佳耗时、每秒题目数和峰值内存（tracemalloc 统计的 Python 分配），结果保存为 JSON。
+指定 --baseline 时与之前保存的结果逐项对比，吞吐下降或内存增长超过阈值的项标记为回归，
+并以退出码 1 结束，发布前运行即可发现热点路径的性能退化。
+
+使用方法：
+    python3 benchmarks/run_benchmarks.py -o baseline.json
+    python3 benchmarks/run_benchmarks.py --baseline baseline.json -o current.json
+    python3 benchmarks/run_benchmarks.py --sizes 1000,50000 --only parse_text_file,deduplicate_questions
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import contextlib
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import convert_core  # noqa: E402
+import make_corpus  # noqa: E402
+
+DEFAULT_SIZES = '1000,10000'
+DEFAULT_THRESHOLD = 0.15
+_MEMORY_SLACK_MB = 1.0  # 峰值内存只比基线多不到这么多时不算回归，避免小规模下的抖动
+
+# 解析器 -> 输入版式（make_corpus.LAYOUTS 中的名称）
+PARSER_LAYOUTS = {
+    'parse_mid_level_excel': 'mid',
+    'parse_2024_summary_excel': 'summary',
+    'parse_generic_excel': 'xlsx',
+    'parse_crh6_docx': 'crh6',
+    'parse_generic_docx': 'docx',
+    'parse_text_file': 'txt',
+    'parse_doc_file': 'doc',
+}
+# 不依赖特定版式的各项都使用纯文本题库
+STAGE_BENCHMARKS = ('normalize_text', 'deduplicate_questions', 'validate_questions',
+                    'convert_to_motibang_excel', 'convert_to_shuatidadang_excel',
+                    'write_question_bank', 'parse_question_bank')
+BENCHMARKS = tuple(PARSER_LAYOUTS) + STAGE_BENCHMARKS
+
+
+# ========== 测量 ==========
+def measure(func, repeat):
+    """
+    运行 func repeat 次取最佳耗时，再单独运行一次测量峰值内存（tracemalloc 会拖慢执行，不计入耗时）
+    func 的输出（解析警告、"已保存到" 等）被丢弃
+    返回 (最佳耗时秒数, 峰值内存MB, func 的返回值)
+    """
+    best = None
+    result = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return best, peak / (1024 * 1024), result
+
+
+def record(results, name, size, items, seconds, peak_mb):
+    """保存一项结果，键为 "名称/规模" """
+    results[f'{name}/{size}'] = {
+        'name': name,
+        'size': size,
+        'items': items,
+        'seconds': round(seconds, 6),
+        'items_per_sec': round(items / seconds, 1) if seconds else 0.0,
+        'peak_mb': round(peak_mb, 2),
+    }
+    print(f'  {name:<32}{items:>9}{seconds:>10.3f}{items / seconds if seconds else 0:>12.0f}{peak_mb:>10.1f}')
+
+
+def prepare_corpus(corpus_dir, size, seed, layouts):
+    """生成（或复用已生成的）指定规模的题库，返回 {版式: 文件路径}"""
+    config = make_corpus.create_argument_parser().parse_args(['-n', str(size), '--seed', str(seed)])
+    size_dir = os.path.join(corpus_dir, f'{seed}-{size}')
+    os.makedirs(size_dir, exist_ok=True)
+    paths = {}
+    for layout in layouts:
+        path = os.path.join(size_dir, make_corpus.LAYOUTS[layout][0])
+        if not os.path.exists(path):
+            path, _ = make_corpus.generate_layout(layout, size_dir, config)
+        paths[layout] = path
+    return paths
+
+
+def run_size(size, names, corpus_dir, seed, repeat, work_dir):
+    """在一个题目规模下运行 names 中的各项，返回 {键: 结果}"""
+    layouts = {PARSER_LAYOUTS.get(name, 'txt') for name in names}
+    paths = prepare_corpus(corpus_dir, size, seed, sorted(layouts))
+    results = {}
+    print(f'\n规模 {size} 题')
+    print(f'  {"项目":<30}{"题目数":>7}{"耗时(s)":>11}{"题/秒":>10}{"峰值MB":>9}')
+
+    for name in names:
+        if name in PARSER_LAYOUTS:
+            parser = getattr(convert_core, name)
+            path = paths[PARSER_LAYOUTS[name]]
+            seconds, peak, questions = measure(lambda: parser(path), repeat)
+            record(results, name, size, len(questions), seconds, peak)
+
+    # 其余各项以纯文本题库的解析结果（或原始文本）为输入
+    stage_names = [name for name in names if name in STAGE_BENCHMARKS]
+    if not stage_names:
+        return results
+    text_path = paths['txt']
+    with contextlib.redirect_stdout(io.StringIO()):
+        questions = convert_core.parse_text_file(text_path)
+    for q in questions:
+        q['source'] = '基准测试'
+
+    for name in stage_names:
+        if name == 'normalize_text':
+            with open(text_path, encoding='utf-8') as f:
+                text = f.read()
+            func = lambda: convert_core.normalize_text(text)  # noqa: E731
+        elif name == 'deduplicate_questions':
+            func = lambda: convert_core.deduplicate_questions(questions)  # noqa: E731
+        elif name == 'validate_questions':
+            func = lambda: convert_core.validate_questions(questions)  # noqa: E731
+        elif name == 'parse_question_bank':
+            bank_path = os.path.join(work_dir, f'{name}-{size}.tqb')
+            with contextlib.redirect_stdout(io.StringIO()):
+                convert_core.write_question_bank(questions, bank_path)
+            func = lambda: convert_core.parse_question_bank(bank_path)  # noqa: E731
+        else:
+            writer = getattr(convert_core, name)
+            extension = '.tqb' if name == 'write_question_bank' else '.xlsx'
+            output_path = os.path.join(work_dir, f'{name}-{size}{extension}')
+            func = lambda: writer(questions, output_path)  # noqa: E731
+        seconds, peak, _ = measure(func, repeat)
+        record(results, name, size, len(questions), seconds, peak)
+    return results
+
+
+# ========== 与基线对比 ==========
+def compare_results(current, baseline, threshold):
+    """
+    逐项对比当前结果与基线，打印对比表
+    吞吐（题/秒）下降超过 threshold，或峰值内存增长超过 threshold 且超过 _MEMORY_SLACK_MB 时记为回归
+    返回回归项的说明列表
+    """
+    regressions = []
+    print(f'\n与基线对比（阈值 {threshold:.0%}）')
+    print(f'  {"项目":<38}{"基线 题/秒":>12}{"当前 题/秒":>12}{"变化":>9}{"内存变化":>10}')
+    for key, cur in current.items():
+        base = baseline.get(key)
+        if not base:
+            print(f'  {key:<40}{"-":>12}{cur["items_per_sec"]:>14.0f}   （基线中没有）')
+            continue
+        speed = cur['items_per_sec'] / base['items_per_sec'] - 1 if base['items_per_sec'] else 0.0
+        memory = cur['peak_mb'] - base['peak_mb']
+        flags = []
+        if speed < -threshold:
+            flags.append(f'吞吐下降 {-speed:.0%}')
+        if memory > max(base['peak_mb'] * threshold, _MEMORY_SLACK_MB):
+            flags.append(f'内存增加 {memory:.1f}MB')
+        mark = '  ✗ ' + '，'.join(flags) if flags else ''
+        print(f'  {key:<40}{base["items_per_sec"]:>12.0f}{cur["items_per_sec"]:>14.0f}'
+              f'{speed:>+10.0%}{memory:>+10.1f}{mark}')
+        if flags:
+            regressions.append(f'{key}: {"，".join(flags)}')
+    return regressions
+
+
+def load_results(path):
+    """读取保存的结果文件，返回其中的 results 字典"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def parse_sizes(value):
+    """解析逗号分隔的题目规模列表"""
+    try:
+        sizes = [int(item) for item in value.split(',') if item.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'无效的规模: {value}')
+    if not sizes or min(sizes) <= 0:
+        raise argparse.ArgumentTypeError(f'规模必须是正整数: {value}')
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='解析、去重、验证和写出的基准测试')
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes(DEFAULT_SIZES),
+                        help=f'题目规模，逗号分隔（默认 {DEFAULT_SIZES}）')
+    parser.add_argument('--repeat', type=int, default=3, help='每项重复次数，取最佳（默认3）')
+    parser.add_argument('--only', type=lambda v: make_corpus.parse_choices(v, BENCHMARKS, '测试项'),
+                        default=list(BENCHMARKS), help='只运行这些项，逗号分隔（默认全部）')
+    parser.add_argument('--seed', type=int, default=make_corpus.DEFAULT_SEED,
+                        help=f'生成题库的随机种子（默认{make_corpus.DEFAULT_SEED}）')
+    parser.add_argument('--corpus-dir', help='保存并复用生成的题库（默认使用临时目录，运行后删除）')
+    parser.add_argument('-o', '--output', default='benchmark_results.json',
+                        help='结果 JSON 文件（默认 benchmark_results.json）')
+    parser.add_argument('--baseline', help='与之前保存的结果 JSON 对比')
+    parser.add_argument('--threshold', type=make_corpus.parse_rate, default=DEFAULT_THRESHOLD,
+                        help=f'判定回归的变化比例（默认{DEFAULT_THRESHOLD}）')
+    args = parser.parse_args()
+
+    if args.repeat < 1:
+        parser.error('重复次数至少为1')
+    baseline = load_results(args.baseline) if args.baseline else None
+
+    print(f'convert_core {convert_core.__version__} / Python {platform.python_version()}')
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        corpus_dir = args.corpus_dir or os.path.join(work_dir, 'corpus')
+        for size in args.sizes:
+            results.update(run_size(size, args.only, corpus_dir, args.seed, args.repeat, work_dir))
+
+    report = {
+        'version': convert_core.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'\n结果已保存到: {args.output}')
+
+    if baseline is not None:
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f'\n✗ 发现 {len(regressions)} 项性能回归:')
+            for line in regressions:
+                print(f'  - {line}')
+            sys.exit(1)
+        print('\n✓ 没有超过阈值的性能回归')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,4881 @@
+# -*- coding: utf-8 -*-
+"""
+题库转换核心模块 - 磨题帮/刷题搭档共用
+
+两个转换脚本共用的解析、验证、去重和批量处理逻辑。每个输入文件只解析一次，
+再由注册的输出格式（emitter）分别写出，使用 --targets 一次生成多种导入模板：
+
+- motibang: 磨题帮Excel导入模板，输出 原文件名_磨题帮.xlsx
+- shuatidadang: 刷题搭档Excel导入模板，输出 原文件名_刷题搭档.xlsx
+
+新增输出格式时用 register_emitter 注册写出函数即可，解析器无需改动。
+
+使用方法：
+    python3 convert_all_questions_motibang.py --targets motibang,shuatidadang [文件1] ...
+"""
+
+import re
+import os
+import sys
+import glob as glob_module
+import argparse
+import array
+import bisect
+import codecs
+import collections
+import contextlib
+import cProfile
+import dis
+import functools
+import hashlib
+import heapq
+import io
+import itertools
+import json
+import mmap
+import pickle
+import shutil
+import struct
+import tempfile
+import time
+import tracemalloc
+import types
+import zipfile
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块
+    resource = None
+
+# openpyxl、lxml、olefile 和进程池在首次用到的解析器、写入器中才导入，
+# --version、--help 和只解析纯文本题库时不必加载这些库
+
+# 版本信息
+__version__ = '1.1.0'
+
+
+# ========== 字符规范化工具 ==========
+def _build_fullwidth_table():
+    """
+    构建全角→半角转换表：
+    - 全角字母 → 半角字母
+    - 全角数字 → 半角数字
+    - 全角空格、常用全角标点 → 半角
+
+    表按码位下标索引，长度截止到最后一个需要转换的字符，
+    更大码位的字符在 str.translate 中查表越界（LookupError）即保持不变
+    """
+    table = [chr(code) for code in range(0xFF5B)]
+    # 全角大写字母 A-Z: U+FF21 - U+FF3A
+    for code in range(0xFF21, 0xFF3B):
+        table[code] = chr(code - 0xFF21 + ord('A'))
+    # 全角小写字母 a-z: U+FF41 - U+FF5A
+    for code in range(0xFF41, 0xFF5B):
+        table[code] = chr(code - 0xFF41 + ord('a'))
+    # 全角数字 0-9: U+FF10 - U+FF19
+    for code in range(0xFF10, 0xFF1A):
+        table[code] = chr(code - 0xFF10 + ord('0'))
+    # 全角空格
+    table[0x3000] = ' '
+    # 常用全角标点转换
+    for full, half in zip('．，：；（）', '.,:;()'):
+        table[ord(full)] = half
+    return ''.join(table)
+
+
+_FULLWIDTH_TABLE = _build_fullwidth_table()
+# 需要转换的字符；不含这些字符的文本已是规范化结果
+_FULLWIDTH_RE = re.compile('[\uff10-\uff19\uff21-\uff3a\uff41-\uff5a\u3000．，：；（）]')
+
+
+def normalize_text(text):
+    """
+    全面的字符规范化：
+    - 全角字母 → 半角字母
+    - 全角数字 → 半角数字
+    - 全角标点 → 半角标点（部分）
+
+    整段文本一次查表转换；已经规范化的文本原样返回，重复调用只需一次扫描
+    """
+    if not text:
+        return ''
+    if not _FULLWIDTH_RE.search(text):
+        return text
+    return text.translate(_FULLWIDTH_TABLE)
+
+
+def normalize_letters(text):
+    """将全角字母转换为半角字母（保留向后兼容）"""
+    return normalize_text(text)
+
+
+def normalize_judgment_answer(raw_answer):
+    """
+    统一判断题答案格式，支持多种输入格式
+    返回: '对' / '错' / '' (无法识别)
+    """
+    if not raw_answer:
+        return ''
+
+    ans = str(raw_answer).strip().upper()
+
+    # 正确答案的各种表示
+    true_values = [
+        'Y', 'YES', 'T', 'TRUE', '1',
+        '对', '正确', '√', '✓', '是', 'RIGHT', 'CORRECT',
+        '○', '〇', 'O'
+    ]
+
+    # 错误答案的各种表示
+    false_values = [
+        'N', 'NO', 'F', 'FALSE', '0',
+        '错', '错误', '×', '✗', '✘', '否', 'WRONG', 'INCORRECT',
+        'X', '☓', 'Ⅹ',  # 包含罗马数字大写 X (U+2169)，因为 .upper() 会把 ⅹ 转成 Ⅹ
+        '叉', '✕', '❌', '⨯', '⨉'  # 更多叉号变体
+    ]
+
+    if ans in true_values:
+        return '对'
+    elif ans in false_values:
+        return '错'
+    else:
+        return ''
+
+
+def clean_answer(answer):
+    """清理答案字符串"""
+    if not answer:
+        return ''
+    answer = str(answer).strip().upper()
+    # 只保留字母
+    return ''.join(c for c in answer if c.isalpha())
+
+
+# ========== 题目记录 ==========
+QUESTION_FIELDS = ('question', 'type', 'options', 'answer', 'answers', 'raw_answer', 'difficulty',
+                   'source', '_source_sheet', '_source_row')
+_QUESTION_FIELD_SET = frozenset(QUESTION_FIELDS)
+_INTERN_MAX = 16  # 不超过这个长度的答案（选择题字母、对/错）和选项内容驻留共享
+
+
+def _intern_text(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def _intern_short(value):
+    return sys.intern(value) if type(value) is str and len(value) <= _INTERN_MAX else value
+
+
+class Question:
+    """
+    一道题目
+
+    各字段存放在 __slots__ 中，比每题一个字典省内存：题型、来源、短答案和短选项驻留共享，
+    选项按字母排序存为内容元组 options 和对应的字母串 option_letters，填空题答案存为元组。
+    值为 None 的字段视为不存在。
+
+    兼容原来的题目字典：q['question']、q.get('type', '未知')、q['source'] = ...、'answers' in q、
+    dict(q) 均可用，其中 q['options'] 返回只读的 {字母: 内容} 映射，
+    原地修改会抛出 TypeError 而不是悄悄丢失，改选项需整体赋值 q['options'] = {...}
+    """
+
+    __slots__ = QUESTION_FIELDS + ('option_letters',)
+
+    def __init__(self, question, type, options=None, answer=None, answers=None, raw_answer=None,
+                 difficulty=None, source=None, sheet=None, row=None):
+        self.question = question
+        self.type = sys.intern(type)
+        self._set_options(options)
+        self.answer = _intern_short(answer)
+        self.answers = tuple(answers) if answers is not None else None
+        self.raw_answer = raw_answer
+        self.difficulty = difficulty
+        self.source = _intern_text(source)
+        self._source_sheet = sheet
+        self._source_row = row
+
+    def _set_options(self, options):
+        """options 为 {字母: 内容} 或 (字母, 内容) 序列"""
+        if options is None:
+            self.options = self.option_letters = None
+            return
+        items = sorted(options.items() if isinstance(options, dict) else options, key=lambda item: item[0])
+        self.option_letters = sys.intern(''.join(letter for letter, _ in items))
+        self.options = tuple(_intern_short(content) for _, content in items)
+
+    def option_items(self):
+        """((字母, 内容), ...)，按字母排序"""
+        return tuple(zip(self.option_letters, self.options)) if self.options else ()
+
+    # ----- 字典式访问 -----
+    def get(self, key, default=None):
+        if key not in _QUESTION_FIELD_SET:
+            return default
+        value = getattr(self, key)
+        if value is None:
+            return default
+        return types.MappingProxyType(dict(self.option_items())) if key == 'options' else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in _QUESTION_FIELD_SET:
+            raise KeyError(key)
+        if key == 'options':
+            self._set_options(value)
+        elif key == 'answer':
+            self.answer = _intern_short(value)
+        elif key == 'answers':
+            self.answers = tuple(value) if value is not None else None
+        elif key in ('type', 'source'):
+            setattr(self, key, _intern_text(value))
+        else:
+            setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in _QUESTION_FIELD_SET and getattr(self, key) is not None
+
+    def keys(self):
+        return [key for key in QUESTION_FIELDS if getattr(self, key) is not None]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __bool__(self):
+        return True  # 题干和题型总是存在
+
+    def __eq__(self, other):
+        if isinstance(other, (Question, dict)):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'Question({dict(self.items())!r})'
+
+    def __reduce__(self):
+        return _restore_question, (tuple(getattr(self, name) for name in Question.__slots__),)
+
+
+def _restore_question(state):
+    """从 pickle 恢复题目（分片并行解析、进程间传递），重新驻留共享的字符串"""
+    q = Question.__new__(Question)
+    for name, value in zip(Question.__slots__, state):
+        setattr(q, name, value)
+    q.type = _intern_text(q.type)
+    q.source = _intern_text(q.source)
+    q.answer = _intern_short(q.answer)
+    q.option_letters = _intern_text(q.option_letters)
+    return q
+
+
+def option_items(q):
+    """选择题选项 ((字母, 内容), ...)，按字母排序；q 为 Question 或题目字典"""
+    if isinstance(q, Question):
+        return q.option_items()
+    return tuple(sorted((q.get('options') or {}).items(), key=lambda item: item[0]))
+
+
+def report_parse_error(message):
+    """
+    打印解析错误并计数
+
+    解析器遇到读取错误时只提示、保留已解析的部分；计数变化说明本次解析不完整，结果不写入缓存
+    """
+    global _parse_error_count
+    _parse_error_count += 1
+    print(message)
+
+
+_parse_error_count = 0
+
+
+# ========== 流式Excel读取 ==========
+def open_workbook_readonly(file_path):
+    """
+    以只读模式打开工作簿
+    只读模式下工作表按需加载，未访问的工作表不会被解析
+    """
+    import openpyxl
+    return openpyxl.load_workbook(file_path, read_only=True)
+
+
+def iter_sheet_rows(ws, min_row=1):
+    """
+    逐行读取工作表，产出 (行号, 值元组)
+
+    只读取单元格的值，不创建单元格对象，内存占用与行数无关
+    """
+    # 部分生成工具写入的 dimension 不可靠，按实际存在的行读取
+    ws.reset_dimensions()
+    for row_idx, values in enumerate(ws.iter_rows(min_row=min_row, values_only=True), min_row):
+        yield row_idx, values
+
+
+def row_value(values, column):
+    """按列号（从1开始）取值，行尾缺省的单元格返回 None"""
+    if column <= len(values):
+        return values[column - 1]
+    return None
+
+
+# ========== 处理 车辆检修工练习题-中级.xlsx ==========
+def iter_mid_level_excel(file_path):
+    """逐行解析中级练习题Excel，边读边产出题目"""
+    wb = open_workbook_readonly(file_path)
+    try:
+        ws = wb.active
+
+        # 跳过表头行
+        for row_idx, values in iter_sheet_rows(ws, min_row=2):
+            question_text = row_value(values, 2)  # 试题内容
+            if not question_text:
+                continue
+
+            # 获取题型（列16）
+            q_type_raw = row_value(values, 16)  # 题型列
+            q_type_raw = str(q_type_raw).strip() if q_type_raw else ''
+
+            # 获取答案（列15）
+            answer_raw = row_value(values, 15)
+            answer_raw = str(answer_raw).strip() if answer_raw else ''
+            # 根据题型处理
+            if '判断' in q_type_raw:
+                # 判断题：使用统一的答案规范化
+                answer = normalize_judgment_answer(answer_raw)
+
+                yield Question(
+                    question=str(question_text).strip(),
+                    type='判断题',
+                    answer=answer,
+                    source=''
+                )
+            else:
+                # 选择题
+                # 获取选项
+                options = {}
+                option_letters = 'ABCDEFGHIJKL'
+                for i, letter in enumerate(option_letters):
+                    opt_value = row_value(values, 3+i)
+                    if opt_value and str(opt_value).strip():
+                        options[letter] = str(opt_value).strip()
+
+                answer = clean_answer(answer_raw)
+
+                # 根据答案数量判断题型
+                if len(answer) > 1:
+                    q_type = '多选题'
+                else:
+                    q_type = '单选题'
+
+                yield Question(
+                    question=str(question_text).strip(),
+                    type=q_type,
+                    options=options,
+                    answer=answer,
+                    source=''
+                )
+    finally:
+        wb.close()
+
+
+def parse_mid_level_excel(file_path):
+    """解析中级练习题Excel"""
+    return list(iter_mid_level_excel(file_path))
+
+
+# ========== 处理 2-车辆题库汇总2024.xlsx ==========
+def iter_2024_summary_excel(file_path):
+    """逐行解析2024题库汇总Excel，只加载需要处理的工作表"""
+    wb = open_workbook_readonly(file_path)
+    try:
+        # 处理选择题工作表
+        if '选择题' in wb.sheetnames:
+            ws = wb['选择题']
+            for row_idx, values in iter_sheet_rows(ws, min_row=3):  # 从第3行开始（跳过标题行）
+                question_text = row_value(values, 3)  # 试题内容
+                if not question_text:
+                    continue
+
+                options = {}
+                for i, letter in enumerate('ABCD'):
+                    opt_value = row_value(values, 4+i)
+                    if opt_value and str(opt_value).strip():
+                        # 选项可能带有字母前缀，需要去除
+                        opt_text = str(opt_value).strip()
+                        opt_text = re.sub(r'^[A-D][、.．:：]\s*', '', opt_text)
+                        if opt_text:
+                            options[letter] = opt_text
+
+                answer = clean_answer(row_value(values, 8))
+                difficulty = row_value(values, 9) or ''
+
+                yield Question(
+                    question=str(question_text).strip(),
+                    type='单选题',
+                    options=options,
+                    answer=answer,
+                    difficulty=str(difficulty),
+                    source='',
+                    sheet='选择题',
+                    row=row_idx
+                )
+
+        # 处理多选题工作表
+        if '多选题' in wb.sheetnames:
+            ws = wb['多选题']
+            for row_idx, values in iter_sheet_rows(ws, min_row=3):
+                question_text = row_value(values, 3)
+                if not question_text:
+                    continue
+
+                options = {}
+                for i, letter in enumerate('ABCDE'):
+                    opt_value = row_value(values, 4+i)
+                    if opt_value and str(opt_value).strip():
+                        opt_text = str(opt_value).strip()
+                        opt_text = re.sub(r'^[A-E][、.．:：]\s*', '', opt_text)
+                        if opt_text:
+                            options[letter] = opt_text
+
+                answer = clean_answer(row_value(values, 9))
+
+                yield Question(
+                    question=str(question_text).strip(),
+                    type='多选题',
+                    options=options,
+                    answer=answer,
+                    source='',
+                    sheet='多选题',
+                    row=row_idx
+                )
+
+        # 处理判断题工作表
+        if '判断题' in wb.sheetnames:
+            ws = wb['判断题']
+            for row_idx, values in iter_sheet_rows(ws, min_row=3):
+                question_text = row_value(values, 3)
+                if not question_text:
+                    continue
+
+                raw_answer = row_value(values, 4)
+                answer = normalize_judgment_answer(raw_answer)
+
+                yield Question(
+                    question=str(question_text).strip(),
+                    type='判断题',
+                    answer=answer,
+                    source='',
+                    sheet='判断题',
+                    row=row_idx
+                )
+
+        # 处理填空题工作表
+        if '填空题' in wb.sheetnames:
+            ws = wb['填空题']
+            for row_idx, values in iter_sheet_rows(ws, min_row=3):
+                question_text = row_value(values, 3)
+                if not question_text:
+                    continue
+
+                answer = row_value(values, 4) or ''
+                # 填空题答案可能用顿号、逗号分隔
+                answers = re.split(r'[,，、;；]', str(answer))
+                answers = [a.strip() for a in answers if a.strip()]
+
+                yield Question(
+                    question=str(question_text).strip(),
+                    type='定序填空题',
+                    answers=answers,
+                    raw_answer=str(answer),
+                    source='',
+                    sheet='填空题',
+                    row=row_idx
+                )
+
+        # 处理简答题工作表
+        if '简答题' in wb.sheetnames:
+            ws = wb['简答题']
+            for row_idx, values in iter_sheet_rows(ws, min_row=3):
+                question_text = row_value(values, 3)
+                if not question_text:
+                    continue
+
+                answer = row_value(values, 4) or ''
+
+                yield Question(
+                    question=str(question_text).strip(),
+                    type='简答题',
+                    answer=str(answer).strip(),
+                    source='',
+                    sheet='简答题',
+                    row=row_idx
+                )
+
+        # 处理论述题工作表
+        if '论述题' in wb.sheetnames:
+            ws = wb['论述题']
+            for row_idx, values in iter_sheet_rows(ws, min_row=3):
+                question_text = row_value(values, 3)
+                if not question_text:
+                    continue
+
+                answer = row_value(values, 4) or ''
+
+                yield Question(
+                    question=str(question_text).strip(),
+                    type='简答题',  # 论述题归类为简答题
+                    answer=str(answer).strip(),
+                    source='',
+                    sheet='论述题',
+                    row=row_idx
+                )
+    finally:
+        wb.close()
+
+
+def parse_2024_summary_excel(file_path):
+    """解析2024题库汇总Excel"""
+    return list(iter_2024_summary_excel(file_path))
+
+
+# ========== 处理 题库1.doc ==========
+# Word 97-2003 二进制格式：WordDocument 流开头是 FIB，表流（0Table/1Table）中的 CLX
+# 保存分段表，正文按分段存放在 WordDocument 流中，每段为 UTF-16LE 或 8 位压缩编码
+_DOC_READ_CHARS = 32768  # 每次从分段中读取的字符数
+_DOC_CHINESE_BLOCK_RE = re.compile(
+    r'[\u4e00-\u9fff\uff00-\uffef\u3000-\u303f0-9A-Za-z（）()、，。？！：；√×\s\-—_]+')
+_DOC_FIELD_RE = re.compile('[\x13\x14\x15]')
+_DOC_CONTROL_RE = re.compile('[\x00-\x08\x0b-\x1f]')
+# 单元格结束、手动换行、分页、分栏转为换行，不间断连字符转为 "-"，其余控制符删除
+_DOC_CONTROL_TABLE = {code: None for code in range(0x20) if code not in (0x09, 0x0A)}
+_DOC_CONTROL_TABLE.update({0x07: '\n', 0x0B: '\n', 0x0C: '\n', 0x0D: '\n', 0x0E: '\n', 0x1E: '-'})
+
+# 各区块中需要查找的下一个标题，以及标题对应的区块
+_DOC_NEXT_HEADINGS = {
+    'choice': ('判断题', '简答题'),
+    'judgment': ('填空题', '简答题'),
+    'fill': ('简答题',),
+    'essay': (),
+}
+_DOC_HEADING_SECTIONS = {'判断题': 'judgment', '填空题': 'fill', '简答题': 'essay'}
+
+_DOC_CHOICE_SPLIT_RE = re.compile(r'(?=\d+[、．.]\s*[^\d])')
+_DOC_NUMBER_PREFIX_RE = re.compile(r'\d*[、．.]?\s*')
+_DOC_CHOICE_TOKEN_RE = re.compile(r'[（(]|[A-D](?=[、．.])')
+_DOC_LETTER_RE = re.compile(r'[A-D]')
+_DOC_ANSWER_PAREN_RE = re.compile(r'[（(]\s*([A-Da-d])\s*[)）]')
+_DOC_SPACES_RE = re.compile(r'\s*')
+_DOC_SPACE_RUN_RE = re.compile(r'\s+')
+_DOC_OPTION_SEPARATORS = '、．.'
+_DOC_JUDGMENT_RE = re.compile(r'(\d+)[、．.]\s*([^（(√×]+?)[。？！]?\s*[（(]\s*([√×])\s*[)）]')
+_DOC_ESSAY_RE = re.compile(r'(\d+)[、．.]\s*([^？?]+[？?])')
+
+
+# _OleStreamReader 按 FAT 扇区链直接读文件，用到 olefile 未写入文档的 fat、fp、sectorsize、
+# minisectorcutoff 属性和目录项的 isectStart；只在核对过这些属性的版本上这样读，
+# 其他版本改用公开的 openstream 整体读取流，结果相同，只是整个流会载入内存
+_OLEFILE_SECTOR_READ_VERSIONS = ('0.47',)
+
+
+class _OleStreamReader:
+    """
+    按FAT扇区链读取OLE流中的指定字节范围，不把整个流载入内存
+    小于 minisectorcutoff 的流存放在迷你流中，体积很小，直接整体读取
+    """
+
+    def __init__(self, ole, name):
+        import olefile
+        self._ole = ole
+        self._data = None
+        self._chain = []
+        if '.'.join(olefile.__version__.split('.')[:2]) in _OLEFILE_SECTOR_READ_VERSIONS:
+            try:
+                self.size = ole.get_size(name)
+                # 正文和表流都在根存储下，按名称（不区分大小写）找到目录项
+                entry = next(kid for kid in ole.root.kids if kid.name.lower() == name.lower())
+                if self.size >= ole.minisectorcutoff:
+                    sect = entry.isectStart
+                    while sect != olefile.ENDOFCHAIN and len(self._chain) * ole.sectorsize < self.size:
+                        self._chain.append(sect)
+                        sect = ole.fat[sect]
+                    if len(self._chain) * ole.sectorsize < self.size:
+                        raise IOError('扇区链长度与流大小不符')
+                    return
+            except (AttributeError, IndexError, StopIteration, IOError):
+                self._chain = []
+        self._data = ole.openstream(name).read()
+        self.size = len(self._data)
+
+    def read(self, offset, length):
+        """读取 [offset, offset+length) 范围的字节，超出流末尾的部分被截断"""
+        end = min(offset + length, self.size)
+        if self._data is not None:
+            return self._data[offset:end]
+
+        sector_size = self._ole.sectorsize
+        chain = self._chain
+        fp = self._ole.fp
+        parts = []
+        pos = offset
+        while pos < end:
+            index, skip = divmod(pos, sector_size)
+            # 合并物理上连续的扇区，一次读出
+            last = index
+            while last + 1 < len(chain) and chain[last + 1] == chain[last] + 1 \
+                    and (last + 1) * sector_size < end:
+                last += 1
+            count = min((last + 1) * sector_size, end) - pos
+            fp.seek((chain[index] + 1) * sector_size + skip)
+            parts.append(fp.read(count))
+            pos += count
+        return b''.join(parts)
+
+
+def read_doc_piece_table(ole, word_stream):
+    """
+    读取 FIB 和 CLX 分段表，返回正文部分的分段列表 [(字符数, 字节偏移, 是否压缩), ...]
+    不是 Word97 格式、文档已加密或结构异常时返回 None
+    """
+    fib = word_stream.read(0, 4096)
+    if len(fib) < 34:
+        return None
+    ident, = struct.unpack_from('<H', fib, 0)
+    flags, = struct.unpack_from('<H', fib, 0x0A)
+    if ident != 0xA5EC or flags & 0x0100:  # 0x0100: fEncrypted
+        return None
+
+    # FibBase 之后依次是 csw + fibRgW、cslw + fibRgLw、cbRgFcLcb + fibRgFcLcb
+    csw, = struct.unpack_from('<H', fib, 32)
+    pos = 34 + csw * 2
+    if pos + 2 > len(fib):
+        return None
+    cslw, = struct.unpack_from('<H', fib, pos)
+    lw_start = pos + 2
+    pos = lw_start + cslw * 4
+    if cslw < 4 or pos + 2 > len(fib):
+        return None
+    ccp_text, = struct.unpack_from('<i', fib, lw_start + 12)
+    cb_fc_lcb, = struct.unpack_from('<H', fib, pos)
+    clx_pos = pos + 2 + 33 * 8  # fcClx/lcbClx 是 fibRgFcLcb 的第 34 对
+    if cb_fc_lcb <= 33 or clx_pos + 8 > len(fib):
+        return None
+    fc_clx, lcb_clx = struct.unpack_from('<II', fib, clx_pos)
+
+    table_name = '1Table' if flags & 0x0200 else '0Table'  # 0x0200: fWhichTblStm
+    if ccp_text <= 0 or not lcb_clx or not ole.exists(table_name):
+        return None
+    clx = _OleStreamReader(ole, table_name).read(fc_clx, lcb_clx)
+
+    # 跳过 Prc（0x01），定位 Pcdt（0x02）
+    pos = 0
+    while pos + 3 <= len(clx) and clx[pos] == 0x01:
+        pos += 3 + struct.unpack_from('<h', clx, pos + 1)[0]
+    if pos + 5 > len(clx) or clx[pos] != 0x02:
+        return None
+    lcb, = struct.unpack_from('<I', clx, pos + 1)
+    plc = clx[pos + 5:pos + 5 + lcb]
+    count = (len(plc) - 4) // 12
+    if count <= 0:
+        return None
+
+    # PlcPcd：count+1 个字符位置，随后 count 个 8 字节的分段描述
+    cps = struct.unpack_from(f'<{count + 1}i', plc, 0)
+    pieces = []
+    for i in range(count):
+        if cps[i] >= ccp_text:
+            break
+        fc, = struct.unpack_from('<I', plc, (count + 1) * 4 + i * 8 + 2)
+        compressed = bool(fc & 0x40000000)
+        fc &= 0x3FFFFFFF
+        if compressed:
+            fc //= 2
+        pieces.append((min(cps[i + 1], ccp_text) - cps[i], fc, compressed))
+    return pieces
+
+
+def _strip_doc_fields(text, field_stack):
+    """
+    去掉域代码，只保留域结果：0x13 域开始，0x14 分隔代码与结果，0x15 域结束，可嵌套
+    field_stack 记录每层域是否仍处于代码部分，在相邻文本片段之间保持状态
+    """
+    if not field_stack and '\x13' not in text:
+        return text
+
+    parts = []
+    pos = 0
+    for m in _DOC_FIELD_RE.finditer(text):
+        if True not in field_stack:
+            parts.append(text[pos:m.start()])
+        mark = m.group()
+        if mark == '\x13':
+            field_stack.append(True)
+        elif field_stack:
+            if mark == '\x14':
+                field_stack[-1] = False
+            else:
+                field_stack.pop()
+        pos = m.end()
+    if True not in field_stack:
+        parts.append(text[pos:])
+    return ''.join(parts)
+
+
+def _extract_doc_text_fallback(word_stream):
+    """无法读取分段表时的兜底：整个流按 UTF-16 解码，只保留中文文本块"""
+    text = word_stream.read(0, word_stream.size).decode('utf-16-le', errors='ignore')
+    return ''.join(block for block in _DOC_CHINESE_BLOCK_RE.findall(text) if len(block) > 3)
+
+
+def iter_doc_text(file_path):
+    """
+    按分段表依次产出 .doc 正文的文本片段
+    段落、单元格等控制符已转换为换行，域代码已去掉；每次只读取一小段字节
+    """
+    import olefile
+    ole = olefile.OleFileIO(file_path)
+    try:
+        word_stream = _OleStreamReader(ole, 'WordDocument')
+        pieces = read_doc_piece_table(ole, word_stream)
+        if pieces is None:
+            yield _extract_doc_text_fallback(word_stream)
+            return
+
+        field_stack = []
+        for char_count, offset, compressed in pieces:
+            width = 1 if compressed else 2
+            decoder = codecs.getincrementaldecoder('cp1252' if compressed else 'utf-16-le')(errors='ignore')
+            for start in range(0, char_count, _DOC_READ_CHARS):
+                size = min(_DOC_READ_CHARS, char_count - start)
+                raw = word_stream.read(offset + start * width, size * width)
+                text = _strip_doc_fields(decoder.decode(raw), field_stack)
+                text = text.replace('\r', '\n')
+                if _DOC_CONTROL_RE.search(text):
+                    text = text.translate(_DOC_CONTROL_TABLE)
+                if text:
+                    yield text
+                if len(raw) < size * width:
+                    break
+    finally:
+        ole.close()
+
+
+def iter_doc_sections(text_runs):
+    """
+    按 "判断题" / "填空题" / "简答题" 标题把文本片段流切分为各区块，产出 (区块, 文本片段)
+    区块依次为 choice、judgment、fill、essay；每个片段末尾保留两个字符与下一片段拼接，
+    保证被片段边界截断的标题也能识别
+    """
+    section = 'choice'
+    carry = ''
+    for run in text_runs:
+        text = carry + run
+        while True:
+            pos, heading = -1, None
+            for candidate in _DOC_NEXT_HEADINGS[section]:
+                found = text.find(candidate)
+                if found >= 0 and (pos < 0 or found < pos):
+                    pos, heading = found, candidate
+            if heading is None:
+                break
+            if pos:
+                yield section, text[:pos]
+            section = _DOC_HEADING_SECTIONS[heading]
+            text = text[pos:]
+        carry = text[-2:]
+        if len(text) > 2:
+            yield section, text[:-2]
+    if carry:
+        yield section, carry
+
+
+def _match_doc_option(chunk, pos, next_letter):
+    """
+    判断 pos 处的 "X、" 能否构成选项：内容延伸到下一个 A-D 字母 next_letter，
+    该字母须是选项标记或已到结尾；能构成时返回内容（可能为空），否则返回 None
+    """
+    end = len(chunk)
+    if next_letter < end and (next_letter + 1 >= end
+                              or chunk[next_letter + 1] not in _DOC_OPTION_SEPARATORS):
+        return None
+    content_start = _DOC_SPACES_RE.match(chunk, pos + 2).end()
+    if content_start == next_letter == pos + 2:
+        return None
+    return _DOC_SPACE_RUN_RE.sub(' ', chunk[content_start:next_letter].strip())
+
+
+def _parse_doc_choice_chunk(chunk):
+    """
+    解析一道选择题，无法识别时返回 None
+    单遍扫描题目中的括号和 "A、" 形式的选项标记：第一个 "(X)" 是答案，题号之后第一个 "(X)"
+    之前是题干，答案之后的选项标记是选项起点，选项内容延伸到下一个 A-D 字母为止
+    """
+    chunk = chunk.strip()
+    if not chunk or len(chunk) < 20:
+        return None
+
+    end = len(chunk)
+    stem_start = _DOC_NUMBER_PREFIX_RE.match(chunk).end()
+    answer_match = stem_match = None
+    options = {}
+    found = set()
+
+    for m in _DOC_CHOICE_TOKEN_RE.finditer(chunk):
+        pos = m.start()
+        char = chunk[pos]
+        if char in '（(':
+            if stem_match is None:
+                paren = _DOC_ANSWER_PAREN_RE.match(chunk, pos)
+                if paren:
+                    if answer_match is None:
+                        answer_match = paren
+                    if pos > stem_start:
+                        stem_match = paren
+            continue
+        if answer_match is None or pos < answer_match.end() or char in found:
+            continue
+
+        # 每个字母取第一个能构成选项的位置
+        next_match = _DOC_LETTER_RE.search(chunk, pos + 2)
+        opt_content = _match_doc_option(chunk, pos, next_match.start() if next_match else end)
+        if opt_content is not None:
+            found.add(char)
+            if opt_content and len(opt_content) < 100:
+                options[char] = opt_content
+            if len(found) == 4 and stem_match is not None:
+                break
+
+    if not answer_match or not stem_match:
+        return None
+
+    # 题干：答案括号之前的部分，去掉题号
+    q_text = chunk[stem_start:stem_match.start()].strip()
+    q_text = _DOC_SPACE_RUN_RE.sub(' ', q_text)
+
+    if q_text and len(options) >= 2 and len(q_text) > 5:
+        return Question(
+            question=q_text,
+            type='单选题',
+            options=options,
+            answer=answer_match.group(1).upper(),
+            source=''
+        )
+    return None
+
+
+def _drain_doc_choices(text, final):
+    """
+    按题号切分选择题区块，返回 (题目列表, 未处理的剩余文本)
+    非最后一段时，最后一个题号之后的内容可能还不完整，留待与后续文本拼接
+    """
+    bounds = [0] + [m.start() for m in _DOC_CHOICE_SPLIT_RE.finditer(text) if m.start()]
+    if final:
+        bounds.append(len(text))
+    questions = []
+    for start, end in zip(bounds, bounds[1:]):
+        question = _parse_doc_choice_chunk(text[start:end])
+        if question:
+            questions.append(question)
+    return questions, text[bounds[-1]:]
+
+
+def _drain_doc_judgments(text, final):
+    """匹配判断题: 题号、题干。（√或×），返回 (题目列表, 最后一个匹配之后的剩余文本)"""
+    questions = []
+    pos = 0
+    for match in _DOC_JUDGMENT_RE.finditer(text):
+        pos = match.end()
+        q_num, q_text, raw_answer = match.groups()
+        answer = '对' if raw_answer == '√' else '错'
+        q_text = q_text.strip()
+        q_text = re.sub(r'\s+', ' ', q_text)
+        if not q_text.endswith(('。', '？', '！')):
+            q_text += '。'
+
+        if len(q_text) > 5:
+            questions.append(Question(
+                question=q_text,
+                type='判断题',
+                answer=answer,
+                source=''
+            ))
+    return questions, text[pos:]
+
+
+def _drain_doc_essays(text, final):
+    """匹配简答题: 题号、题干（问号结尾），返回 (题目列表, 最后一个匹配之后的剩余文本)"""
+    questions = []
+    pos = 0
+    for match in _DOC_ESSAY_RE.finditer(text):
+        pos = match.end()
+        q_num, q_text = match.groups()
+        q_text = q_text.strip()
+        q_text = re.sub(r'\s+', ' ', q_text)
+
+        if q_text and len(q_text) > 10:
+            questions.append(Question(
+                question=q_text,
+                type='简答题',
+                answer='',  # 简答题答案复杂，暂不提取
+                source=''
+            ))
+    return questions, text[pos:]
+
+
+# 填空题区块不提取
+_DOC_SECTION_PARSERS = {
+    'choice': _drain_doc_choices,
+    'judgment': _drain_doc_judgments,
+    'essay': _drain_doc_essays,
+}
+
+
+def iter_doc_file(file_path):
+    """
+    逐题产出旧版WPS文档中的题目
+    正文片段边读边切分区块，每个区块累积到一定长度就解析已完整的题目，
+    只保留末尾未完整的部分，内存占用与文档大小无关
+    """
+    try:
+        section, buffer = None, ''
+        drain_at = _DOC_READ_CHARS
+        for fragment_section, fragment in iter_doc_sections(iter_doc_text(file_path)):
+            if fragment_section != section:
+                if section in _DOC_SECTION_PARSERS:
+                    yield from _DOC_SECTION_PARSERS[section](buffer, True)[0]
+                section, buffer = fragment_section, ''
+                drain_at = _DOC_READ_CHARS
+            if section not in _DOC_SECTION_PARSERS:
+                continue
+            buffer += fragment
+            if len(buffer) >= drain_at:
+                parsed, buffer = _DOC_SECTION_PARSERS[section](buffer, False)
+                yield from parsed
+                # 剩余部分迟迟没有完整题目时按倍数放宽阈值，避免反复扫描同一段文本
+                drain_at = max(_DOC_READ_CHARS, len(buffer) * 2)
+        if section in _DOC_SECTION_PARSERS:
+            yield from _DOC_SECTION_PARSERS[section](buffer, True)[0]
+
+    except Exception as e:
+        report_parse_error(f'解析doc文件出错: {e}')
+        import traceback
+        traceback.print_exc()
+
+
+def parse_doc_file(file_path):
+    """解析旧版WPS文档"""
+    return list(iter_doc_file(file_path))
+
+
+# ========== 题目文本词法扫描 ==========
+# 一次扫描记录题号、答案标记、选项标记、填空占位和问号的位置，
+# 各题型解析器按位置切出题干、选项和答案，不再对同一段文本反复执行正则搜索
+_NUMBER_PREFIX_RE = re.compile(r'(\d+)([、.．:：\s]*)')
+_STRICT_NUMBER_RE = re.compile(r'\d+[、.．]\s*')
+# 以字符集开头，正则引擎可以直接跳到候选字符，再用后顾断言按首字符区分标记类型：
+# 分组1 答案标记 "答案：" / 分组2 选项标记 "A、" / 分组3-6 填空占位 "__" "（ ）" "( )" "【 】" / 分组7 问号
+_QUESTION_TOKEN_RE = re.compile(
+    r'[答A-L_（(【？?]'
+    r'(?:(?<=答)(案[：:])'
+    r'|(?<=[A-L])([、.．:：])'
+    r'|(?<=_)(_+)'
+    r'|(?<=（)(\s*）)'
+    r'|(?<=\()(\s*\))'
+    r'|(?<=【)(\s*】)'
+    r'|(?<=[？?])())'
+)
+
+# 以下模式都从标记之后锚定匹配，只检查标记附近的字符
+_FILL_ANSWER_PATTERNS = (
+    re.compile(r'\s*[（(]([^）)]+)[）)]'),
+    re.compile(r'\s*[（(](.+?)$'),
+    re.compile(r'\s*(.+?)$'),
+)
+_CHOICE_ANSWER_RE = re.compile(r'\s*[（(]\s*([A-Za-z,，\s]+)\s*[）)]')
+_JUDGMENT_ANSWER_RE = re.compile(r'\s*[（(]([√×对错]|正确|错误)[）)]')
+_TEXT_JUDGMENT_ANSWER_RE = re.compile(
+    r'\s*[（(]?\s*([√×对错TFYNtfyn]|正确|错误|TRUE|FALSE|Yes|No)\s*[）)]?', re.IGNORECASE)
+_OPTION_CONTENT_RE = re.compile(r'\s*([^\s]+(?:\s+[^\sA-L][^\s]*)*)')
+_OPTION_FOLLOW_RE = re.compile(r'\s*\S')
+_OPTION_SEPARATORS = '、.．:：'
+
+
+class QuestionTokens:
+    """
+    题目文本的扫描结果，所有位置都是原文本中的下标
+
+    number: 开头题号 (起点, 数字结束, 题号前缀结束)，无题号时为 None
+    answers/options/blanks/qmarks: 答案标记、选项标记、填空占位、问号的 (起点, 终点) 列表
+    题干由解析器取题号之后、首个答案或选项标记之前的部分
+    """
+    __slots__ = ('number', 'answers', 'options', 'blanks', 'qmarks')
+
+    def __init__(self):
+        self.number = None
+        self.answers = []
+        self.options = []
+        self.blanks = []
+        self.qmarks = []
+
+
+def tokenize_question(text):
+    """单遍扫描题目文本，返回 QuestionTokens"""
+    tokens = QuestionTokens()
+
+    number_match = _NUMBER_PREFIX_RE.match(text)
+    if number_match:
+        tokens.number = (0, number_match.end(1), number_match.end())
+
+    # 按分组序号分桶，与 _QUESTION_TOKEN_RE 中的分组顺序一致
+    blanks = tokens.blanks
+    buckets = (None, tokens.answers, tokens.options, blanks, blanks, blanks, blanks, tokens.qmarks)
+    for m in _QUESTION_TOKEN_RE.finditer(text):
+        buckets[m.lastindex].append(m.span())
+
+    return tokens
+
+
+def skip_question_number(text, start=0):
+    """跳过 start 处形如 "1、" / "1." / "1．" 的题号，返回正文起点"""
+    match = _STRICT_NUMBER_RE.match(text, start)
+    return match.end() if match else start
+
+
+def _match_after_marker(spans, pattern, text, start):
+    """依次尝试 start 之后的标记，返回第一个后面能匹配 pattern 的 (标记, 匹配结果)"""
+    for span in spans:
+        if span[0] < start:
+            continue
+        match = pattern.match(text, span[1])
+        if match:
+            return span, match
+    return None, None
+
+
+# ========== 流式读取 docx ==========
+# 直接从 zip 中增量解析正文 XML，不构建 python-docx 的对象模型；
+# 文本提取规则与 python-docx 的 Paragraph.text / _Cell.text / _Row.cells 保持一致
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_BODY = _W + 'body'
+_W_P = _W + 'p'
+_W_R = _W + 'r'
+_W_T = _W + 't'
+_W_BR = _W + 'br'
+_W_HYPERLINK = _W + 'hyperlink'
+_W_TBL = _W + 'tbl'
+_W_TR = _W + 'tr'
+_W_TC = _W + 'tc'
+_W_TRPR = _W + 'trPr'
+_W_TCPR = _W + 'tcPr'
+_W_GRID_BEFORE = _W + 'gridBefore'
+_W_GRID_SPAN = _W + 'gridSpan'
+_W_VMERGE = _W + 'vMerge'
+_W_VAL = _W + 'val'
+_W_TYPE = _W + 'type'
+# 除 w:t、w:br 外，run 中有文本含义的元素
+_DOCX_RUN_TEXT = {
+    _W + 'tab': '\t',
+    _W + 'ptab': '\t',
+    _W + 'cr': '\n',
+    _W + 'noBreakHyphen': '-',
+}
+
+
+def _docx_main_part(zf):
+    """从 _rels/.rels 找到主文档部件，默认为 word/document.xml"""
+    from lxml import etree
+    try:
+        rels = etree.fromstring(zf.read('_rels/.rels'))
+        for rel in rels:
+            if rel.get('Type', '').endswith('/officeDocument') and rel.get('Target'):
+                return rel.get('Target').lstrip('/')
+    except (KeyError, etree.XMLSyntaxError):
+        pass
+    return 'word/document.xml'
+
+
+def _docx_paragraph_text(p):
+    """段落文本：直接子级 w:r 以及 w:hyperlink 中的 w:r"""
+    parts = []
+    for child in p:
+        if child.tag == _W_R:
+            runs = (child,)
+        elif child.tag == _W_HYPERLINK:
+            runs = child.iterchildren(_W_R)
+        else:
+            continue
+        for run in runs:
+            for e in run:
+                if e.tag == _W_T:
+                    parts.append(e.text or '')
+                elif e.tag == _W_BR:
+                    # 只有换行符是 "\n"，分页符、分栏符不产生文本
+                    if e.get(_W_TYPE, 'textWrapping') == 'textWrapping':
+                        parts.append('\n')
+                elif e.tag in _DOCX_RUN_TEXT:
+                    parts.append(_DOCX_RUN_TEXT[e.tag])
+    return ''.join(parts)
+
+
+def _docx_int_val(parent, tag, default):
+    """读取 parent 下 tag 子元素的 w:val 整数值"""
+    if parent is not None:
+        e = parent.find(tag)
+        if e is not None:
+            try:
+                return int(e.get(_W_VAL))
+            except (TypeError, ValueError):
+                pass
+    return default
+
+
+def _docx_row_cells(tr, above):
+    """
+    按 row.cells 的规则展开一行：横向合并的单元格按跨列数重复，
+    纵向合并的后续单元格取上一行同一起始列的内容
+    above 为上一行 {起始列: (文本, 跨列数)}，返回 (单元格文本列表, 本行的映射)
+    """
+    offset = _docx_int_val(tr.find(_W_TRPR), _W_GRID_BEFORE, 0)
+    cells = []
+    current = {}
+    for tc in tr.iterchildren(_W_TC):
+        tc_pr = tc.find(_W_TCPR)
+        span = _docx_int_val(tc_pr, _W_GRID_SPAN, 1)
+        vmerge = tc_pr.find(_W_VMERGE) if tc_pr is not None else None
+        if vmerge is not None and vmerge.get(_W_VAL, 'continue') == 'continue':
+            # 上一行同一位置没有单元格时按空单元格处理
+            text, root_span = above.get(offset, ('', span))
+        else:
+            text = '\n'.join(_docx_paragraph_text(p) for p in tc.iterchildren(_W_P))
+            root_span = span
+        current[offset] = (text, root_span)
+        cells.extend([text] * root_span)
+        offset += span
+    return cells, current
+
+
+def _iter_docx_xml(source):
+    """
+    增量解析正文 XML（文件对象），按文档顺序产出 (表格序号, 单元格文本列表) 或 (None, 段落文本)
+    只包含正文顶层的段落和表格（与 doc.paragraphs / doc.tables 相同），
+    每处理完一行或一个段落就释放对应的 XML 节点
+    """
+    from lxml import etree
+    table_index = -1
+    current_table = None
+    above = {}
+    for _, elem in etree.iterparse(source, events=('end',), tag=(_W_P, _W_TR, _W_TBL),
+                                   remove_blank_text=True):
+        parent = elem.getparent()
+        if elem.tag == _W_TR:
+            if parent.tag != _W_TBL or parent.getparent().tag != _W_BODY:
+                continue
+            if parent is not current_table:
+                table_index += 1
+                current_table = parent
+                above = {}
+            cells, above = _docx_row_cells(elem, above)
+            yield table_index, cells
+        elif parent.tag != _W_BODY:
+            # 单元格中的段落和嵌套表格随所在行一起处理
+            continue
+        elif elem.tag == _W_P:
+            yield None, _docx_paragraph_text(elem)
+        else:
+            if elem is not current_table:
+                # 没有行的空表格也占一个表格序号
+                table_index += 1
+            current_table = None
+
+        elem.clear()
+        while elem.getprevious() is not None:
+            del parent[0]
+
+
+def iter_docx_body(file_path):
+    """流式读取 docx 正文，产出内容见 _iter_docx_xml"""
+    with zipfile.ZipFile(file_path) as zf:
+        with zf.open(_docx_main_part(zf)) as source:
+            yield from _iter_docx_xml(source)
+
+
+# ========== 处理 CRH6集团竞赛题库.docx ==========
+def parse_fill_blank_question(text, tokens=None, start=0):
+    """解析填空题"""
+    if tokens is None:
+        tokens = tokenize_question(text)
+    start = skip_question_number(text, start)
+
+    answer = ''
+    question = text[start:]
+
+    for pattern in _FILL_ANSWER_PATTERNS:
+        marker, answer_match = _match_after_marker(tokens.answers, pattern, text, start)
+        if answer_match:
+            question = text[start:marker[0]].strip()
+            answer = answer_match.group(1).strip()
+            break
+
+    if '__' in question:
+        question = re.sub(r'_{2,}', '____', question)
+    question = re.sub(r'\s{3,}', '____', question)
+
+    answers = re.split(r'[,，、;；]', answer)
+    answers = [a.strip() for a in answers if a.strip()]
+
+    return Question(
+        question=question,
+        type='定序填空题',
+        answers=answers,
+        raw_answer=answer
+    )
+
+
+def parse_choice_question(text, tokens=None, start=0):
+    """
+    解析选择/多选题
+    传入 tokens 时 text 须已规范化（由 parse_text_question 调用）
+    """
+    if tokens is None:
+        text = normalize_letters(text)
+        tokens = tokenize_question(text)
+    start = skip_question_number(text, start)
+
+    answer = ''
+    # 支持带逗号分隔的多选答案，如 (B,D) 或 (BD)
+    marker, answer_match = _match_after_marker(tokens.answers, _CHOICE_ANSWER_RE, text, start)
+    option_marks = [span[0] for span in tokens.options if span[0] >= start]
+    if answer_match:
+        # 提取答案并移除逗号、空格，只保留字母
+        raw_answer = answer_match.group(1)
+        answer = ''.join(c.upper() for c in raw_answer if c.isalpha())
+        cut_start, cut_end = marker[0], answer_match.end()
+        text_for_options = text[start:cut_start] + text[cut_end:]
+        # 选项标记位置换算到去掉答案后的文本
+        removed = cut_end - cut_start
+        before = [pos - start for pos in option_marks if pos < cut_start]
+        after = [pos - start - removed for pos in option_marks if pos >= cut_end]
+        # 去掉答案后首尾相接处可能拼出新的选项标记
+        joined = []
+        if cut_start - 1 >= start and 'A' <= text[cut_start - 1] <= 'L' \
+                and cut_end < len(text) and text[cut_end] in _OPTION_SEPARATORS:
+            joined = [cut_start - 1 - start]
+        option_marks = before + joined + after
+    else:
+        text_for_options = text[start:]
+        option_marks = [pos - start for pos in option_marks]
+
+    # 与按行拼接后的文本逐一对应：制表符展开、换行转为空格
+    options = {}
+    scan_pos = 0
+    for pos in option_marks:
+        if pos < scan_pos:
+            continue
+        content_match = _OPTION_CONTENT_RE.match(text_for_options, pos + 2)
+        if not content_match:
+            continue
+        scan_pos = content_match.end()
+        content = content_match.group(1).replace('\t', '  ').replace('\n', ' ').strip()
+        if content:
+            options[text_for_options[pos]] = content
+
+    if len(options) < 2:
+        for part in re.split(r'\s{2,}|\t|\n', text_for_options):
+            part = part.strip()
+            opt_match = re.match(r'([A-L])[、.．:：]\s*(.+)', part)
+            if opt_match:
+                letter = opt_match.group(1).upper()
+                content = opt_match.group(2).strip()
+                if content:
+                    options[letter] = content
+
+    if option_marks:
+        question = text_for_options[:option_marks[0]].strip()
+    else:
+        question = text_for_options.strip()
+
+    question = question.rstrip()
+    # 清理题干末尾可能残留的答案标记（支持带逗号的格式）
+    if '答案' in question:
+        question = re.sub(r'答案[：:]\s*[（(]?[A-Za-z,，\s]*[）)]?\s*$', '', question).strip()
+    # 清理可能残留的 ",X）" 格式
+    if question.endswith((')', '）')):
+        question = re.sub(r'[,，]\s*[A-Za-z]\s*[）)]\s*$', '', question).strip()
+
+    question_type = '多选题' if len(answer) > 1 else '单选题'
+
+    return Question(
+        question=question,
+        type=question_type,
+        options=options,
+        answer=answer
+    )
+
+
+def parse_judgment_question(text, tokens=None, start=0):
+    """解析判断题"""
+    if tokens is None:
+        tokens = tokenize_question(text)
+    start = skip_question_number(text, start)
+
+    marker, answer_match = _match_after_marker(tokens.answers, _JUDGMENT_ANSWER_RE, text, start)
+    if answer_match:
+        raw_answer = answer_match.group(1).strip()
+        question = text[start:marker[0]].strip()
+
+        if raw_answer in ['√', '对', '正确']:
+            answer = '对'
+        else:
+            answer = '错'
+    else:
+        question = text[start:].strip()
+        answer = ''
+
+    return Question(
+        question=question,
+        type='判断题',
+        answer=answer
+    )
+
+
+def parse_essay_question(text, tokens=None, start=0):
+    """解析简答题"""
+    if tokens is None:
+        tokens = tokenize_question(text)
+    start = skip_question_number(text, start)
+
+    body = text[start:]
+    stripped = body.strip()
+    # 第一个问号（相对于 body 的位置）
+    qmark = next((span[0] - start for span in tokens.qmarks if span[0] >= start), -1)
+
+    if '\n' in stripped:
+        # 多行：问号所在行及之前为题干，之后各行为答案
+        line_end = -1
+        if qmark >= 0:
+            line_end = stripped.find('\n', qmark - (len(body) - len(body.lstrip())))
+
+        if line_end >= 0:
+            question = stripped[:line_end].strip()
+            answer = stripped[line_end + 1:].strip()
+        elif qmark >= 0:
+            question = body[:qmark + 1].strip()
+            answer = body[qmark + 1:].strip()
+        else:
+            first_line, _, rest = stripped.partition('\n')
+            question = first_line.strip()
+            answer = rest.strip()
+    else:
+        if 0 <= qmark < len(body) - 1:
+            question = body[:qmark + 1].strip()
+            answer = body[qmark + 1:].strip()
+        else:
+            question = body.strip()
+            answer = ''
+
+    return Question(
+        question=question,
+        type='简答题',
+        answer=answer
+    )
+
+
+def iter_crh6_docx(file_path):
+    """逐题产出CRH6集团竞赛题库.docx中的题目"""
+    for table_index, cells in iter_docx_body(file_path):
+        # 只处理前三个表格，每行取第一个单元格
+        if table_index is None or table_index > 2 or not cells:
+            continue
+        text = cells[0].strip()
+        if not text:
+            continue
+
+        if table_index == 0:
+            # 表格0 - 填空题和选择题
+            has_option = any(marker in text for marker in ['A、', 'A.', 'A．', 'A：', 'A:', '\nA', '\tA'])
+
+            if has_option:
+                q = parse_choice_question(text)
+            else:
+                q = parse_fill_blank_question(text)
+        elif table_index == 1:
+            # 表格1 - 判断题
+            q = parse_judgment_question(text)
+        else:
+            # 表格2 - 简答题
+            q = parse_essay_question(text)
+
+        yield q
+
+
+def parse_crh6_docx(file_path):
+    """解析CRH6集团竞赛题库.docx"""
+    return list(iter_crh6_docx(file_path))
+
+
+# ========== 通用纯文本解析器 ==========
+_TEXT_ENCODINGS = ('utf-8', 'gb18030', 'utf-16', 'big5')
+_TEXT_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+_TEXT_BLOCK_SIZE = 65536
+# 以题号开头的行：1. / 1、/ 1) / (1) / 【1】等格式
+_TEXT_BOUNDARY_RE = re.compile(r'\s*(?:\d+[、.．:：\)\)]\s|\(\d+\)|\【\d+\】)')
+# Word 段落只按 1. / 1、/ 1) 等数字题号切分
+_DOCX_BOUNDARY_RE = re.compile(r'\s*\d+[、.．:：\)\)]\s')
+
+
+def detect_encoding(file_path, sample_size=65536):
+    """
+    检测文本文件编码
+
+    有 BOM 时直接按 BOM 判断；否则按块把文件内容送入各候选编码的增量解码器，
+    淘汰解码失败的编码。增量解码不会因采样末尾截断多字节字符而误判；
+    开头的纯 ASCII 块各编码都能解码，不计入采样
+
+    Args:
+        file_path: 文件路径
+        sample_size: 出现非 ASCII 内容后的采样字节数
+
+    Returns:
+        检测到的编码名称
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            head = f.read(3)
+            for bom, encoding in _TEXT_BOMS:
+                if head.startswith(bom):
+                    return encoding
+            f.seek(0)
+
+            decoders = [(enc, codecs.getincrementaldecoder(enc)()) for enc in _TEXT_ENCODINGS]
+            sampled = 0
+            while decoders and sampled < sample_size:
+                block = f.read(_TEXT_BLOCK_SIZE)
+                if block and not sampled and block.isascii():
+                    continue
+                sampled += len(block)
+
+                alive = []
+                for enc, decoder in decoders:
+                    try:
+                        decoder.decode(block, not block)
+                        alive.append((enc, decoder))
+                    except (UnicodeDecodeError, UnicodeError):
+                        continue
+                decoders = alive
+                if not block:
+                    break
+    except IOError:
+        return 'utf-8'
+
+    return decoders[0][0] if decoders else 'utf-8'
+
+
+def parse_text_question(text):
+    """
+    智能解析单个题目文本，自动检测题型
+    支持格式:
+    - 选择题: 带A、B、C、D选项
+    - 判断题: 答案为√/×/对/错/T/F等
+    - 填空题: 带____或空格占位符
+    - 简答题: 其他
+    """
+    text = normalize_text(text.strip())
+    if not text or len(text) < 5:
+        return None
+
+    tokens = tokenize_question(text)
+
+    # 去除题号
+    start = 0
+    if tokens.number and tokens.number[2] > tokens.number[1]:
+        start = tokens.number[2]
+
+    # 检测是否有选项标志 → 选择题
+    has_options = any(
+        span[0] >= start and _OPTION_FOLLOW_RE.match(text, span[1])
+        for span in tokens.options
+    )
+
+    if has_options:
+        return parse_choice_question(text, tokens, start)
+
+    # 检测是否有判断题答案标志
+    marker, judgment_match = _match_after_marker(tokens.answers, _TEXT_JUDGMENT_ANSWER_RE, text, start)
+    if judgment_match:
+        question = text[start:marker[0]].strip()
+        answer = normalize_judgment_answer(judgment_match.group(1))
+        return Question(
+            question=question,
+            type='判断题',
+            answer=answer
+        )
+
+    # 检测是否有填空标志
+    has_blank = any(span[0] >= start for span in tokens.blanks)
+    if has_blank:
+        return parse_fill_blank_question(text, tokens, start)
+
+    # 检测是否有问号 → 可能是简答题
+    if any(span[0] >= start for span in tokens.qmarks):
+        return parse_essay_question(text, tokens, start)
+
+    # 默认作为简答题处理
+    return Question(
+        question=text[start:],
+        type='简答题',
+        answer=''
+    )
+
+
+def _has_numbered_lines(file_path, encoding):
+    """第一行之后是否有以题号开头的行，读到第一个即返回"""
+    with open(file_path, 'r', encoding=encoding) as f:
+        next(f, None)
+        return any(_TEXT_BOUNDARY_RE.match(normalize_text(line)) for line in f)
+
+
+def split_numbered_lines(lines, boundary_re):
+    """把行流切分为题目文本块：第一行之后，匹配 boundary_re 的行开始新的一块"""
+    chunk = []
+    for line in lines:
+        if chunk and boundary_re.match(line):
+            yield ''.join(chunk)
+            chunk = []
+        chunk.append(line)
+    if chunk:
+        yield ''.join(chunk)
+
+
+def _iter_line_chunks(lines, numbered):
+    """
+    把规范化后的行流切分为题目文本块
+    有题号行时，读到下一个题号行就产出上一题；否则按空行分隔
+    """
+    if numbered:
+        yield from split_numbered_lines(lines, _TEXT_BOUNDARY_RE)
+        return
+
+    chunk = []
+    for line in lines:
+        if not line.isspace():
+            chunk.append(line)
+        elif chunk:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def iter_text_chunks(file_path, encoding):
+    """
+    逐行读取文本文件，逐个产出题目文本块
+    整个文件都没有题号行时按空行分隔
+    """
+    numbered = _has_numbered_lines(file_path, encoding)
+    with open(file_path, 'r', encoding=encoding) as f:
+        yield from _iter_line_chunks((normalize_text(line) for line in f), numbered)
+
+
+def _parse_text_chunk(chunk):
+    """解析一个题目文本块，不是有效题目时返回 None"""
+    chunk = chunk.strip()
+    if not chunk or len(chunk) < 10:
+        return None
+
+    q = parse_text_question(chunk)
+    if q and q.get('question'):
+        return q
+    return None
+
+
+def iter_text_file(file_path, workers=1):
+    """
+    逐题产出纯文本文件（.txt）中的题目
+    支持多种题目分隔格式:
+    - 数字编号: 1. / 1、/ 1) / (1)
+    - 空行分隔
+    - 特殊标记: 【题目】等
+
+    workers > 1 且文件较大时按题目边界分片，用多个进程并行解析
+    """
+    encoding = detect_encoding(file_path)
+    if workers > 1 and encoding in _SHARD_TEXT_ENCODINGS \
+            and _file_size(file_path) >= _SHARD_MIN_BYTES * 2:
+        yield from _iter_text_file_sharded(file_path, encoding, workers)
+        return
+
+    try:
+        for chunk in iter_text_chunks(file_path, encoding):
+            q = _parse_text_chunk(chunk)
+            if q:
+                yield q
+    except (IOError, UnicodeError) as e:
+        report_parse_error(f'读取文本文件出错: {e}')
+
+
+def parse_text_file(file_path, workers=1):
+    """解析纯文本文件（.txt）"""
+    return list(iter_text_file(file_path, workers))
+
+
+def iter_generic_excel(file_path):
+    """
+    通用Excel解析器（流式）
+    尝试自动检测Excel文件结构并逐行产出题目
+    """
+    try:
+        wb = open_workbook_readonly(file_path)
+    except Exception as e:
+        report_parse_error(f'读取Excel文件出错: {e}')
+        return
+
+    try:
+        for sheet_name in wb.sheetnames:
+            ws = wb[sheet_name]
+            rows = iter_sheet_rows(ws)
+
+            # 尝试检测表头行：只需缓存前4行
+            head_rows = []
+            for row_idx, values in rows:
+                head_rows.append((row_idx, values))
+                if len(head_rows) >= 4:
+                    break
+
+            # 跳过空表
+            if len(head_rows) < 2:
+                continue
+
+            header_row = 1
+            for row_idx, values in head_rows:
+                cell_val = row_value(values, 1)
+                if cell_val and ('题' in str(cell_val) or '问题' in str(cell_val)):
+                    header_row = row_idx
+                    break
+
+            # 遍历数据行（先处理缓存的表头区域，再继续流式读取）
+            data_rows = itertools.chain(
+                (item for item in head_rows if item[0] > header_row), rows)
+            for row_idx, values in data_rows:
+                # 尝试从第一列或第二列获取题干
+                question_text = None
+                for col in [1, 2, 3]:
+                    val = row_value(values, col)
+                    if val and len(str(val).strip()) > 5:
+                        question_text = str(val).strip()
+                        break
+
+                if not question_text:
+                    continue
+
+                # 尝试组合所有单元格内容
+                row_content = []
+                for val in values[:19]:
+                    if val:
+                        row_content.append(str(val).strip())
+
+                full_text = ' '.join(row_content)
+                q = parse_text_question(full_text)
+                if q and q.get('question'):
+                    yield q
+    finally:
+        wb.close()
+
+
+def parse_generic_excel(file_path):
+    """
+    通用Excel解析器
+    尝试自动检测Excel文件结构并解析题目
+    """
+    return list(iter_generic_excel(file_path))
+
+
+def _iter_joined_lines(texts):
+    """逐行产出 '\\n'.join(texts) 的内容，除最后一行外保留行尾换行符"""
+    pending = None
+    for text in texts:
+        for line in text.split('\n'):
+            if pending is not None:
+                yield pending + '\n'
+            pending = line
+    if pending is not None:
+        yield pending
+
+
+def _parse_docx_row(cells):
+    """表格一行的各单元格拼接为一题，不是有效题目时返回 None"""
+    text = ' '.join(cell.strip() for cell in cells if cell.strip())
+    if text and len(text) > 10:
+        q = parse_text_question(text)
+        if q and q.get('question'):
+            return q
+    return None
+
+
+def _parse_docx_chunk(chunk):
+    """解析按题号切分出的段落文本块，不是有效题目时返回 None"""
+    chunk = chunk.strip()
+    if chunk and len(chunk) > 10:
+        q = parse_text_question(chunk)
+        if q and q.get('question'):
+            return q
+    return None
+
+
+def iter_generic_docx(file_path, workers=1):
+    """
+    通用Word文档解析器，逐题产出
+    优先从表格中提取（每行各单元格拼接为一题）；表格中没有题目时，按题号切分段落文本
+    workers > 1 且正文较大时按题目边界分片，用多个进程并行解析
+    """
+    if workers > 1:
+        yield from _iter_generic_docx_sharded(file_path, workers)
+        return
+
+    found_in_tables = False
+    paragraphs = []
+
+    try:
+        for table_index, content in iter_docx_body(file_path):
+            if table_index is None:
+                # 段落只在表格没有题目时使用
+                text = content.strip()
+                if text and not found_in_tables:
+                    paragraphs.append(text)
+                continue
+
+            q = _parse_docx_row(content)
+            if q:
+                found_in_tables = True
+                paragraphs = []
+                yield q
+    except Exception as e:
+        report_parse_error(f'读取Word文档出错: {e}')
+        return
+
+    if found_in_tables:
+        return
+
+    # 如果表格没有内容，从段落中提取，按题号分割
+    for chunk in split_numbered_lines(_iter_joined_lines(paragraphs), _DOCX_BOUNDARY_RE):
+        q = _parse_docx_chunk(chunk)
+        if q:
+            yield q
+
+
+def parse_generic_docx(file_path, workers=1):
+    """
+    通用Word文档解析器
+    尝试解析各种格式的docx文件
+    """
+    return list(iter_generic_docx(file_path, workers))
+
+
+# ========== 大文件分片并行解析 ==========
+# 单个大文件按题目边界切成若干分片，在进程池中并行解析后按原顺序合并；
+# 分片总是从一道题的开头开始，合并结果与串行解析相同
+_SHARD_MIN_BYTES = 4 * 1024 * 1024
+# 换行符不会出现在多字节字符内部的编码，可以直接按字节切分
+_SHARD_TEXT_ENCODINGS = ('utf-8', 'utf-8-sig', 'gb18030', 'big5')
+_DOCX_W_NS = b'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+_DOCX_DOCUMENT_RE = re.compile(rb'<w:document[\s>]')
+_DOCX_BODY_START_RE = re.compile(rb'<w:body(?:\s[^>]*)?>')
+_DOCX_CUT_RE = re.compile(rb'</w:(?:p|tbl|tr)>')
+_DOCX_ROW_START_RE = re.compile(rb'\s*<w:tr[\s>]')
+_DOCX_NESTED_TABLE_RE = re.compile(rb'<w:tbl[\s>]')
+_DOCX_VMERGE_CONTINUE_RE = re.compile(rb'<w:vMerge(?![^>]*w:val="restart")[^>]*>')
+
+
+def _shard_size(total_bytes, workers):
+    """分片大小：每个进程大约分到4片，平衡各进程的负载"""
+    return max(_SHARD_MIN_BYTES, total_bytes // (workers * 4))
+
+
+def map_ordered(func, items, workers):
+    """
+    在进程池中对 items 逐个执行 func，按输入顺序产出结果
+    在途任务最多为进程数的两倍，items 可以边生成边提交
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = collections.deque()
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _iter_text_shards(mm, encoding, numbered, shard_bytes):
+    """
+    产出文本文件各分片的 (起点, 终点) 字节偏移
+    有题号行时在题号行之前切分，否则在空行之后切分
+    """
+    size = len(mm)
+    start = 0
+    while start < size:
+        cut = size
+        pos = mm.find(b'\n', start + shard_bytes - 1)
+        while 0 <= pos < size - 1:
+            line_start = pos + 1
+            pos = mm.find(b'\n', line_start)
+            line_end = pos + 1 if pos >= 0 else size
+            text = mm[line_start:line_end].decode(encoding, 'replace')
+            if numbered:
+                # 按文本模式的换行规则取第一行
+                head, sep, _ = text.replace('\r\n', '\n').replace('\r', '\n').partition('\n')
+                if _TEXT_BOUNDARY_RE.match(normalize_text(head + sep)):
+                    cut = line_start
+                    break
+            elif text.isspace():
+                cut = line_end
+                break
+        yield start, cut
+        start = cut
+
+
+def _parse_text_shard(shard):
+    """解析文本文件的一个分片，返回 (题目列表, 出错信息)"""
+    file_path, encoding, start, end, numbered = shard
+    questions = []
+    try:
+        with open(file_path, 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start)
+        lines = (normalize_text(line) for line in io.TextIOWrapper(io.BytesIO(data), encoding=encoding))
+        for chunk in _iter_line_chunks(lines, numbered):
+            q = _parse_text_chunk(chunk)
+            if q:
+                questions.append(q)
+    except (IOError, UnicodeError) as e:
+        return questions, str(e)
+    return questions, None
+
+
+def _iter_text_file_sharded(file_path, encoding, workers):
+    """用 mmap 找出分片边界，多进程解析各分片，逐题产出"""
+    try:
+        numbered = _has_numbered_lines(file_path, encoding)
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            shard_bytes = _shard_size(len(mm), workers)
+            shards = [(file_path, encoding, start, end, numbered)
+                      for start, end in _iter_text_shards(mm, encoding, numbered, shard_bytes)]
+    except (IOError, UnicodeError) as e:
+        report_parse_error(f'读取文本文件出错: {e}')
+        return
+
+    for questions, error in map_ordered(_parse_text_shard, shards, workers):
+        yield from questions
+        if error:
+            report_parse_error(f'读取文本文件出错: {error}')
+            return
+
+
+def _docx_depth_delta(buf, start, end):
+    """buf[start:end] 中 XML 元素嵌套深度的变化：开始标签 - 结束标签 - 自闭合标签"""
+    closes = buf.count(b'</', start, end)
+    opens = buf.count(b'<', start, end) - closes - buf.count(b'<?', start, end) - buf.count(b'<!', start, end)
+    return opens - closes - buf.count(b'/>', start, end)
+
+
+def _docx_row_cut_ok(buf, pos, eof):
+    """
+    顶层表格中一行结束的位置 pos 能否切分：后面必须紧接着新的一行，
+    且该行不含纵向合并的后续单元格（其内容要从上一行取）或嵌套表格
+    数据不够判断时返回 None
+    """
+    row_end = buf.find(b'</w:tr>', pos)
+    if row_end < 0:
+        return False if eof else None
+    row = _DOCX_ROW_START_RE.match(buf, pos)
+    if not row:
+        return False
+    return not (_DOCX_NESTED_TABLE_RE.search(buf, row.end(), row_end)
+                or _DOCX_VMERGE_CONTINUE_RE.search(buf, row.end(), row_end))
+
+
+def _iter_docx_shards(source, shard_bytes):
+    """
+    把正文 XML 切成若干个完整的 XML 文档，每个包含一段连续的顶层段落和表格
+    切分点在顶层元素之间或顶层表格的两行之间，在表格中间切开时给两边补上表格标签
+    无法识别文档结构时整体作为一个分片
+    """
+    buf = source.read(shard_bytes)
+    body = _DOCX_BODY_START_RE.search(buf)
+    if not body or _DOCX_W_NS not in buf[:body.start()] \
+            or not _DOCX_DOCUMENT_RE.search(buf, 0, body.start()):
+        yield buf + source.read()
+        return
+
+    header = buf[:body.end()]
+    footer = b'</w:body></w:document>'
+    prefix = header
+    buf = buf[body.end():]
+    depth = 0       # buf[:counted] 结束处相对 w:body 的嵌套深度
+    counted = 0
+    search = shard_bytes
+    eof = False
+    while True:
+        cut = None
+        for match in _DOCX_CUT_RE.finditer(buf, min(search, len(buf))):
+            end = match.end()
+            depth += _docx_depth_delta(buf, counted, end)
+            counted = end
+            search = end
+            if depth == 0:
+                cut = end
+            elif depth == 1 and match.group() == b'</w:tr>':
+                ok = _docx_row_cut_ok(buf, end, eof)
+                if ok is None:
+                    # 读入更多数据后从这里重新判断
+                    search = match.start()
+                    break
+                if ok:
+                    cut = end
+            if cut is not None:
+                break
+
+        if cut is None:
+            block = b'' if eof else source.read(shard_bytes)
+            if block:
+                buf += block
+            elif eof:
+                yield prefix + buf
+                return
+            else:
+                eof = True
+            continue
+
+        in_table = depth == 1
+        yield prefix + buf[:cut] + (b'</w:tbl>' if in_table else b'') + footer
+        prefix = header + (b'<w:tbl>' if in_table else b'')
+        buf = buf[cut:]
+        counted = 0
+        search = shard_bytes
+
+
+def _parse_docx_shard(xml):
+    """
+    解析 docx 正文的一个分片，返回 (表格题目列表, 段落结果)
+    分片中有表格题目或没有段落时段落结果为 None，否则为
+    (首块是否接续上一分片, 首块文本, 中间各块的题目, 最后至多两块的文本)，
+    首尾的块由主进程与相邻分片合并后解析。分片内每一行都按后面还有内容处理（带换行符）
+    """
+    table_questions = []
+    paragraphs = []
+    for table_index, content in _iter_docx_xml(io.BytesIO(xml)):
+        if table_index is None:
+            text = content.strip()
+            if text and not table_questions:
+                paragraphs.append(text)
+            continue
+
+        q = _parse_docx_row(content)
+        if q:
+            table_questions.append(q)
+            paragraphs = []
+
+    if table_questions or not paragraphs:
+        return table_questions, None
+
+    paragraphs.append('')
+    chunks = list(split_numbered_lines(_iter_joined_lines(paragraphs), _DOCX_BOUNDARY_RE))
+    first_line = ''.join(chunks[0].partition('\n')[:2])
+    continues = not _DOCX_BOUNDARY_RE.match(first_line)
+    tail_start = max(1, len(chunks) - 2)
+    questions = [q for q in map(_parse_docx_chunk, chunks[1:tail_start]) if q]
+    return [], (continues, chunks[0], questions, chunks[tail_start:])
+
+
+def _docx_part_has_tables(zf, part):
+    """正文 XML 中是否有表格；逐块解压查找，不把正文载入内存"""
+    tail = b''
+    with zf.open(part) as source:
+        while True:
+            block = source.read(_SHARD_MIN_BYTES)
+            if not block:
+                return False
+            if _DOCX_NESTED_TABLE_RE.search(tail + block):
+                return True
+            tail = block[-7:]  # 与下一块拼接，识别跨块的 "<w:tbl"
+
+
+def _iter_docx_shard_questions(results, has_tables):
+    """
+    按顺序合并各分片的结果，逐题产出
+    正文没有表格时段落题目随分片结果陆续产出；有表格时表格题目随到随产出，
+    段落结果与串行解析一样暂存到确定表格中没有题目为止，出现表格题目后即丢弃
+    """
+    if has_tables:
+        held = []
+        found_in_tables = False
+        for table_questions, paragraph_result in results:
+            if table_questions:
+                found_in_tables = True
+                held = []
+                yield from table_questions
+            elif not found_in_tables:
+                held.append(paragraph_result)
+        if found_in_tables:
+            return
+        paragraph_results = held
+    else:
+        paragraph_results = (paragraph_result for _, paragraph_result in results)
+
+    # 段落按题号切块：分片末尾的块可能延续到下一分片，拼接后再解析
+    pending = []
+    for paragraph_result in paragraph_results:
+        if paragraph_result is None:
+            continue
+        continues, head, questions, tail = paragraph_result
+        if continues and pending:
+            pending[-1] += head
+        else:
+            pending.append(head)
+
+        if tail:
+            # 分片内后面还有块，之前的块都已完整；保留最后两块，供全文末行合并
+            keep = len(pending) - (2 - len(tail))
+            for chunk in pending[:keep]:
+                q = _parse_docx_chunk(chunk)
+                if q:
+                    yield q
+            yield from questions
+            pending = pending[keep:] + tail
+        else:
+            while len(pending) > 2:
+                q = _parse_docx_chunk(pending.pop(0))
+                if q:
+                    yield q
+
+    # 全文最后一行后面没有换行符，不带换行符不构成题号行时仍属于上一块
+    if len(pending) >= 2 and pending[-1].count('\n') == 1 \
+            and not _DOCX_BOUNDARY_RE.match(pending[-1].rstrip('\n')):
+        last = pending.pop()
+        pending[-1] += last
+    for chunk in pending:
+        q = _parse_docx_chunk(chunk)
+        if q:
+            yield q
+
+
+def _iter_generic_docx_sharded(file_path, workers):
+    """
+    按题目边界切分正文 XML，多进程解析各分片，合并结果与 iter_generic_docx 相同
+    题目随分片结果陆续产出，不等全部分片解析完
+    """
+    from lxml import etree
+    emitted = 0
+    try:
+        with zipfile.ZipFile(file_path) as zf:
+            part = _docx_main_part(zf)
+            size = zf.getinfo(part).file_size
+            if size >= _SHARD_MIN_BYTES * 2:
+                has_tables = _docx_part_has_tables(zf, part)
+                with zf.open(part) as source:
+                    shards = _iter_docx_shards(source, _shard_size(size, workers))
+                    results = map_ordered(_parse_docx_shard, shards, workers)
+                    for q in _iter_docx_shard_questions(results, has_tables):
+                        emitted += 1
+                        yield q
+                return
+    except etree.XMLSyntaxError:
+        # 切分点判断失误（如属性值中含有 "/>"）导致分片不完整时，退回串行解析，
+        # 已产出的题目与串行解析的前面部分相同，跳过这些题目
+        pass
+    except Exception as e:
+        report_parse_error(f'读取Word文档出错: {e}')
+        return
+
+    yield from itertools.islice(iter_generic_docx(file_path), emitted, None)
+
+
+def get_parser_for_file(file_path):
+    """
+    根据文件扩展名返回合适的解析器
+    优先返回特定解析器，否则返回通用解析器
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    base_name = os.path.basename(file_path).lower()
+
+    # 特定文件使用特定解析器
+    if '中级' in base_name and ext == '.xlsx':
+        return parse_mid_level_excel
+    elif '2024' in base_name and '汇总' in base_name and ext == '.xlsx':
+        return parse_2024_summary_excel
+    elif 'crh6' in base_name and ext == '.docx':
+        return parse_crh6_docx
+    elif ext == '.doc':
+        return parse_doc_file
+    elif ext == '.tqb':
+        return parse_question_bank
+
+    # 通用解析器
+    if ext == '.xlsx':
+        return parse_generic_excel
+    elif ext == '.docx':
+        return parse_generic_docx
+    elif ext == '.txt':
+        return parse_text_file
+    elif ext == '.doc':
+        return parse_doc_file
+
+    return None
+
+
+# ========== 输出格式注册 ==========
+# 输出格式名称 -> Emitter(输出文件后缀, 写出函数, 说明, 建表函数, 行构造函数, 扩展名, 写入器工厂, 题型叫法)
+Emitter = collections.namedtuple('Emitter',
+                                 'suffix write description open_sheet build_row extension open_sink type_labels',
+                                 defaults=('.xlsx', None, None))
+EMITTERS = {}
+DEFAULT_TARGETS = ('motibang',)
+
+
+def register_emitter(name, suffix, description, open_sheet, build_row, extension='.xlsx', open_sink=None,
+                     type_labels=None):
+    """
+    注册输出格式的装饰器
+
+    写出函数签名为 func(questions, output_path)，返回写入的题目数量；
+    输出文件名为 原文件名 + suffix + extension。
+    open_sheet(wb, row_count) 在只写工作簿中建表、设置列宽并写入表头，返回工作表；
+    build_row(q) 返回一道题对应的行，process_file 的单次遍历流水线直接使用这两个函数逐题写入。
+    不输出 Excel 的格式提供 open_sink(output_path, row_count)，返回带 append/save 的逐题写入器。
+    type_labels 为 {题型: 该格式的叫法}，第一个输出格式的叫法用于控制台的题型统计和重复题报告
+    """
+    def decorator(func):
+        EMITTERS[name] = Emitter(suffix, func, description, open_sheet, build_row, extension, open_sink,
+                                 type_labels)
+        return func
+    return decorator
+
+
+def open_emitter_sink(emitter, output_path, row_count=None):
+    """按输出格式创建逐题写入器"""
+    if emitter.open_sink is not None:
+        return emitter.open_sink(output_path, row_count)
+    return _WorkbookSink(output_path, emitter.open_sheet, emitter.build_row, row_count)
+
+
+def _stream_header_row(ws, headers):
+    """只写模式的表头行，表头加粗"""
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    row = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = Font(bold=True)
+        row.append(cell)
+    return row
+
+
+def _set_stream_dimension(ws, last_column, row_count):
+    """
+    只写模式的工作表默认不输出 <dimension>；行数已知时按普通模式的规则补上，
+    使输出与逐个单元格写入的工作簿一致
+    """
+    ws.calculate_dimension = lambda: f'A1:{last_column}{row_count}'
+
+
+class _WorkbookSink:
+    """
+    只写模式工作簿的逐题写入器
+
+    写完的行直接写入磁盘；单次遍历流水线中每道题同时追加到各输出格式的写入器，
+    题目列表无需整体驻留内存。未调用 save 时不生成输出文件
+    """
+
+    def __init__(self, output_path, open_sheet, build_row, row_count=None):
+        import openpyxl
+        self.output_path = output_path
+        self.build_row = build_row
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.sheet = open_sheet(self.workbook, row_count)
+        self.count = 0
+
+    def append(self, q):
+        self.sheet.append(self.build_row(q))
+        self.count += 1
+
+    def save(self):
+        self.workbook.save(self.output_path)
+        print(f'已保存到: {self.output_path}')
+        return self.count
+
+
+def write_workbook(questions, output_path, open_sheet, build_row):
+    """按给定的建表和行构造函数写出题目，questions 有长度时写入工作表尺寸"""
+    row_count = len(questions) if hasattr(questions, '__len__') else None
+    sink = _WorkbookSink(output_path, open_sheet, build_row, row_count)
+    for q in questions:
+        sink.append(q)
+    return sink.save()
+
+
+# ========== 生成磨题帮Excel输出 ==========
+# 磨题帮表头（基于template1格式）
+_MOTIBANG_HEADERS = ['题干', '题型', '选择项1', '选择项2', '选择项3', '选择项4', '选择项5',
+                     '选择项6', '选择项7', '选择项8', '选择项9', '选择项10', '答案', '解析', '得分']
+
+
+def _open_motibang_sheet(wb, row_count=None):
+    """创建磨题帮工作表并写入表头；row_count 为题目数，未知时为 None"""
+    ws = wb.create_sheet('题库')
+
+    # 调整列宽（只写模式下须在写入第一行之前设置）
+    ws.column_dimensions['A'].width = 60  # 题干
+    ws.column_dimensions['B'].width = 10  # 题型
+    for i, col in enumerate('CDEFGHIJKL'):
+        ws.column_dimensions[col].width = 15  # 选项
+    ws.column_dimensions['M'].width = 15  # 答案
+    ws.column_dimensions['N'].width = 30  # 解析
+    ws.column_dimensions['O'].width = 8   # 得分
+    if row_count is not None:
+        _set_stream_dimension(ws, 'O', row_count + 1)
+
+    # 添加表头
+    ws.append(_stream_header_row(ws, _MOTIBANG_HEADERS))
+    return ws
+
+
+def motibang_row(q):
+    """一道题对应的磨题帮数据行"""
+    q_type = q.get('type', '')
+    row = [None] * len(_MOTIBANG_HEADERS)
+
+    # 题干
+    row[0] = q.get('question', '')
+
+    # 题型转换为磨题帮格式
+    if q_type in ['单选题', '多选题']:
+        row[1] = '选择题'
+    elif q_type == '判断题':
+        row[1] = '判断题'
+    elif q_type in ['填空题', '定序填空题', '不定序填空题']:
+        row[1] = '填空题'
+    elif q_type == '简答题':
+        row[1] = '简答题'
+    else:
+        row[1] = q_type
+
+    if q_type in ['单选题', '多选题']:
+        # 选择题选项
+        sorted_options = [(k, v) for k, v in option_items(q) if v]
+
+        # 写入选项（从列3开始）
+        for i, (_, content) in enumerate(sorted_options[:10]):
+            row[2 + i] = content
+
+        # 答案映射
+        original_answer = q.get('answer', '')
+        if original_answer:
+            old_letters = [k for k, _ in sorted_options]
+            option_letters = 'ABCDEFGHIJ'
+            old_to_new = {}
+            for i, old_letter in enumerate(old_letters):
+                if i < len(option_letters):
+                    old_to_new[old_letter] = option_letters[i]
+
+            new_answer = ''
+            for char in original_answer:
+                if char in old_to_new:
+                    new_answer += old_to_new[char]
+                elif char.upper() in old_to_new:
+                    new_answer += old_to_new[char.upper()]
+
+            row[12] = new_answer if new_answer else original_answer
+
+    elif q_type == '判断题':
+        # 判断题答案直接写入
+        row[12] = q.get('answer', '')
+
+    elif q_type in ['填空题', '定序填空题']:
+        # 填空题：答案用||分隔
+        answers = q.get('answers', [])
+        raw_answer = q.get('raw_answer', '')
+        if answers:
+            row[12] = '||'.join(answers)
+        elif raw_answer:
+            # 将各种分隔符统一为||
+            row[12] = re.sub(r'[,，、;；]', '||', raw_answer)
+
+    elif q_type == '简答题':
+        # 简答题答案
+        row[12] = q.get('answer', '')
+
+    return row
+
+
+# 磨题帮只有填空题一种，原磨题帮脚本的统计和重复题报告中也都称为填空题
+_MOTIBANG_TYPE_LABELS = {'定序填空题': '填空题', '不定序填空题': '填空题'}
+
+
+@register_emitter('motibang', '_磨题帮', '磨题帮Excel导入模板', _open_motibang_sheet, motibang_row,
+                  type_labels=_MOTIBANG_TYPE_LABELS)
+def convert_to_motibang_excel(questions, output_path):
+    """
+    将题目转换为磨题帮Excel格式
+    使用只写模式逐行追加，写完的行直接写入磁盘，内存占用不随题目数量增长
+    """
+    return write_workbook(questions, output_path, _open_motibang_sheet, motibang_row)
+
+
+# ========== 生成刷题搭档Excel输出 ==========
+_SHUATIDADANG_HEADERS = ['题目（必填）', '题型（必填）', '选项A', '选项B', '选项C', '选项D',
+                         '选项E', '选项F', '选项G', '选项H', '选项I', '选项J', '选项K', '选项L',
+                         '正确答案（必填）', '解析', '难易', '章节', '子章节']
+
+
+def _open_shuatidadang_sheet(wb, row_count=None):
+    """创建刷题搭档工作表并写入说明行和表头；row_count 为题目数，未知时为 None"""
+    ws = wb.create_sheet('导入题目')
+
+    # 调整列宽（只写模式下须在写入第一行之前设置）
+    ws.column_dimensions['A'].width = 60
+    ws.column_dimensions['B'].width = 12
+    for col in 'CDEFGHIJKLMN':
+        ws.column_dimensions[col].width = 20
+    ws.column_dimensions['O'].width = 30
+    ws.column_dimensions['Q'].width = 10
+    ws.column_dimensions['R'].width = 15
+    if row_count is not None:
+        _set_stream_dimension(ws, 'S', row_count + 2)
+
+    # 添加说明行
+    ws.append(['导入说明\n仔细阅读：在编辑试题之前，请认真查看本说明。导入时可直接操作，无需删除此部分。\n表头要求：'])
+
+    # 添加表头
+    ws.append(_stream_header_row(ws, _SHUATIDADANG_HEADERS))
+    return ws
+
+
+def shuatidadang_row(q):
+    """一道题对应的刷题搭档数据行"""
+    q_type = q.get('type', '')
+    row = [None] * len(_SHUATIDADANG_HEADERS)
+
+    row[0] = q.get('question', '')
+    row[1] = q_type
+
+    if q_type in ['单选题', '多选题']:
+        sorted_options = [(k, v) for k, v in option_items(q) if v]
+
+        new_options = {}
+        option_letters = 'ABCDEFGHIJKL'
+        for i, (_, content) in enumerate(sorted_options):
+            if i < len(option_letters):
+                new_options[option_letters[i]] = content
+
+        for i, letter in enumerate(option_letters):
+            if letter in new_options:
+                row[2 + i] = new_options[letter]
+
+        original_answer = q.get('answer', '')
+        if original_answer:
+            old_to_new = {}
+            old_letters = [k for k, _ in sorted_options]
+            for i, old_letter in enumerate(old_letters):
+                if i < len(option_letters):
+                    old_to_new[old_letter] = option_letters[i]
+
+            new_answer = ''
+            for char in original_answer:
+                if char in old_to_new:
+                    new_answer += old_to_new[char]
+                elif char.upper() in old_to_new:
+                    new_answer += old_to_new[char.upper()]
+
+            max_option = option_letters[len(new_options)-1] if new_options else 'A'
+            valid_answer = ''
+            for char in new_answer:
+                if char <= max_option:
+                    valid_answer += char
+            row[14] = valid_answer if valid_answer else new_answer
+        else:
+            row[14] = original_answer
+
+    elif q_type == '判断题':
+        row[14] = q.get('answer', '')
+
+    elif q_type == '定序填空题':
+        answers = q.get('answers', [])
+        for i, ans in enumerate(answers[:12]):
+            row[2 + i] = ans
+
+    elif q_type == '不定序填空题':
+        answers = q.get('answers', [])
+        raw_answer = q.get('raw_answer', '')
+        if answers:
+            row[14] = '|'.join(answers)
+        elif raw_answer:
+            row[14] = raw_answer.replace(',', '|').replace('，', '|')
+
+    elif q_type == '简答题':
+        row[14] = q.get('answer', '')
+
+    # 添加难度信息（如果有）
+    if q.get('difficulty'):
+        row[16] = q.get('difficulty')
+
+    # 添加来源作为章节信息（便于追溯）
+    if q.get('source'):
+        row[17] = q.get('source')
+
+    return row
+
+
+@register_emitter('shuatidadang', '_刷题搭档', '刷题搭档Excel导入模板',
+                  _open_shuatidadang_sheet, shuatidadang_row)
+def convert_to_shuatidadang_excel(questions, output_path):
+    """
+    将题目转换为刷题搭档Excel格式
+    使用只写模式逐行追加，写完的行直接写入磁盘，内存占用不随题目数量增长
+    """
+    return write_workbook(questions, output_path, _open_shuatidadang_sheet, shuatidadang_row)
+
+
+# ========== 二进制中间格式 (.tqb) ==========
+# 解析结果按列存放，可内存映射后按题目序号随机读取，再次转换时不必重新解析原文件。
+# 文件结构（小端序，各段按 8 字节对齐）：
+#   文件头    魔数 TQB1、版本、题目数、列数
+#   列目录    每列 (列名, 类型, 段偏移, 段长度)
+#   各列数据段
+#     str   题目数个 u64 相对偏移，其后为数据区，每项为 u32 长度 + UTF-8 字节
+#     list  同 str，数据区每项为 u32 个数 + 各字符串（u32 长度 + UTF-8 字节）
+#     dict  题目数个 u32 编号，其后为取值表（u32 个数 + 各字符串），用于题型、来源等取值很少的列
+#     int   题目数个 i64
+#   长度、个数或编号为 0xFFFFFFFF，整数为 -2**63 表示该字段不存在
+TQB_MAGIC = b'TQB1'
+TQB_SUFFIX = '_解析'  # 输出文件名后缀，避免与同名输入的 .tqb 文件或其他输入的输出重名
+TQB_VERSION = 1
+_TQB_HEADER = struct.Struct('<4sHHQI4x')  # 魔数, 版本, 保留, 题目数, 列数
+_TQB_COLUMN = struct.Struct('<16sB7xQQ')  # 列名, 类型, 段偏移, 段长度
+_TQB_U32 = struct.Struct('<I')
+_TQB_U64 = struct.Struct('<Q')
+_TQB_I64 = struct.Struct('<q')
+_TQB_NONE = 0xFFFFFFFF
+_TQB_NONE_INT = -2 ** 63
+_TQB_STR, _TQB_LIST, _TQB_DICT, _TQB_INT = 1, 2, 3, 4
+_TQB_ROW_SIZE = {_TQB_STR: 8, _TQB_LIST: 8, _TQB_DICT: 4, _TQB_INT: 8}
+# 列名（Question 的字段）-> 类型
+_TQB_COLUMNS = {
+    'question': _TQB_STR,
+    'type': _TQB_DICT,
+    'options': _TQB_LIST,
+    'answer': _TQB_STR,
+    'answers': _TQB_LIST,
+    'raw_answer': _TQB_STR,
+    'difficulty': _TQB_DICT,
+    'source': _TQB_DICT,
+    '_source_sheet': _TQB_DICT,
+    '_source_row': _TQB_INT,
+    'option_letters': _TQB_DICT,
+}
+
+
+def _align8(n):
+    return (n + 7) & ~7
+
+
+def _tqb_string(value):
+    """u32 长度 + UTF-8 字节"""
+    data = str(value).encode('utf-8', 'surrogatepass')
+    return _TQB_U32.pack(len(data)) + data
+
+
+def _tqb_values(q):
+    """一道题各列的值；q 为 Question 或题目字典"""
+    if isinstance(q, Question):
+        return [getattr(q, name) for name in _TQB_COLUMNS]
+    values = {name: q.get(name) for name in _TQB_COLUMNS}
+    if values['options'] is not None:
+        items = option_items(q)
+        values['options'] = [content for _, content in items]
+        values['option_letters'] = ''.join(letter for letter, _ in items)
+    return list(values.values())
+
+
+class _QuestionBankSink:
+    """
+    .tqb 文件的逐题写入器，接口与 _WorkbookSink 相同
+
+    各列先分别追加到临时文件，save 时拼接成最终文件，内存中只保留取值表。
+    未调用 save 时不生成输出文件
+    """
+
+    def __init__(self, output_path, row_count=None):
+        self.output_path = output_path
+        self.count = 0
+        self._rows = [tempfile.TemporaryFile() for _ in _TQB_COLUMNS]
+        self._data = [tempfile.TemporaryFile() if kind in (_TQB_STR, _TQB_LIST) else None
+                      for kind in _TQB_COLUMNS.values()]
+        self._sizes = [0] * len(_TQB_COLUMNS)
+        self._tables = [{} for _ in _TQB_COLUMNS]
+
+    def append(self, q):
+        for i, (kind, value) in enumerate(zip(_TQB_COLUMNS.values(), _tqb_values(q))):
+            if kind == _TQB_DICT:
+                if value is None:
+                    code = _TQB_NONE
+                else:
+                    table = self._tables[i]
+                    code = table.setdefault(value, len(table))
+                self._rows[i].write(_TQB_U32.pack(code))
+            elif kind == _TQB_INT:
+                self._rows[i].write(_TQB_I64.pack(_TQB_NONE_INT if value is None else int(value)))
+            else:
+                if value is None:
+                    data = _TQB_U32.pack(_TQB_NONE)
+                elif kind == _TQB_STR:
+                    data = _tqb_string(value)
+                else:
+                    data = _TQB_U32.pack(len(value)) + b''.join(_tqb_string(item) for item in value)
+                self._rows[i].write(_TQB_U64.pack(self._sizes[i]))
+                self._data[i].write(data)
+                self._sizes[i] += len(data)
+        self.count += 1
+
+    def _sections(self):
+        """各列 (列名, 类型, [临时文件或字节串, ...])，各部分之间按 8 字节对齐"""
+        for i, (name, kind) in enumerate(_TQB_COLUMNS.items()):
+            parts = [self._rows[i]]
+            if kind == _TQB_DICT:
+                table = self._tables[i]
+                parts.append(_TQB_U32.pack(len(table)) + b''.join(_tqb_string(value) for value in table))
+            elif self._data[i] is not None:
+                parts.append(self._data[i])
+            yield name, kind, parts
+
+    def save(self):
+        """写出 .tqb 文件，返回写入的题目数量"""
+        self.write()
+        print(f'已保存到: {self.output_path}')
+        return self.count
+
+    def close(self):
+        """丢弃暂存的各列，不生成文件"""
+        for spool in self._rows + self._data:
+            if spool is not None:
+                spool.close()
+
+    def write(self):
+        """拼接各列写出 .tqb 文件（先写临时文件再替换），不打印提示"""
+        sections = list(self._sections())
+        offset = _align8(_TQB_HEADER.size + _TQB_COLUMN.size * len(sections))
+        directory = []
+        for name, kind, parts in sections:
+            size = 0
+            for part in parts:
+                size = _align8(size)
+                size += len(part) if isinstance(part, bytes) else part.tell()
+            directory.append(_TQB_COLUMN.pack(name.encode('ascii'), kind, offset, size))
+            offset = _align8(offset + size)
+
+        tmp_path = f'{self.output_path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(_TQB_HEADER.pack(TQB_MAGIC, TQB_VERSION, 0, self.count, len(sections)))
+                f.write(b''.join(directory))
+                for _, _, parts in sections:
+                    for part in parts:
+                        f.write(b'\0' * (_align8(f.tell()) - f.tell()))
+                        if isinstance(part, bytes):
+                            f.write(part)
+                        else:
+                            part.seek(0)
+                            shutil.copyfileobj(part, f)
+            os.replace(tmp_path, self.output_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            self.close()
+
+
+@register_emitter('tqb', TQB_SUFFIX, '解析结果的二进制中间格式，可作为输入再次转换', None, None,
+                  extension='.tqb', open_sink=_QuestionBankSink)
+def write_question_bank(questions, output_path):
+    """
+    将题目写出为 .tqb 中间文件
+    各列先写入临时文件再拼接，内存占用不随题目数量增长
+    """
+    sink = _QuestionBankSink(output_path)
+    for q in questions:
+        sink.append(q)
+    return sink.save()
+
+
+class QuestionBank:
+    """
+    以内存映射方式读取 .tqb 文件
+
+    打开时只读取文件头、列目录和取值表，题目在访问时才从映射中解码，
+    打开百万题的文件也只需几毫秒：len(bank)、bank[i]（支持负数下标和切片）、for q in bank，
+    bank.column('type') 只解码一列。用完调用 close，或用 with 语句
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # 空文件
+                raise ValueError(f'不是有效的题库中间文件: {path}') from None
+        try:
+            self._columns = self._read_directory()
+        except (ValueError, struct.error, UnicodeDecodeError):
+            self._map.close()
+            raise ValueError(f'不是有效的题库中间文件: {path}') from None
+
+    def _read_directory(self):
+        """读取文件头和列目录，返回 {列名: (类型, 段偏移, 取值表)}"""
+        mm = self._map
+        magic, version, _, self.count, column_count = _TQB_HEADER.unpack_from(mm, 0)
+        if magic != TQB_MAGIC or version > TQB_VERSION:
+            raise ValueError
+        columns = {}
+        for i in range(column_count):
+            raw_name, kind, offset, size = _TQB_COLUMN.unpack_from(mm, _TQB_HEADER.size + i * _TQB_COLUMN.size)
+            if kind not in _TQB_ROW_SIZE or offset + size > len(mm) or size < self.count * _TQB_ROW_SIZE[kind]:
+                raise ValueError
+            table = None
+            if kind == _TQB_DICT:
+                table = self._read_strings(_align8(offset + self.count * 4))[0]
+            columns[raw_name.rstrip(b'\0').decode('ascii')] = (kind, offset, table)
+        return columns
+
+    def _read_strings(self, pos):
+        """读取 u32 个数 + 各字符串，返回 (字符串元组, 结束位置)；个数为 0xFFFFFFFF 时为 None"""
+        mm = self._map
+        count, = _TQB_U32.unpack_from(mm, pos)
+        pos += 4
+        if count == _TQB_NONE:
+            return None, pos
+        items = []
+        for _ in range(count):
+            size, = _TQB_U32.unpack_from(mm, pos)
+            pos += 4
+            items.append(str(mm[pos:pos + size], 'utf-8', 'surrogatepass'))
+            pos += size
+        return tuple(items), pos
+
+    def _read_text(self, kind, pos):
+        """读取 str 列或 list 列数据区中 pos 处的一项"""
+        if kind == _TQB_LIST:
+            return self._read_strings(pos)[0]
+        size, = _TQB_U32.unpack_from(self._map, pos)
+        if size == _TQB_NONE:
+            return None
+        return str(self._map[pos + 4:pos + 4 + size], 'utf-8', 'surrogatepass')
+
+    def _value(self, column, index):
+        kind, offset, table = column
+        mm = self._map
+        if kind == _TQB_DICT:
+            code, = _TQB_U32.unpack_from(mm, offset + 4 * index)
+            return None if code == _TQB_NONE else table[code]
+        if kind == _TQB_INT:
+            value, = _TQB_I64.unpack_from(mm, offset + 8 * index)
+            return None if value == _TQB_NONE_INT else value
+        start, = _TQB_U64.unpack_from(mm, offset + 8 * index)
+        return self._read_text(kind, offset + 8 * self.count + start)
+
+    def _row_array(self, typecode, offset):
+        """一列的定长部分（编号、整数或偏移）整体读入 array"""
+        values = array.array(typecode)
+        values.frombytes(self._map[offset:offset + values.itemsize * self.count])
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return values
+
+    def column(self, name):
+        """逐题产出一列的值（Question 的字段名），该列不存在时全为 None"""
+        column = self._columns.get(name)
+        if column is None:
+            return itertools.repeat(None, self.count)
+        kind, offset, table = column
+        if kind == _TQB_DICT:
+            return (None if code == _TQB_NONE else table[code] for code in self._row_array('I', offset))
+        if kind == _TQB_INT:
+            return (None if value == _TQB_NONE_INT else value for value in self._row_array('q', offset))
+        data = offset + 8 * self.count
+        return (self._read_text(kind, data + start) for start in self._row_array('Q', offset))
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError('题目序号超出范围')
+        columns = self._columns
+        return self._question(tuple(self._value(columns[name], index) if name in columns else None
+                                    for name in Question.__slots__))
+
+    def __iter__(self):
+        # 按列整体读取后逐题组合，比逐题随机访问快
+        for state in zip(*(self.column(name) for name in Question.__slots__)):
+            yield self._question(state)
+
+    @staticmethod
+    def _question(state):
+        q = _restore_question(state)
+        if q.options is not None:
+            q.options = tuple(_intern_short(content) for content in q.options)
+        return q
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_question_bank(file_path):
+    """打开 .tqb 文件，返回 QuestionBank"""
+    return QuestionBank(file_path)
+
+
+def iter_question_bank(file_path):
+    """逐题产出 .tqb 文件中的题目"""
+    with QuestionBank(file_path) as bank:
+        yield from bank
+
+
+def parse_question_bank(file_path):
+    """读取 .tqb 文件中的全部题目"""
+    return list(iter_question_bank(file_path))
+
+
+# ========== 拆分输出 ==========
+# 导入平台对大文件导入很慢、超过一定行数会超时，输出可按题型或来源工作表拆分，
+# 也可每 N 道题拆成一个分片。每个输入文件本来就单独输出（来源即文件名），
+# 按来源拆分在文件内部落到工作表一级。文件名为 原文件名 + 格式后缀 [+ _拆分键] [+ _三位分片序号] + 扩展名，
+# 同一输入每次得到相同的文件名
+SPLIT_FIELDS = {'type': 'type', 'sheet': '_source_sheet'}
+_SPLIT_BATCH = 1024  # 暂存文件中每批 pickle 的题目数
+_UNSAFE_FILENAME = re.compile(r'[\\/:*?"<>|\s]+')
+
+
+def _partition_label(value):
+    """拆分键用作文件名的一部分，替换掉不能出现在文件名中的字符"""
+    return _UNSAFE_FILENAME.sub('_', str(value)).strip('._') or '未命名'
+
+
+def _write_shard_task(task):
+    """
+    写出一个分片，供串行和进程池共用
+    task 为 (输出格式, 输出路径, 暂存文件, 各批偏移, 题目数)，返回写入的题目数量
+    """
+    target, output_path, spool_path, offsets, count = task
+    sink = open_emitter_sink(EMITTERS[target], output_path, count)
+    with open(spool_path, 'rb') as f:
+        for offset in offsets:
+            f.seek(offset)
+            for q in pickle.load(f):
+                sink.append(q)
+    # "已保存到" 由主进程按分片顺序输出
+    with contextlib.redirect_stdout(io.StringIO()):
+        return sink.save()
+
+
+class _PartitionedSink:
+    """
+    拆分输出的逐题写入器，接口与 _WorkbookSink 相同
+
+    题目按拆分键和分片序号归入各分片，按批 pickle 追加到同一个暂存文件，内存中只保留未满的批；
+    save 时按分片首次出现的顺序逐个写出，workers > 1 时在进程池中并行写出。
+    未调用 save 时不生成输出文件
+    """
+
+    def __init__(self, target, output_base, split, workers=1):
+        """
+        target: 输出格式名称
+        output_base: 输出路径去掉扩展名的部分（原文件名 + 格式后缀）
+        split: (拆分方式, 每个分片的最多题目数)，拆分方式为 SPLIT_FIELDS 中的键或 None，题目数为 None 表示不分片
+        """
+        self.target = target
+        self.output_base = output_base
+        self.extension = EMITTERS[target].extension
+        self.split_by, self.max_rows = split
+        self.workers = workers
+        self.count = 0
+        self.output_names = []
+        self._tmpdir = tempfile.TemporaryDirectory(prefix='tiku-split-')
+        self._spool = open(os.path.join(self._tmpdir.name, 'spool.pickle'), 'wb')
+        self._shards = {}   # 输出路径 -> [题目数, 各批偏移]
+        self._pending = {}  # 输出路径 -> 未写入暂存文件的题目
+        self._filled = {}   # 拆分键 -> (当前分片序号, 其中的题目数)
+        self._labels = {}   # 拆分字段的取值 -> 文件名中的拆分键
+
+    def _label(self, value):
+        """
+        取值对应的拆分键；不同取值替换字符后相同（如 "a/b" 和 "a b"）时，
+        后出现的加上 _2、_3 等后缀，避免不同分区的题目写进同一个文件
+        """
+        label = self._labels.get(value)
+        if label is None:
+            taken = set(self._labels.values())
+            label = base = _partition_label(value)
+            number = 2
+            while label in taken:
+                label = f'{base}_{number}'
+                number += 1
+            self._labels[value] = label
+        return label
+
+    def _shard_path(self, q):
+        parts = [self.output_base]
+        if self.split_by:
+            value = q.get(SPLIT_FIELDS[self.split_by])
+            if value is None and self.split_by == 'type':
+                value = '未知'
+            label = self._label(value) if value is not None else None
+            if label:
+                parts.append(label)
+        else:
+            label = None
+        if self.max_rows:
+            index, rows = self._filled.get(label, (1, 0))
+            if rows >= self.max_rows:
+                index, rows = index + 1, 0
+            self._filled[label] = (index, rows + 1)
+            parts.append(f'{index:03d}')
+        return '_'.join(parts) + self.extension
+
+    def _flush(self, path):
+        self._shards[path][1].append(self._spool.tell())
+        pickle.dump(self._pending[path], self._spool, protocol=pickle.HIGHEST_PROTOCOL)
+        self._pending[path] = []
+
+    def append(self, q):
+        path = self._shard_path(q)
+        if path not in self._shards:
+            self._shards[path] = [0, []]
+            self._pending[path] = []
+        self._shards[path][0] += 1
+        batch = self._pending[path]
+        batch.append(q)
+        if len(batch) >= _SPLIT_BATCH:
+            self._flush(path)
+        self.count += 1
+
+    def save(self):
+        """写出各分片，返回写入的题目总数；没有题目时不生成文件"""
+        try:
+            for path, batch in self._pending.items():
+                if batch:
+                    self._flush(path)
+            self._spool.close()
+            tasks = [(self.target, path, self._spool.name, offsets, count)
+                     for path, (count, offsets) in self._shards.items()]
+            if self.workers > 1 and len(tasks) > 1:
+                results = map_ordered(_write_shard_task, tasks, min(self.workers, len(tasks)))
+            else:
+                results = map(_write_shard_task, tasks)
+            for (_, path, _, _, _), _ in zip(tasks, results):
+                print(f'已保存到: {path}')
+                self.output_names.append(os.path.basename(path))
+        finally:
+            self._spool.close()
+            self._tmpdir.cleanup()
+        return self.count
+
+
+# ========== 解析结果缓存 ==========
+# 缓存按 输入文件内容哈希 + 解析器 + 代码版本 寻址：
+#   parsed/<key>.tqb      解析得到的题目，.tqb 中间格式（未设置 source）
+#   outputs/<hash>.json   输出文件对应的输入 key 和写出时的文件大小、修改时间
+# 缓存只保存纯数据，不用 pickle，缓存目录被他人写入也不能借此执行代码
+_CACHE_HASH_BLOCK = 1024 * 1024
+# 解析结果还取决于这些格式库的版本，升级后旧缓存失效
+_CACHE_LIBRARIES = ('openpyxl', 'lxml', 'olefile')
+DEFAULT_CACHE_MAX_MB = 512
+DEFAULT_CACHE_MAX_DAYS = 30
+
+
+def default_cache_dir():
+    """默认缓存目录：$TIKU_CACHE_DIR，否则 $XDG_CACHE_HOME/tiku 或 ~/.cache/tiku"""
+    if os.environ.get('TIKU_CACHE_DIR'):
+        return os.environ['TIKU_CACHE_DIR']
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'tiku')
+
+
+@functools.lru_cache(maxsize=None)
+def _code_fingerprint():
+    """本模块源码、版本号和格式库版本的哈希，解析逻辑或依赖改动后旧缓存自动失效"""
+    from importlib import metadata
+    digest = hashlib.blake2b(f'{__version__}:{TQB_VERSION}'.encode(), digest_size=16)
+    for name in _CACHE_LIBRARIES:
+        try:
+            version = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            version = ''
+        digest.update(f':{name}={version}'.encode())
+    try:
+        with open(os.path.abspath(__file__), 'rb') as f:
+            digest.update(f.read())
+    except OSError:
+        pass
+    return digest.hexdigest()
+
+
+def cache_key(file_path, parser_func):
+    """计算输入文件的缓存 key：文件内容 + 解析器名称 + 代码版本"""
+    parser_name = getattr(parser_func, 'func', parser_func).__name__
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f'{_code_fingerprint()}:{parser_name}:'.encode())
+    with open(file_path, 'rb') as f:
+        for block in iter(functools.partial(f.read, _CACHE_HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_atomic(path, data):
+    """先写临时文件再替换，避免并行进程读到写了一半的缓存"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+
+
+def _parsed_cache_path(cache_dir, key):
+    return os.path.join(cache_dir, 'parsed', f'{key}.tqb')
+
+
+def _iter_cache_file(bank, path, reparse):
+    """
+    逐题读取缓存；中途发现损坏时删除缓存，改为重新解析原文件，跳过已经产出的题目
+    （缓存按文件内容寻址，重新解析得到的题目与缓存中的相同）
+    """
+    count = 0
+    with bank:
+        questions = iter(bank)
+        while True:
+            try:
+                q = next(questions)
+            except StopIteration:
+                return
+            except Exception:
+                break
+            yield q
+            count += 1
+    with contextlib.suppress(OSError):
+        os.remove(path)
+    if reparse is not None:
+        print(f'  解析缓存已损坏，重新解析')
+        yield from itertools.islice(reparse(), count, None)
+
+
+def open_cached_questions(cache_dir, key, reparse=None):
+    """
+    打开缓存的解析结果，返回逐题产出的迭代器；未命中或缓存损坏时返回 None
+
+    缓存文件为 .tqb 中间格式，内存映射后逐题解码，读取时不执行缓存目录中的任何代码。
+    reparse() 返回重新解析原文件的迭代器，读到一半发现缓存损坏时改用它继续产出题目；
+    为 None 时损坏的缓存只是提前结束
+    """
+    path = _parsed_cache_path(cache_dir, key)
+    try:
+        bank = QuestionBank(path)
+    except OSError:
+        return None
+    except ValueError:
+        # 损坏的缓存直接丢弃，重新解析
+        with contextlib.suppress(OSError):
+            os.remove(path)
+        return None
+    # 刷新修改时间，淘汰时按最近使用排序
+    with contextlib.suppress(OSError):
+        os.utime(path)
+    return _iter_cache_file(bank, path, reparse)
+
+
+def iter_caching_questions(questions, cache_dir, key):
+    """
+    原样逐题产出，同时写入缓存；写入失败不影响转换
+
+    各列先写入临时文件，完整遍历、解析器没有报告错误且至少有一道题时才写出正式缓存；
+    解析中途失败、读取出错只得到部分题目或遍历被提前终止时不留下缓存
+    """
+    try:
+        os.makedirs(os.path.dirname(_parsed_cache_path(cache_dir, key)), exist_ok=True)
+        sink = _QuestionBankSink(_parsed_cache_path(cache_dir, key))
+    except OSError:
+        yield from questions
+        return
+
+    errors = _parse_error_count
+    complete = False
+    try:
+        for q in questions:
+            # 先写缓存再产出，后续步骤修改题目不会影响缓存内容
+            if sink is not None:
+                try:
+                    sink.append(q)
+                except OSError:
+                    sink.close()
+                    sink = None
+            yield q
+        complete = sink is not None and sink.count > 0 and _parse_error_count == errors
+    finally:
+        if sink is not None:
+            if complete:
+                with contextlib.suppress(OSError):
+                    sink.write()
+            else:
+                sink.close()
+
+
+def _output_record_path(cache_dir, output_path, target):
+    name = hashlib.blake2b(f'{target}:{os.path.abspath(output_path)}'.encode(),
+                           digest_size=16).hexdigest()
+    return os.path.join(cache_dir, 'outputs', f'{name}.json')
+
+
+def output_is_current(cache_dir, key, target, output_path):
+    """输出文件由同一输入生成且之后未被改动或删除时返回 True"""
+    record_path = _output_record_path(cache_dir, output_path, target)
+    try:
+        with open(record_path, 'rb') as f:
+            record = json.loads(f.read())
+        st = os.stat(output_path)
+    except (OSError, ValueError):
+        return False
+    if record.get('input') != key or record.get('size') != st.st_size \
+            or record.get('mtime_ns') != st.st_mtime_ns:
+        return False
+    with contextlib.suppress(OSError):
+        os.utime(record_path)
+    return True
+
+
+def record_output(cache_dir, key, target, output_path):
+    """记录输出文件与输入 key 的对应关系"""
+    try:
+        st = os.stat(output_path)
+    except OSError:
+        return
+    record = {'input': key, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+    _write_atomic(_output_record_path(cache_dir, output_path, target), json.dumps(record).encode())
+
+
+def prune_cache(cache_dir, max_bytes=DEFAULT_CACHE_MAX_MB * 1024 * 1024,
+                max_age=DEFAULT_CACHE_MAX_DAYS * 86400):
+    """
+    淘汰缓存：先删除超过 max_age 秒未使用的条目，
+    总大小仍超过 max_bytes 时再按最近使用时间从旧到新删除
+
+    Returns:
+        (删除的条目数, 剩余总字节数)
+    """
+    entries = []
+    for sub in ('parsed', 'outputs'):
+        directory = os.path.join(cache_dir, sub)
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            continue
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+    now = time.time()
+    removed = 0
+    total = sum(size for _, size, _ in entries)
+    entries.sort()
+    for mtime, size, path in entries:
+        # 临时文件是中断的写入，一律清理
+        expired = now - mtime > max_age or path.endswith('.tmp')
+        if not expired and total <= max_bytes:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        removed += 1
+        total -= size
+    return removed, total
+
+
+# ========== 近似重复检测 ==========
+# 只差标点、空白、选项顺序或个别字的题目用字符2-gram MinHash + LSH 找出，
+# 每道题只和同一 LSH 桶中的首个题目比较，整体开销随题目数线性增长。
+# 中文词多为两个字，改动一个字只影响两个 2-gram：约20字的题目改一个字，相似度约0.8，
+# 用 3-gram 时只有约0.7；默认阈值取0.75，这类题目都能找出
+_MINHASH_PERM = 32                 # 签名长度（须为2的幂）
+_MINHASH_DENSIFY_OFFSET = 1 << 58  # 空桶借用相邻桶的值时加上的偏移
+_NEAR_DUP_RECALL = 0.95            # 相似度恰为阈值的题目对成为候选的概率下限
+_NEAR_DUP_STRIP_RE = re.compile(r'[\W_]+')
+DEFAULT_NEAR_DUP_THRESHOLD = 0.75
+
+
+def _near_dup_clean(value):
+    return _NEAR_DUP_STRIP_RE.sub('', normalize_text(str(value)).lower())
+
+
+def near_dup_canonical(q):
+    """
+    近似重复比较用的规范文本：去掉空白和标点，选项按内容排序，
+    选择题答案换成对应的选项内容，选项顺序不同的同一道题得到相同文本
+    """
+    stem = _near_dup_clean(q.get('question', ''))
+    if not stem:
+        return ''
+    parts = [stem]
+    options = {k: _near_dup_clean(v) for k, v in option_items(q) if v}
+    answers = q.get('answers') or []
+    if options:
+        parts.append('|'.join(sorted(options.values())))
+        parts.append('|'.join(sorted(options.get(c.upper(), c) for c in str(q.get('answer', ''))
+                                     if not c.isspace())))
+    elif answers:
+        parts.append('|'.join(_near_dup_clean(a) for a in answers))
+    else:
+        parts.append(_near_dup_clean(q.get('answer', '')))
+    return '\x1f'.join(parts)
+
+
+def text_shingles(text):
+    """字符2-gram 的哈希集合（整数元组的哈希不受 PYTHONHASHSEED 影响，结果可复现）"""
+    codes = list(map(ord, text))
+    if len(codes) < 2:
+        return {hash(tuple(codes))}
+    return set(map(hash, zip(codes, codes[1:])))
+
+
+def minhash_signature(shingles, num_perm=_MINHASH_PERM):
+    """
+    单次排列 MinHash（one permutation hashing）：每个 2-gram 只算一次哈希，
+    按低位分到 num_perm 个桶，各桶取最小值；空桶向右借用最近非空桶的值
+    """
+    mask = num_perm - 1
+    shift = mask.bit_length()
+    # 降序遍历，同一桶中最后写入的即最小值
+    bins = {h & mask: h >> shift for h in sorted(shingles, reverse=True)}
+    signature = [bins.get(j) for j in range(num_perm)]
+    if len(bins) < num_perm:
+        filled = sorted(bins)
+        for j in range(num_perm):
+            if signature[j] is None:
+                k = filled[bisect.bisect_left(filled, j) % len(filled)]
+                signature[j] = bins[k] + ((k - j) & mask) * _MINHASH_DENSIFY_OFFSET
+    return signature
+
+
+def _lsh_rows(threshold, num_perm=_MINHASH_PERM):
+    """在相似度为阈值的题目对召回率达标的前提下，取最大的 band 行数以减少误报候选"""
+    for rows in range(num_perm, 1, -1):
+        if num_perm % rows == 0 and 1 - (1 - threshold ** rows) ** (num_perm // rows) >= _NEAR_DUP_RECALL:
+            return rows
+    return 1
+
+
+def find_near_duplicates(questions, threshold=DEFAULT_NEAR_DUP_THRESHOLD):
+    """
+    查找近似重复的题目簇
+
+    LSH 分 band 后逐个 band 建桶，同桶题目和桶内首个题目按 2-gram 集合的
+    Jaccard 相似度复核，达到 threshold 的合并为同一簇（并查集）。
+    每道题只保留各 band 的哈希值，内存和时间都与题目数成线性关系
+
+    Returns:
+        [[题目下标, ...], ...]，每簇至少两道题，簇内和簇之间都按首次出现顺序排列
+    """
+    rows = _lsh_rows(threshold)
+    bands = _MINHASH_PERM // rows
+
+    ids = []
+    band_keys = [array.array('q') for _ in range(bands)]
+    for idx, q in enumerate(questions):
+        text = near_dup_canonical(q)
+        if not text:
+            continue
+        signature = minhash_signature(text_shingles(text))
+        ids.append(idx)
+        for band, keys in enumerate(band_keys):
+            keys.append(hash(tuple(signature[band * rows:(band + 1) * rows])))
+
+    parent = array.array('q', range(len(ids)))
+
+    def find(pos):
+        while parent[pos] != pos:
+            parent[pos] = parent[parent[pos]]
+            pos = parent[pos]
+        return pos
+
+    @functools.lru_cache(maxsize=4096)
+    def shingles_at(pos):
+        return text_shingles(near_dup_canonical(questions[ids[pos]]))
+
+    positions = range(len(ids))
+    for keys in band_keys:
+        # 倒序构建，每个桶保留的是首个题目
+        first_in_bucket = dict(zip(reversed(keys), reversed(positions)))
+        candidates = [(first_in_bucket[key], pos) for pos, key in enumerate(keys)
+                      if first_in_bucket[key] != pos]
+        for first, pos in candidates:
+            root_a, root_b = find(first), find(pos)
+            if root_a == root_b:
+                continue
+            a, b = shingles_at(first), shingles_at(pos)
+            common = len(a & b)
+            if common >= threshold * (len(a) + len(b) - common):
+                # 根节点总是簇中最先出现的题目
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+        del first_in_bucket, candidates
+
+    clusters = {}
+    for pos in range(len(ids)):
+        clusters.setdefault(find(pos), []).append(ids[pos])
+    return [members for members in clusters.values() if len(members) > 1]
+
+
+# ========== 外存去重 ==========
+# 题库大到去重索引放不进内存时，把 (摘要, 序号) 记录排序后分批写入磁盘顺串，
+# 再多路归并找出重复题；记录均为定长字节串，按字节序比较即按字段顺序排序
+_DEDUP_KEY_RECORD = struct.Struct('>16sQII')  # 摘要, 题目序号, 工作表编号, 行号
+_DEDUP_DUP_RECORD = struct.Struct('>QQII')    # 重复题序号, 首次出现的序号, 工作表编号, 行号
+_RUN_READ_RECORDS = 4096
+DEFAULT_DEDUP_RUN_RECORDS = 1000000
+
+
+def _iter_run_file(path, record_size):
+    """逐条读取顺串文件中的定长记录"""
+    with open(path, 'rb') as f:
+        for block in iter(functools.partial(f.read, record_size * _RUN_READ_RECORDS), b''):
+            for i in range(0, len(block), record_size):
+                yield block[i:i + record_size]
+
+
+def external_sort(records, record_size, run_records, tmp_dir):
+    """
+    定长字节记录的外部排序
+
+    每 run_records 条在内存中排序后写成一个顺串文件，最后多路归并；
+    全部记录不超过 run_records 条时直接在内存中排序，不落盘
+    """
+    runs = []
+    buffer = []
+    for record in records:
+        buffer.append(record)
+        if len(buffer) >= run_records:
+            buffer.sort()
+            fd, path = tempfile.mkstemp(suffix='.run', dir=tmp_dir)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(b''.join(buffer))
+            runs.append(path)
+            buffer = []
+    buffer.sort()
+    if not runs:
+        return iter(buffer)
+    return heapq.merge(buffer, *(_iter_run_file(path, record_size) for path in runs))
+
+
+def deduplicate_questions_external(questions, run_records=DEFAULT_DEDUP_RUN_RECORDS, tmp_dir=None):
+    """
+    外存去重：结果和重复题目详情与 deduplicate_questions 完全相同，
+    但去重索引不驻留内存，参数见 iter_unique_questions_external
+    返回: (去重后的题目列表, 移除的重复数量, 重复题目详情列表)
+    """
+    duplicate_details = []
+    unique_questions = list(iter_unique_questions_external(questions, duplicate_details, run_records, tmp_dir))
+    return unique_questions, len(duplicate_details), duplicate_details
+
+
+def iter_unique_questions_external(questions, duplicate_details, run_records=DEFAULT_DEDUP_RUN_RECORDS,
+                                   tmp_dir=None):
+    """
+    外存去重，逐题产出首次出现的题目，重复题目详情追加到 duplicate_details；
+    去重索引和题目都不驻留内存，内存占用上限约为 run_records 条记录
+
+    1. 逐题计算摘要，同时把题目写入暂存的 .tqb 文件；(摘要, 序号) 外部排序，同一摘要中序号最小的即首次出现
+    2. 重复题记录按重复题序号再外部排序
+    3. 按输入顺序从暂存文件读回题目，与重复题记录对照，产出首次出现的题目
+
+    questions 只遍历一次；tmp_dir 为顺串和暂存文件所在目录，默认系统临时目录
+    """
+    sheet_ids = {'': 0}
+    sheet_names = ['']
+
+    def key_records(spool):
+        for idx, q in enumerate(questions):
+            question_text = q.get('question', '').strip()
+            spool.append(q)
+            if not question_text:
+                continue
+            sheet = q.get('_source_sheet', '') or ''
+            sheet_id = sheet_ids.get(sheet)
+            if sheet_id is None:
+                sheet_id = sheet_ids[sheet] = len(sheet_names)
+                sheet_names.append(sheet)
+            yield _DEDUP_KEY_RECORD.pack(question_digest(question_text, q), idx, sheet_id,
+                                         int(q.get('_source_row', 0) or 0))
+
+    def duplicate_records(sorted_keys):
+        previous = None
+        for record in sorted_keys:
+            digest, idx, sheet_id, row = _DEDUP_KEY_RECORD.unpack(record)
+            if digest != previous:
+                previous, first = digest, (idx, sheet_id, row)
+            else:
+                yield _DEDUP_DUP_RECORD.pack(idx, *first)
+
+    with tempfile.TemporaryDirectory(prefix='tiku-dedup-', dir=tmp_dir) as run_dir:
+        spool_path = os.path.join(run_dir, 'questions.tqb')
+        spool = _QuestionBankSink(spool_path)
+        try:
+            sorted_keys = external_sort(key_records(spool), _DEDUP_KEY_RECORD.size, run_records, run_dir)
+            spool.write()
+        finally:
+            spool.close()
+        duplicates = map(_DEDUP_DUP_RECORD.unpack,
+                         external_sort(duplicate_records(sorted_keys), _DEDUP_DUP_RECORD.size,
+                                       run_records, run_dir))
+        next_duplicate = next(duplicates, None)
+
+        with QuestionBank(spool_path) as bank:
+            for idx, q in enumerate(bank):
+                question_text = q.get('question', '').strip()
+                if not question_text:
+                    continue
+                if next_duplicate is None or next_duplicate[0] != idx:
+                    yield q
+                    continue
+
+                _, first_idx, first_sheet_id, first_row = next_duplicate
+                next_duplicate = next(duplicates, None)
+                dup_location = _question_location(None, q.get('_source_sheet', ''),
+                                                  q.get('_source_row', 0), idx + 1)
+                first_location = _question_location(None, sheet_names[first_sheet_id], first_row,
+                                                    first_idx + 1)
+                q_type = q.get('type', '未知')
+                q_preview = question_text[:40] + ('...' if len(question_text) > 40 else '')
+                duplicate_details.append((dup_location, first_location, q_preview, q_type))
+
+
+# ========== 性能剖析 ==========
+# --profile 时记录每个文件各阶段的墙钟时间和（本进程的）CPU时间。
+# 流水线中各阶段逐题交错执行：包装各阶段的生成器，累计每次取下一道题的耗时（含上游阶段），
+# 处理结束后减去上游阶段的累计值，得到各阶段自身的耗时
+PROFILE_STAGES = {
+    'parse': '解析',
+    'validate': '验证',
+    'dedup': '去重',
+    'near_dup': '近似重复',
+    'write': '写入',
+    'save': '保存',
+}
+DEFAULT_PROFILE_JSON = 'convert_profile.json'
+DEFAULT_PROFILE_TOP = 3
+
+
+class FileProfile:
+    """
+    单个文件的剖析结果
+
+    stages: {阶段: [墙钟秒, CPU秒]}，阶段名称见 PROFILE_STAGES
+    wall/cpu: 整个文件的处理耗时；questions: 解析到的题目数
+    cprofile: cProfile 输出文件路径（--profile-dump）
+    """
+
+    def __init__(self, file_path, memory=None):
+        self.file = file_path
+        self.questions = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.stages = {}
+        self.cprofile = None
+        self.memory = memory
+        self._upstream = {}
+
+    def _totals(self, name, upstream):
+        if upstream:
+            self._upstream[name] = upstream
+        return self.stages.setdefault(name, [0.0, 0.0])
+
+    @contextlib.contextmanager
+    def stage(self, name, upstream=None):
+        """
+        计时一段代码；upstream 为这段代码中逐题拉取的上游阶段，其耗时最后从本阶段扣除
+        启用内存统计时同时记录这段代码的内存峰值
+        """
+        totals = self._totals(name, upstream)
+        with self.memory.segment(name) if self.memory else contextlib.nullcontext():
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                yield
+            finally:
+                totals[0] += time.perf_counter() - wall
+                totals[1] += time.process_time() - cpu
+
+    def iter(self, name, iterable, upstream=None):
+        """逐个产出 iterable 的元素，取每个元素的耗时累计到 name；upstream 见 stage"""
+        totals = self._totals(name, upstream)
+        iterator = iter(iterable)
+        perf_counter, process_time = time.perf_counter, time.process_time
+        while True:
+            wall, cpu = perf_counter(), process_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                totals[0] += perf_counter() - wall
+                totals[1] += process_time() - cpu
+            yield item
+
+    def finish(self, wall, cpu):
+        """记录整个文件的耗时，并把含上游的阶段耗时换算为各阶段自身的耗时"""
+        self.wall, self.cpu = wall, cpu
+        inclusive = {name: tuple(totals) for name, totals in self.stages.items()}
+        for name, upstream in self._upstream.items():
+            if upstream in inclusive:
+                self.stages[name] = [max(0.0, value - upstream_value)
+                                     for value, upstream_value in zip(inclusive[name], inclusive[upstream])]
+        self._upstream = {}
+
+    def rate(self):
+        """每秒处理的题目数"""
+        return self.questions / self.wall if self.wall else 0.0
+
+    def to_dict(self):
+        return {
+            'file': self.file,
+            'questions': self.questions,
+            'wall': round(self.wall, 6),
+            'cpu': round(self.cpu, 6),
+            'questions_per_sec': round(self.rate(), 1),
+            'stages': {name: {'wall': round(self.stages[name][0], 6), 'cpu': round(self.stages[name][1], 6)}
+                       for name in PROFILE_STAGES if name in self.stages},
+            'cprofile': self.cprofile,
+            'memory': self.memory.to_dict() if self.memory else None,
+        }
+
+
+# --profile-memory 时用 tracemalloc 跟踪 Python 分配，并读取进程的峰值RSS。
+# 内存峰值按代码段记录（各段见 MEMORY_SEGMENTS，流式处理时解析、验证、去重都在"逐题写入"段内完成）；
+# 堆占用创新高时拍快照，按分配时调用栈中最内层的阶段入口函数把存活的内存归到各阶段，
+# 列出每个阶段占用最多的分配位置，由此区分 openpyxl 读入、题目记录和输出工作簿各占多少
+MEMORY_SEGMENTS = {
+    'collect': '汇总题目',
+    'near_dup': '近似重复',
+    'write': '逐题写入',
+    'save': '保存',
+}
+MEMORY_STAGES = dict(PROFILE_STAGES, other='其他')
+DEFAULT_MEMORY_TOP = 3
+_MEMORY_FRAMES = 32             # 保存的调用栈深度，须能回溯到阶段入口函数
+_MEMORY_SAMPLE_EVERY = 1000     # 逐题处理时每隔多少道题检查一次堆占用
+_MEMORY_SNAPSHOT_GROWTH = 1.25  # 堆占用超过上次快照的这么多倍时重新拍快照
+
+
+def peak_rss():
+    """本进程的峰值RSS（字节）：Linux 读取 VmHWM，其他系统用 ru_maxrss；无法获取时返回 None"""
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+
+def reset_peak_rss():
+    """把峰值RSS重置为当前RSS（Linux 4.0+）；不支持时返回 False，此后读到的是进程启动以来的峰值"""
+    try:
+        with open('/proc/self/clear_refs', 'w', encoding='ascii') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def _memory_stage_ranges():
+    """{源文件: [(起始行, 结束行, 阶段)]}，各阶段入口函数的代码行范围"""
+    # 解析器都在来源标记生成器下面被调用
+    entries = (
+        (iter_tagged_questions.__code__, 'parse'),
+        (iter_validated_questions.__code__, 'validate'),
+        (iter_unique_questions.__code__, 'dedup'),
+        (iter_unique_questions_external.__code__, 'dedup'),
+        (report_near_duplicates.__code__, 'near_dup'),
+        (_WorkbookSink.__init__.__code__, 'write'),
+        (_WorkbookSink.append.__code__, 'write'),
+        (_WorkbookSink.save.__code__, 'save'),
+        (_QuestionBankSink.__init__.__code__, 'write'),
+        (_QuestionBankSink.append.__code__, 'write'),
+        (_QuestionBankSink.save.__code__, 'save'),
+        (_PartitionedSink.append.__code__, 'write'),
+        (_PartitionedSink.save.__code__, 'save'),
+    )
+    ranges = {}
+    for code, stage in entries:
+        last = max(line for _, line in dis.findlinestarts(code) if line)
+        ranges.setdefault(code.co_filename, []).append((code.co_firstlineno, last, stage))
+    return ranges
+
+
+def _allocation_stage(traceback):
+    """分配时调用栈中最内层的阶段入口函数所属的阶段；都不在栈上时为 other"""
+    ranges = _memory_stage_ranges()
+    for frame in reversed(traceback):
+        for first, last, stage in ranges.get(frame.filename, ()):
+            if first <= frame.lineno <= last:
+                return stage
+    return 'other'
+
+
+def _allocation_site(frame):
+    """分配位置的简短写法：第三方库保留包内路径，其余只保留文件名"""
+    parts = frame.filename.replace('\\', '/').split('/')
+    for marker in ('site-packages', 'dist-packages'):
+        if marker in parts:
+            return f'{"/".join(parts[parts.index(marker) + 1:])}:{frame.lineno}'
+    return f'{parts[-1]}:{frame.lineno}'
+
+
+def _round_mb(value):
+    return None if value is None else round(value / (1024 * 1024), 2)
+
+
+class MemoryProfile:
+    """
+    单个文件的内存统计（字节）
+
+    peak_heap/peak_rss: 整个文件的 tracemalloc 堆峰值和进程峰值RSS
+    overhead: tracemalloc 自身占用的内存（计入RSS）
+    segments: {代码段: [堆峰值, 峰值RSS]}，代码段见 MEMORY_SEGMENTS
+    snapshot: 堆占用最高的一次快照的总量；stages: {阶段: (存活字节数, [(分配位置, 字节数)])}
+    """
+
+    def __init__(self, top=DEFAULT_MEMORY_TOP):
+        self.top = top
+        self.peak_heap = 0
+        self.peak_rss = None
+        self.overhead = 0
+        self.segments = {}
+        self.snapshot = 0
+        self.stages = {}
+        self._countdown = _MEMORY_SAMPLE_EVERY
+
+    def start(self):
+        tracemalloc.start(_MEMORY_FRAMES)
+        reset_peak_rss()
+
+    def stop(self):
+        self._checkpoint()
+        self.sample(force=True)
+        tracemalloc.stop()
+
+    def _checkpoint(self):
+        """读取并重置上次检查点以来的堆峰值和峰值RSS"""
+        _, heap = tracemalloc.get_traced_memory()
+        rss = peak_rss()
+        tracemalloc.reset_peak()
+        reset_peak_rss()
+        self.peak_heap = max(self.peak_heap, heap)
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+        self.overhead = max(self.overhead, tracemalloc.get_tracemalloc_memory())
+        return heap, rss
+
+    @contextlib.contextmanager
+    def segment(self, name):
+        """记录一段代码的堆峰值和峰值RSS"""
+        self._checkpoint()
+        try:
+            yield
+        finally:
+            heap, rss = self._checkpoint()
+            totals = self.segments.setdefault(name, [0, None])
+            totals[0] = max(totals[0], heap)
+            if rss is not None:
+                totals[1] = max(totals[1] or 0, rss)
+            self.sample(force=True)
+
+    def iter(self, iterable):
+        """逐个产出 iterable 的元素，每隔一批题目检查一次堆占用"""
+        for item in iterable:
+            yield item
+            self.sample()
+
+    def sample(self, force=False):
+        """堆占用明显超过上次快照时拍快照，按阶段汇总存活的内存"""
+        if not force:
+            self._countdown -= 1
+            if self._countdown > 0:
+                return
+            self._countdown = _MEMORY_SAMPLE_EVERY
+        current, _ = tracemalloc.get_traced_memory()
+        if self.snapshot and current < self.snapshot * _MEMORY_SNAPSHOT_GROWTH:
+            return
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)])
+        stages = {}
+        for stat in snapshot.statistics('traceback'):
+            totals = stages.setdefault(_allocation_stage(stat.traceback), [0, collections.Counter()])
+            totals[0] += stat.size
+            totals[1][_allocation_site(stat.traceback[-1])] += stat.size  # 最内层的帧即分配位置
+        self.snapshot = current
+        self.stages = {stage: (size, sites.most_common(self.top)) for stage, (size, sites) in stages.items()}
+
+    def to_dict(self):
+        return {
+            'peak_heap_mb': _round_mb(self.peak_heap),
+            'peak_rss_mb': _round_mb(self.peak_rss),
+            'tracemalloc_mb': _round_mb(self.overhead),
+            'segments': {name: {'heap_mb': _round_mb(self.segments[name][0]),
+                                'rss_mb': _round_mb(self.segments[name][1])}
+                         for name in MEMORY_SEGMENTS if name in self.segments},
+            'snapshot_mb': _round_mb(self.snapshot),
+            'stages': {name: {'mb': _round_mb(self.stages[name][0]),
+                              'top': [{'site': site, 'mb': _round_mb(size)} for site, size in self.stages[name][1]]}
+                       for name in MEMORY_STAGES if name in self.stages},
+        }
+
+
+def _format_bytes(size):
+    """字节数写成 KB 或 MB"""
+    return f'{size / 1024:.0f}KB' if size < 1024 * 1024 else f'{size / 1024 / 1024:.1f}MB'
+
+
+def _print_memory(memory):
+    """打印一个文件的内存统计"""
+    rss = _format_bytes(memory.peak_rss) if memory.peak_rss is not None else '未知'
+    print(f'      内存: 峰值RSS {rss}（含 tracemalloc {_format_bytes(memory.overhead)}），'
+          f'Python堆峰值 {_format_bytes(memory.peak_heap)}')
+    parts = []
+    for name, label in MEMORY_SEGMENTS.items():
+        if name in memory.segments:
+            heap, rss = memory.segments[name]
+            rss = f' / RSS {_format_bytes(rss)}' if rss is not None else ''
+            parts.append(f'{label} 堆 {_format_bytes(heap)}{rss}')
+    if parts:
+        print(f'      各段峰值: {"；".join(parts)}')
+    if memory.stages:
+        shares = '  '.join(f'{MEMORY_STAGES[name]} {_format_bytes(memory.stages[name][0])}'
+                           for name in MEMORY_STAGES if name in memory.stages)
+        print(f'      堆占用最高时（{_format_bytes(memory.snapshot)}）: {shares}')
+        for name in MEMORY_STAGES:
+            if name in memory.stages and memory.stages[name][1]:
+                sites = '，'.join(f'{site} {_format_bytes(size)}' for site, size in memory.stages[name][1])
+                print(f'        {MEMORY_STAGES[name]}: {sites}')
+
+
+def print_profile_report(profiles, elapsed):
+    """在转换报告中按耗时从高到低列出各文件的阶段耗时，启用内存统计时附上各文件的内存占用"""
+    memory = any(p.memory for p in profiles)
+    note = '，已启用内存统计，耗时偏高' if memory else ''
+    print(f'\n⏱ 性能剖析（墙钟/CPU 秒，整批耗时 {elapsed:.3f}s{note}）:')
+    stage_totals = dict.fromkeys(PROFILE_STAGES, 0.0)
+    seen = set()
+    for p in sorted(profiles, key=lambda p: p.wall, reverse=True):
+        print(f'  - {os.path.basename(p.file)}: {p.wall:.3f}/{p.cpu:.3f}，'
+              f'{p.questions} 题，{p.rate():.0f} 题/秒')
+        parts = []
+        for name, label in PROFILE_STAGES.items():
+            if name in p.stages:
+                wall, cpu = p.stages[name]
+                parts.append(f'{label} {wall:.3f}/{cpu:.3f}')
+                seen.add(name)
+                stage_totals[name] += wall
+        if parts:
+            print(f'      {"  ".join(parts)}')
+        if p.memory:
+            _print_memory(p.memory)
+        if p.cprofile:
+            print(f'      cProfile: {p.cprofile}')
+
+    total = sum(stage_totals.values())
+    if total > 0:
+        shares = '  '.join(f'{PROFILE_STAGES[name]} {wall:.3f}s ({wall / total:.0%})'
+                           for name, wall in stage_totals.items() if name in seen)
+        print(f'  各阶段合计: {shares}')
+    if memory:
+        worst = max((p for p in profiles if p.memory), key=lambda p: (p.memory.peak_rss or 0, p.memory.peak_heap))
+        value = worst.memory.peak_rss if worst.memory.peak_rss is not None else worst.memory.peak_heap
+        print(f'  内存峰值最高: {os.path.basename(worst.file)}（{_format_bytes(value)}）')
+
+
+def write_profile_json(path, profiles, elapsed, args):
+    """把剖析结果写成 JSON 指标文件"""
+    report = {
+        'version': __version__,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'elapsed': round(elapsed, 6),
+        'jobs': args.jobs,
+        'targets': args.targets,
+        'questions': sum(p.questions for p in profiles),
+        'files': [p.to_dict() for p in profiles],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def keep_slowest_cprofiles(profiles, top):
+    """只保留最慢的 top 个文件的 cProfile 输出，其余删除"""
+    ranked = sorted((p for p in profiles if p.cprofile), key=lambda p: p.wall, reverse=True)
+    for p in ranked[top:]:
+        with contextlib.suppress(OSError):
+            os.remove(p.cprofile)
+        p.cprofile = None
+
+
+# ========== 统计、去重与验证 ==========
+def print_statistics(questions, title):
+    """打印题目统计信息"""
+    type_count = {}
+    for q in questions:
+        t = q.get('type', '未知')
+        type_count[t] = type_count.get(t, 0) + 1
+    print_type_count(type_count, title)
+
+
+def print_type_count(type_count, title):
+    """打印题型统计：{题型: 题目数}"""
+    print(f'\n{title} 题型统计:')
+    for t, c in sorted(type_count.items()):
+        print(f'  - {t}: {c}')
+
+
+def question_digest(question_text, q):
+    """
+    题目去重键：题干 + 选项内容 + 答案规范化后的16字节摘要
+    以固定长度的摘要代替拼接后的完整字符串，大题库去重索引的内存占用不随题目长度增长
+    """
+    # 选择题：按字母顺序拼接选项内容
+    options_str = '\x1e'.join(f'{k}\x1d{v}' for k, v in option_items(q))
+
+    # 获取答案（选择题/判断题用answer，填空题用answers）
+    answers = q.get('answers', [])
+    answer_str = '\x1e'.join(answers) if answers else str(q.get('answer', ''))
+
+    canonical = f'{question_text}\x1f{options_str}\x1f{answer_str}'
+    return hashlib.blake2b(canonical.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+def _question_location(source, sheet, row, list_idx, current_source=None):
+    """题目位置："工作表名 第N行" 或 "第N题"；跨文件重复时加上来源文件名"""
+    location = f"[{sheet}] 第{row}行" if sheet and row else f"第{list_idx}题"
+    if source and source != current_source:
+        location = f"{source} {location}"
+    return location
+
+
+def deduplicate_questions(questions, index=None, source=None):
+    """
+    题目去重：基于题干+选项+答案综合判断，保留第一次出现的题目
+    注意：题干相同但选项或答案不同的视为不同题目
+    index: 跨文件共用的去重索引（--global-dedup），None 表示只在本文件内去重
+    source: 本文件的来源名称，用于标注跨文件重复的首次出现位置
+    返回: (去重后的题目列表, 移除的重复数量, 重复题目详情列表)
+    重复题目详情格式: [(重复题位置, 首次出现位置, 题干摘要, 题型), ...]
+    位置格式: "工作表名 第N行" 或 "第N题"（无原始位置时），其他文件中首次出现时前加文件名
+    """
+    duplicate_details = []
+    unique_questions = list(iter_unique_questions(questions, duplicate_details, index, source))
+    return unique_questions, len(duplicate_details), duplicate_details
+
+
+def iter_unique_questions(questions, duplicate_details, index=None, source=None):
+    """
+    逐题去重，只产出首次出现的题目，重复题目详情追加到 duplicate_details，
+    参数和详情格式见 deduplicate_questions
+    """
+    # 摘要 -> (来源, 工作表名, 行号, 列表索引)，只保存位置，不持有题目对象
+    seen = {} if index is None else index
+
+    for idx, q in enumerate(questions):
+        question_text = q.get('question', '').strip()
+        if not question_text:
+            continue
+
+        digest = question_digest(question_text, q)
+        first = seen.get(digest)
+        if first is None:
+            seen[digest] = (source, q.get('_source_sheet', ''), q.get('_source_row', 0), idx + 1)
+            yield q
+        else:
+            dup_location = _question_location(None, q.get('_source_sheet', ''),
+                                              q.get('_source_row', 0), idx + 1)
+            first_location = _question_location(*first, current_source=source)
+
+            q_type = q.get('type', '未知')
+            q_preview = question_text[:40] + ('...' if len(question_text) > 40 else '')
+            duplicate_details.append((dup_location, first_location, q_preview, q_type))
+
+
+def _forget_source(index, source):
+    """文件解析失败时从跨文件去重索引中移除该文件已登记的题目"""
+    for digest in [digest for digest, first in index.items() if first[0] == source]:
+        del index[digest]
+
+
+def validate_question(q, idx=0):
+    """
+    验证单个题目的完整性和有效性
+
+    Args:
+        q: 题目（Question 或题目字典）
+        idx: 题目序号（用于输出）
+
+    Returns:
+        (是否有效, 警告列表)
+    """
+    warnings = []
+    q_type = q.get('type', '')
+
+    # 题干验证
+    question_text = q.get('question', '').strip()
+    if not question_text:
+        return False, ['题干为空']
+    if len(question_text) < 5:
+        warnings.append('题干过短（<5字符）')
+
+    # 选择题验证
+    if q_type in ['单选题', '多选题']:
+        options = option_items(q)
+        if len(options) < 2:
+            warnings.append(f'选项不足（仅{len(options)}个）')
+        letters = [letter for letter, _ in options]
+
+        answer = q.get('answer', '')
+        if not answer:
+            warnings.append('答案为空')
+        else:
+            for char in answer:
+                if char not in letters:
+                    warnings.append(f'答案"{char}"不在选项中')
+                    break
+
+    # 判断题验证
+    elif q_type == '判断题':
+        answer = q.get('answer', '')
+        if answer and answer not in ['对', '错']:
+            warnings.append(f'判断题答案格式异常: {answer}')
+
+    # 填空题验证
+    elif q_type in ['填空题', '定序填空题', '不定序填空题']:
+        answers = q.get('answers', [])
+        raw_answer = q.get('raw_answer', '')
+        if not answers and not raw_answer:
+            warnings.append('填空题答案为空')
+
+    return True, warnings
+
+
+def validate_questions(questions, verbose=False):
+    """
+    批量验证题目，返回验证统计
+
+    Args:
+        questions: 题目列表
+        verbose: 是否输出每个警告
+
+    Returns:
+        (有效题目数, 警告总数, 警告详情列表)
+    """
+    report = {'valid': 0, 'warnings': 0, 'details': []}
+    for _ in iter_validated_questions(questions, report):
+        pass
+    if verbose:
+        _print_warning_lines(report['details'])
+    return report['valid'], report['warnings'], report['details']
+
+
+def iter_tagged_questions(questions, source, state):
+    """
+    强制使用 source（文件基础名）作为来源并原样产出，解析器都在这个生成器下面被调用
+
+    state 字典中累计 count（解析到的题目数），解析异常记入 errors 列表后结束遍历，
+    由调用方在遍历结束后统一报告
+    """
+    try:
+        for q in questions:
+            q['source'] = source
+            state['count'] += 1
+            yield q
+    except Exception as e:
+        state['errors'].append(e)
+
+
+def iter_validated_questions(questions, report):
+    """
+    逐题验证并原样产出，供单次遍历的流水线使用
+
+    report 字典中累计 valid（有效题目数）、warnings（警告总数）、
+    details（警告详情列表，格式同 validate_questions）
+    """
+    for idx, q in enumerate(questions, 1):
+        valid, warnings = validate_question(q, idx)
+        if valid:
+            report['valid'] += 1
+        if warnings:
+            report['warnings'] += len(warnings)
+            report['details'].append((idx, q.get('question', '')[:30], warnings))
+        yield q
+
+
+def _print_warning_lines(warning_details):
+    """详细模式下逐条打印验证警告"""
+    for idx, _, warnings in warning_details:
+        for w in warnings:
+            print(f'  ⚠ 第{idx}题: {w}')
+
+
+def report_near_duplicates(questions, threshold, drop=False, verbose=False, type_labels=None):
+    """
+    打印近似重复题目簇及其位置，drop 为 True 时每簇只保留最先出现的一道；
+    type_labels 为显示用的题型叫法，见 register_emitter
+
+    Returns:
+        处理后的题目列表
+    """
+    clusters = find_near_duplicates(questions, threshold)
+    if not clusters:
+        return questions
+
+    print(f'  近似重复: {len(clusters)} 组，共 {sum(map(len, clusters))} 道题（相似度 ≥ {threshold}）')
+    shown = clusters if verbose else clusters[:10]  # 非详细模式最多显示10组
+    for cluster in shown:
+        first = questions[cluster[0]]
+        question_text = first.get('question', '').strip()
+        q_preview = question_text[:40] + ('...' if len(question_text) > 40 else '')
+        locations = '、'.join(
+            _question_location(None, questions[idx].get('_source_sheet', ''),
+                               questions[idx].get('_source_row', 0), idx + 1)
+            for idx in cluster)
+        q_type = first.get('type', '未知')
+        print(f'    ≈ [{(type_labels or {}).get(q_type, q_type)}] {locations}: "{q_preview}"')
+    if len(shown) < len(clusters):
+        print(f'    ... 还有 {len(clusters) - len(shown)} 组')
+
+    if drop:
+        dropped = {idx for cluster in clusters for idx in cluster[1:]}
+        questions = [q for idx, q in enumerate(questions) if idx not in dropped]
+        print(f'  去除近似重复题目: {len(dropped)} 道，剩余 {len(questions)} 道')
+    return questions
+
+
+def get_file_base_name(file_path):
+    """
+    获取文件基础名称（不含扩展名）
+    本工具输出的 .tqb 文件去掉 TQB_SUFFIX，再次转换的输出文件名和来源与从原文件转换时一致
+    """
+    stem, ext = os.path.splitext(os.path.basename(file_path))
+    if ext.lower() == '.tqb' and stem.endswith(TQB_SUFFIX) and stem != TQB_SUFFIX:
+        stem = stem[:-len(TQB_SUFFIX)]
+    return stem
+
+
+def output_file_name(file_path, emitter):
+    """输入文件对应的输出文件名：原文件名 + 格式后缀 + 扩展名（拆分输出时为各分片的共同前缀）"""
+    return f'{get_file_base_name(file_path)}{emitter.suffix}{emitter.extension}'
+
+
+# 解析器对应的逐题产出版本，流水线直接使用，不必先把整个文件的题目汇总成列表
+_ITER_PARSERS = {
+    parse_mid_level_excel: iter_mid_level_excel,
+    parse_2024_summary_excel: iter_2024_summary_excel,
+    parse_doc_file: iter_doc_file,
+    parse_crh6_docx: iter_crh6_docx,
+    parse_text_file: iter_text_file,
+    parse_generic_excel: iter_generic_excel,
+    parse_generic_docx: iter_generic_docx,
+    parse_question_bank: iter_question_bank,
+}
+
+
+def iter_parsed_questions(parser_func, file_path):
+    """用解析器对应的生成器逐题产出；functools.partial 包装的解析器保留其参数"""
+    func, args, kwargs = parser_func, (), {}
+    if isinstance(parser_func, functools.partial):
+        func, args, kwargs = parser_func.func, parser_func.args, parser_func.keywords
+    iter_func = _ITER_PARSERS.get(func)
+    if iter_func is None:
+        yield from parser_func(file_path)
+    else:
+        yield from iter_func(file_path, *args, **kwargs)
+
+
+def process_file(file_path, parser_func, base_path, targets=DEFAULT_TARGETS, verbose=False, dry_run=False,
+                 cache_dir=None, dedup_index=None, near_dup=None, external_dedup=None, profile=None,
+                 split=None, workers=1):
+    """
+    通用文件处理函数
+
+    解析结果逐题流经 来源标记 → 验证 → 去重 → 题型统计 → 各输出格式的写入器，
+    整个文件只遍历一次，题目列表不必整体驻留内存；处理报告在遍历结束后按原来的顺序打印。
+    近似重复检测需要完整的题目列表，指定时才汇总成列表；外存去重把题目暂存到磁盘上的 .tqb 文件再读回。
+    指定 cache_dir 时，内容未变的文件直接读取缓存的解析结果，
+    输入和输出文件都未变化的输出跳过重新写出
+
+    Args:
+        file_path: 输入文件路径
+        parser_func: 解析器函数
+        base_path: 输出目录
+        targets: 输出格式名称列表，见 EMITTERS
+        verbose: 是否显示详细信息（包括验证警告）
+        dry_run: 仅解析验证，不输出文件
+        cache_dir: 解析结果缓存目录，None 表示不使用缓存
+        dedup_index: 跨文件共用的去重索引，None 表示只在本文件内去重
+        near_dup: (相似度阈值, 是否去除) 时检测近似重复题目，None 表示不检测
+        external_dedup: 外存去重每个顺串的记录数，None 表示在内存中去重
+        profile: FileProfile，记录各阶段耗时（其 memory 不为 None 时同时统计内存）；None 表示不计时
+        split: (拆分方式, 每个分片的最多题目数) 时拆分输出文件，见 _PartitionedSink；None 表示不拆分
+        workers: 拆分输出时并行写出各分片的进程数
+
+    Returns:
+        (题目数, output_files, warnings_count) 或 (None, [], 0) 如果失败
+    """
+    if not os.path.exists(file_path):
+        return None, [], 0
+
+    file_name = os.path.basename(file_path)
+    base_name = get_file_base_name(file_path)
+
+    print('\n' + '-' * 40)
+    print(f'处理 {file_name}...')
+
+    # 解析来源：内容未变时直接读取缓存，否则边解析边写入缓存
+    key = None
+    if cache_dir:
+        try:
+            key = cache_key(file_path, parser_func)
+        except OSError:
+            key = None
+    # .tqb 中间文件本身就能快速读取，不再另存解析缓存，缓存键只用于判断输出是否变化
+    cache_parsed = key and parser_func is not parse_question_bank
+
+    def parse():
+        questions = iter_parsed_questions(parser_func, file_path)
+        return iter_caching_questions(questions, cache_dir, key) if cache_parsed else questions
+
+    parsed = open_cached_questions(cache_dir, key, parse) if cache_parsed else None
+    if parsed is not None:
+        print(f'  使用解析缓存')
+    else:
+        parsed = parse()
+
+    parse_state = {'count': 0, 'errors': []}
+
+    def timed(name, iterable, upstream=None):
+        return profile.iter(name, iterable, upstream) if profile else iterable
+
+    def timing(name, upstream=None):
+        return profile.stage(name, upstream) if profile else contextlib.nullcontext()
+
+    memory = profile.memory if profile else None
+
+    def measuring(name):
+        return memory.segment(name) if memory else contextlib.nullcontext()
+
+    def parse_failed():
+        if parse_state['errors']:
+            if dedup_index is not None:
+                _forget_source(dedup_index, base_name)
+            print(f'  ✗ 解析失败: {parse_state["errors"][0]}')
+            return True
+        if not parse_state['count']:
+            print(f'  ✗ 未解析到任何题目')
+            return True
+        return False
+
+    validation = {'valid': 0, 'warnings': 0, 'details': []}
+    duplicate_details = []
+    # 题型统计和重复题报告沿用第一个输出格式的题型叫法
+    type_labels = (EMITTERS[targets[0]].type_labels if targets else None) or {}
+
+    def print_report(remaining):
+        print(f'  解析到 {parse_state["count"]} 道题目')
+
+        # 验证结果
+        warnings_count, warning_details = validation['warnings'], validation['details']
+        if verbose:
+            _print_warning_lines(warning_details)
+        if warnings_count > 0:
+            print(f'  ⚠ 发现 {warnings_count} 个数据质量警告')
+            if verbose and warning_details:
+                for idx, q_text, warns in warning_details[:10]:  # 最多显示10个
+                    print(f'    第{idx}题 "{q_text}...": {", ".join(warns)}')
+                if len(warning_details) > 10:
+                    print(f'    ... 还有 {len(warning_details) - 10} 个警告')
+
+        # 去重结果
+        if duplicate_details:
+            print(f'  去除重复题目: {len(duplicate_details)} 道，剩余 {remaining} 道')
+            # 输出重复题目详情
+            for dup_loc, first_loc, q_preview, q_type in duplicate_details:
+                print(f'    ↳ {dup_loc} [{type_labels.get(q_type, q_type)}] 与 {first_loc} 重复: "{q_preview}"')
+
+    # 验证、去重
+    tagged = iter_tagged_questions(parsed, base_name, parse_state)
+    questions = timed('validate', iter_validated_questions(timed('parse', tagged), validation), 'parse')
+    if memory:
+        questions = memory.iter(questions)
+    if external_dedup and dedup_index is None:
+        # 外存去重把题目暂存到磁盘再读回，题目列表同样不驻留内存
+        unique = iter_unique_questions_external(questions, duplicate_details, run_records=external_dedup)
+    else:
+        unique = iter_unique_questions(questions, duplicate_details, index=dedup_index, source=base_name)
+    questions = timed('dedup', unique, 'validate')
+
+    # 近似重复检测需要完整的题目列表
+    output_key = key
+    report_printed = False
+    if near_dup:
+        with measuring('collect'):
+            questions = list(questions)
+        if parse_failed():
+            return None, [], 0
+        print_report(len(questions))
+        report_printed = True
+        threshold, drop = near_dup
+        with timing('near_dup'):
+            questions = report_near_duplicates(questions, threshold, drop=drop, verbose=verbose,
+                                               type_labels=type_labels)
+        if drop and key:
+            output_key = f'{key}:near-dup:{threshold}'
+
+    # 全局去重时输出还取决于其他文件，不能按本文件的输入判断是否变化；拆分输出的文件数不固定，也不跳过
+    reuse = output_key and dedup_index is None and not split
+    outputs = []
+
+    def open_sink(target, emitter, output_path, row_count):
+        if split:
+            return _PartitionedSink(target, output_path[:-len(emitter.extension)], split, workers)
+        return open_emitter_sink(emitter, output_path, row_count)
+
+    for target in targets:
+        emitter = EMITTERS[target]
+        output_name = output_file_name(file_path, emitter)
+        output_path = os.path.join(base_path, output_name)
+        current = not dry_run and reuse and output_is_current(cache_dir, output_key, target, output_path)
+        outputs.append((target, emitter, output_name, output_path, current))
+
+    # 单次遍历：题型统计并逐题写入各输出格式；写入器在第一道题到达时才创建
+    row_count = len(questions) if isinstance(questions, list) else None
+    sinks = None
+    type_count = {}
+    unique_count = 0
+    with timing('write', None if row_count is not None else 'dedup'):
+        for q in questions:
+            if sinks is None:
+                sinks = [open_sink(target, emitter, path, row_count)
+                         for target, emitter, _, path, current in outputs if not (dry_run or current)]
+            unique_count += 1
+            t = q.get('type', '未知')
+            t = type_labels.get(t, t)
+            type_count[t] = type_count.get(t, 0) + 1
+            for sink in sinks:
+                sink.append(q)
+    if profile:
+        profile.questions = parse_state['count']
+
+    if not report_printed:
+        if parse_failed():
+            return None, [], 0
+        print_report(unique_count)
+    print_type_count(type_count, base_name)
+    warnings_count = validation['warnings']
+
+    # 如果是 dry-run 模式，不输出文件
+    if dry_run:
+        print(f'  [dry-run] 跳过文件输出')
+        return unique_count, [], warnings_count
+
+    # 跨文件去重后可能一道题都不剩，此时不输出只有表头的文件
+    if not unique_count:
+        print(f'  全部为重复题目，跳过输出')
+        return 0, [], warnings_count
+
+    pending = iter(sinks)
+    output_names = []
+    for target, emitter, output_name, output_path, current in outputs:
+        if current:
+            print(f'  输出未变化，跳过: {output_path}')
+        else:
+            sink = next(pending)
+            with timing('save'):
+                sink.save()
+            if reuse:
+                record_output(cache_dir, output_key, target, output_path)
+            if split:
+                # 拆分输出列出实际写出的各分片
+                output_names.extend(sink.output_names)
+                continue
+        output_names.append(output_name)
+
+    return unique_count, output_names, warnings_count
+
+
+# ========== 多进程批量处理 ==========
+# 支持单文件分片并行解析的解析器
+_SHARDED_PARSERS = (parse_text_file, parse_generic_docx)
+
+
+def _process_file_task(file_path, parser_func, out_dir, targets=DEFAULT_TARGETS, verbose=False,
+                       dry_run=False, capture=True, workers=1, cache_dir=None, dedup_index=None,
+                       near_dup=None, external_dedup=None, profile=False, profile_dir=None,
+                       profile_memory=False, split=None):
+    """
+    处理单个文件，供串行和进程池共用
+
+    异常只影响当前文件；capture 为 True 时捕获该文件的全部输出，
+    由主进程按输入顺序回放。workers > 1 时支持分片的解析器在文件内部并行，拆分输出的各分片也并行写出。
+    profile 为 True 时记录各阶段耗时，指定 profile_dir 时同时用 cProfile 剖析，输出写入该目录；
+    profile_memory 为 True 时同时统计各阶段的内存
+
+    Returns:
+        (题目数, 输出文件名列表, 警告数, 捕获的输出, FileProfile 或 None)，解析失败时题目数为 None
+    """
+    if workers > 1 and parser_func in _SHARDED_PARSERS:
+        parser_func = functools.partial(parser_func, workers=workers)
+
+    memory = MemoryProfile() if profile and profile_memory else None
+    file_profile = FileProfile(file_path, memory) if profile else None
+    profiler = cProfile.Profile() if profile and profile_dir else None
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer) if capture else contextlib.nullcontext():
+        wall, cpu = time.perf_counter(), time.process_time()
+        if memory:
+            memory.start()
+        if profiler:
+            profiler.enable()
+        try:
+            question_count, output_names, warnings_count = process_file(
+                file_path, parser_func, out_dir, targets,
+                verbose=verbose, dry_run=dry_run, cache_dir=cache_dir,
+                dedup_index=dedup_index, near_dup=near_dup, external_dedup=external_dedup,
+                profile=file_profile, split=split, workers=workers
+            )
+        except Exception as e:
+            print(f'  ✗ 处理失败: {e}')
+            question_count, output_names, warnings_count = None, [], 0
+        finally:
+            if profiler:
+                profiler.disable()
+            if memory:
+                memory.stop()
+
+    if file_profile:
+        file_profile.finish(time.perf_counter() - wall, time.process_time() - cpu)
+        if profiler:
+            path = os.path.join(profile_dir, f'{os.path.basename(file_path)}.prof')
+            try:
+                profiler.dump_stats(path)
+                file_profile.cprofile = path
+            except OSError:
+                pass
+    return question_count, output_names, warnings_count, buffer.getvalue(), file_profile
+
+
+def _file_size(file_path):
+    """文件大小，无法获取时视为0"""
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
+def run_file_tasks(entries, targets=DEFAULT_TARGETS, jobs=1, verbose=False, dry_run=False,
+                   cache_dir=None, dedup_index=None, near_dup=None, external_dedup=None,
+                   profile=False, profile_dir=None, profile_memory=False, split=None):
+    """
+    按输入顺序逐个产出 (file_path, skip, result)
+
+    entries 为 (file_path, skip, task) 列表：skip 为 (提示信息, 原因) 或 None，
+    task 为 (parser_func, out_dir)，targets 为输出格式列表。jobs > 1 时在进程池中处理，
+    大文件先提交以缩短整批耗时；结果仍按输入顺序产出，报告顺序与串行一致。
+    文件数少于 jobs 时，多出的进程分给各文件做分片解析和拆分输出的并行写出。
+    指定 dedup_index（跨文件去重）时，文件须按输入顺序依次处理，jobs 全部用于文件内分片解析
+    """
+    tasks = [(i, entry) for i, entry in enumerate(entries) if entry[2]]
+    workers = max(1, jobs // max(1, len(tasks)))
+    if dedup_index is not None:
+        workers = max(1, jobs)
+
+    if jobs <= 1 or len(tasks) <= 1 or dedup_index is not None:
+        for file_path, skip, task in entries:
+            result = None
+            if task:
+                result = _process_file_task(file_path, *task, targets, verbose, dry_run,
+                                            capture=False, workers=workers, cache_dir=cache_dir,
+                                            dedup_index=dedup_index, near_dup=near_dup,
+                                            external_dedup=external_dedup, profile=profile,
+                                            profile_dir=profile_dir, profile_memory=profile_memory,
+                                            split=split)
+            yield file_path, skip, result
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    tasks.sort(key=lambda item: _file_size(item[1][0]), reverse=True)
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as executor:
+        futures = {}
+        for i, (file_path, _, task) in tasks:
+            futures[i] = executor.submit(_process_file_task, file_path, *task, targets, verbose,
+                                         dry_run, workers=workers, cache_dir=cache_dir,
+                                         near_dup=near_dup, external_dedup=external_dedup,
+                                         profile=profile, profile_dir=profile_dir,
+                                         profile_memory=profile_memory, split=split)
+
+        for i, (file_path, skip, task) in enumerate(entries):
+            result = None
+            if task:
+                try:
+                    result = futures[i].result()
+                except Exception as e:
+                    # 工作进程异常退出等情况，只记为该文件失败
+                    log = '\n' + '-' * 40 + f'\n处理 {os.path.basename(file_path)}...\n  ✗ 处理失败: {e}\n'
+                    result = (None, [], 0, log, None)
+            yield file_path, skip, result
+
+
+def prepare_file_entry(file_path, output_dir=None):
+    """
+    检查输入文件并确定解析器和输出目录
+
+    Returns:
+        (file_path, skip, task)，见 run_file_tasks
+    """
+    # 检查文件是否存在
+    if not os.path.exists(file_path):
+        return file_path, (f'警告: 文件不存在，跳过 - {file_path}', '文件不存在'), None
+
+    # 检查文件扩展名
+    ext = os.path.splitext(file_path)[1].lower()
+    supported_exts = ['.xlsx', '.docx', '.doc', '.txt', '.tqb']
+    if ext not in supported_exts:
+        return file_path, (f'警告: 不支持的文件格式，跳过 - {file_path}', '不支持的格式'), None
+
+    # 获取解析器
+    parser_func = get_parser_for_file(file_path)
+    if not parser_func:
+        return file_path, (f'警告: 无法找到合适的解析器，跳过 - {file_path}', '无合适解析器'), None
+
+    # 确定输出目录
+    out_dir = output_dir if output_dir else os.path.dirname(os.path.abspath(file_path))
+    if not out_dir:
+        out_dir = '.'
+
+    return file_path, None, (parser_func, out_dir)
+
+
+def check_output_conflicts(entries, targets):
+    """
+    检查各输入文件的输出路径，返回新的 entries
+
+    输出会覆盖本批某个输入文件，或与前面某个输入的输出相同（如同名的 .doc 和 .docx）时，
+    跳过该文件并说明原因，不让后处理的文件悄悄覆盖先前的输出
+    """
+    inputs = {os.path.abspath(file_path) for file_path, _, task in entries if task}
+    claimed = {}
+    checked = []
+    for file_path, skip, task in entries:
+        if task:
+            paths = [os.path.abspath(os.path.join(task[1], output_file_name(file_path, EMITTERS[target])))
+                     for target in targets]
+            for path in paths:
+                name = os.path.basename(path)
+                if path in inputs:
+                    skip = (f'警告: 输出文件 {name} 会覆盖输入文件，跳过 - {file_path}', f'输出 {name} 与输入文件相同')
+                elif path in claimed:
+                    skip = (f'警告: 输出文件 {name} 与 {claimed[path]} 的输出冲突，跳过 - {file_path}',
+                            f'输出 {name} 与 {claimed[path]} 冲突')
+                if skip:
+                    task = None
+                    break
+            else:
+                claimed.update(dict.fromkeys(paths, file_path))
+        checked.append((file_path, skip, task))
+    return checked
+
+
+def parse_similarity(value):
+    """解析相似度阈值参数，取值 (0, 1]"""
+    try:
+        threshold = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'无效的相似度: {value}')
+    if not 0 < threshold <= 1:
+        raise argparse.ArgumentTypeError(f'相似度须在0到1之间: {value}')
+    return threshold
+
+
+def parse_max_rows(value):
+    """解析 --max-rows 参数，取正整数"""
+    try:
+        rows = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'无效的题目数: {value}')
+    if rows <= 0:
+        raise argparse.ArgumentTypeError(f'题目数须为正整数: {value}')
+    return rows
+
+
+def parse_targets(value):
+    """解析 --targets 参数：逗号分隔的输出格式名称，去重并保持顺序"""
+    targets = []
+    for name in value.split(','):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in EMITTERS:
+            raise argparse.ArgumentTypeError(
+                f'未知的输出格式: {name}（可选: {", ".join(EMITTERS)}）')
+        if name not in targets:
+            targets.append(name)
+    if not targets:
+        raise argparse.ArgumentTypeError('至少需要指定一种输出格式')
+    return targets
+
+
+def create_argument_parser(prog, description, default_targets=DEFAULT_TARGETS):
+    """
+    创建命令行参数解析器
+
+    Args:
+        prog: 脚本名称
+        description: 工具说明
+        default_targets: 未指定 --targets 时的输出格式
+    """
+    outputs = '\n'.join(f'    {name}: 原文件名{emitter.suffix}{emitter.extension}（{emitter.description}）'
+                        for name, emitter in EMITTERS.items())
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description=description,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例:
+    # 转换单个文件
+    python3 %(prog)s 我的题库.xlsx
+
+    # 转换多个文件
+    python3 %(prog)s 题库1.xlsx 题库2.docx
+
+    # 转换当前目录所有Excel文件
+    python3 %(prog)s *.xlsx
+
+    # 指定输出目录
+    python3 %(prog)s -o /path/to/output 题库.xlsx
+
+    # 详细模式（显示验证警告）
+    python3 %(prog)s -v 题库.xlsx
+
+    # 仅验证不输出文件
+    python3 %(prog)s --dry-run 题库.xlsx
+
+    # 使用4个进程并行转换
+    python3 %(prog)s -j 4 *.xlsx
+
+    # 解析一次，同时输出磨题帮和刷题搭档两种格式
+    python3 %(prog)s --targets motibang,shuatidadang 题库.xlsx
+
+    # 按题型拆分输出，每个文件最多5000道题（题库_磨题帮_单选题_001.xlsx ...），4个进程并行写出
+    python3 %(prog)s --split-by type --max-rows 5000 -j 4 大题库.xlsx
+
+    # 另存解析结果为 .tqb 中间文件，之后直接从中间文件输出，不必重新解析原文件
+    python3 %(prog)s --targets motibang,tqb 题库.docx
+    python3 %(prog)s --targets shuatidadang 题库_解析.tqb
+
+    # 缓存解析结果，再次转换时未改动的文件不重新解析、不重新写出
+    python3 %(prog)s --cache *.xlsx
+
+    # 监视目录，文件保存后自动重新转换
+    python3 %(prog)s --watch 题库目录
+
+    # 跨文件去重：后面文件中与前面文件重复的题目不再输出
+    python3 %(prog)s --global-dedup *.xlsx
+
+    # 找出相似度不低于0.9的近似重复题目，每组只保留一道
+    python3 %(prog)s --near-dup 0.9 --near-dup-drop 题库.xlsx
+
+    # 超大题库去重时索引写入临时文件，不占用大量内存
+    python3 %(prog)s --external-dedup 合并题库.txt
+
+    # 记录各阶段耗时，并保留最慢3个文件的 cProfile 输出
+    python3 %(prog)s --profile --profile-dump prof *.xlsx
+
+    # 统计各文件各阶段的峰值内存和占用最多的分配位置
+    python3 %(prog)s --profile-memory 车辆题库汇总2024.xlsx
+
+支持的文件格式: .xlsx, .docx, .doc, .txt, .tqb（本工具输出的二进制中间格式）
+输出格式:
+""" + outputs + '\n'
+    )
+    parser.add_argument('files', nargs='*', metavar='文件',
+                        help='要转换的题库文件（支持通配符）')
+    parser.add_argument('-o', '--output', metavar='目录',
+                        help='指定输出目录（默认为文件所在目录）')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='详细模式，显示验证警告信息')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='仅解析验证，不输出文件')
+    parser.add_argument('-j', '--jobs', type=int, default=1, metavar='N',
+                        help='并行处理的进程数（默认1，0表示使用全部CPU核心）')
+    parser.add_argument('-t', '--targets', type=parse_targets, default=list(default_targets),
+                        metavar='格式',
+                        help=f'输出格式，多个用逗号分隔（可选: {", ".join(EMITTERS)}；'
+                             f'默认 {",".join(default_targets)}）')
+    parser.add_argument('--split-by', choices=list(SPLIT_FIELDS),
+                        help='拆分输出文件：type 按题型，sheet 按来源工作表（Excel 题库）；'
+                             '每个输入文件本来就单独输出，不需要再按来源文件拆分')
+    parser.add_argument('--max-rows', type=parse_max_rows, metavar='N',
+                        help='每个输出文件最多N道题，超出时拆分为 _001、_002 等分片（可与 --split-by 同时使用）')
+    dedup_group = parser.add_mutually_exclusive_group()
+    dedup_group.add_argument('--global-dedup', action='store_true',
+                             help='在本次处理的全部文件之间去重，保留最先出现的题目（按输入顺序处理）')
+    dedup_group.add_argument('--external-dedup', type=int, nargs='?', const=DEFAULT_DEDUP_RUN_RECORDS,
+                             metavar='N',
+                             help='外存去重：题目和去重索引都写入临时文件，索引分批排序后归并，内存占用有上限，'
+                                  f'N 为每批记录数（默认{DEFAULT_DEDUP_RUN_RECORDS}）')
+    parser.add_argument('--near-dup', type=parse_similarity, nargs='?', const=DEFAULT_NEAR_DUP_THRESHOLD,
+                        metavar='相似度',
+                        help=f'检测近似重复题目（只差标点、空白、选项顺序或个别字），'
+                             f'可指定相似度阈值（默认{DEFAULT_NEAR_DUP_THRESHOLD}）')
+    parser.add_argument('--near-dup-drop', action='store_true',
+                        help='配合 --near-dup，每组近似重复题目只保留最先出现的一道')
+    parser.add_argument('--cache', action='store_true',
+                        help=f'缓存解析结果，未改动的文件不再重新解析和写出（缓存目录默认 {default_cache_dir()}）')
+    parser.add_argument('--cache-dir', metavar='目录',
+                        help='解析结果缓存目录，指定时即使用缓存')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='不使用缓存（覆盖 --cache 和 --cache-dir）')
+    parser.add_argument('--cache-max-size', type=int, default=DEFAULT_CACHE_MAX_MB, metavar='MB',
+                        help='缓存总大小上限，超出时删除最久未使用的条目（默认%(default)sMB）')
+    parser.add_argument('--cache-max-age', type=int, default=DEFAULT_CACHE_MAX_DAYS, metavar='天',
+                        help='删除超过该天数未使用的缓存条目（默认%(default)s天）')
+    parser.add_argument('--watch', metavar='目录',
+                        help='监视目录，自动转换新增或修改的题库文件（Ctrl+C 退出）')
+    parser.add_argument('--watch-interval', type=float, default=1.0, metavar='秒',
+                        help='监视模式的轮询间隔（默认%(default)s秒）')
+    parser.add_argument('--watch-debounce', type=float, default=2.0, metavar='秒',
+                        help='文件停止变化多少秒后再转换（默认%(default)s秒）')
+    parser.add_argument('--profile', nargs='?', const=DEFAULT_PROFILE_JSON, metavar='JSON文件',
+                        help='记录每个文件各阶段（解析、验证、去重、写入、保存）的墙钟和CPU时间及每秒题目数，'
+                             f'列入转换报告并写入 JSON 指标文件（默认 {DEFAULT_PROFILE_JSON}）')
+    parser.add_argument('--profile-dump', metavar='目录',
+                        help='配合 --profile，用 cProfile 剖析每个文件，在该目录保留最慢几个文件的 .prof 输出')
+    parser.add_argument('--profile-top', type=int, default=DEFAULT_PROFILE_TOP, metavar='N',
+                        help='--profile-dump 保留的最慢文件数（默认%(default)s）')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='配合 --profile，用 tracemalloc 统计每个文件各阶段的峰值内存、峰值RSS，'
+                             '以及堆占用最高时各阶段占用最多的分配位置（处理会慢数十倍）')
+    parser.add_argument('--version', action='version',
+                        version=f'%(prog)s {__version__}')
+    return parser
+
+
+def convert_files(files_to_process, args, cache_dir=None):
+    """转换一批文件并打印转换报告，args 为命令行参数；返回写出的输出文件路径（绝对路径）列表"""
+    # 统计变量
+    total_questions = 0
+    total_warnings = 0
+    generated_files = []
+    output_paths = []
+    failed_files = []
+    skipped_files = []
+    duplicate_files = []
+    profiles = []
+    started = time.perf_counter()
+
+    # 处理命令行指定的文件
+    print(f'待处理文件: {len(files_to_process)} 个')
+    if args.verbose:
+        print(f'模式: {"仅验证" if args.dry_run else "转换输出"}')
+        print(f'输出格式: {", ".join(args.targets)}')
+
+    entries = [prepare_file_entry(file_path, args.output) for file_path in files_to_process]
+    entries = check_output_conflicts(entries, args.targets)
+    out_dirs = {file_path: task[1] for file_path, _, task in entries if task}
+    if args.jobs > 1:
+        print(f'并行进程数: {args.jobs}')
+
+    dedup_index = {} if args.global_dedup else None
+    near_dup = (args.near_dup, args.near_dup_drop) if args.near_dup else None
+    split = (args.split_by, args.max_rows) if args.split_by or args.max_rows else None
+    profile_dir = args.profile_dump if args.profile else None
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+    for file_path, skip, result in run_file_tasks(entries, args.targets, jobs=args.jobs,
+                                                  verbose=args.verbose, dry_run=args.dry_run,
+                                                  cache_dir=cache_dir, dedup_index=dedup_index,
+                                                  near_dup=near_dup,
+                                                  external_dedup=args.external_dedup,
+                                                  profile=bool(args.profile), profile_dir=profile_dir,
+                                                  profile_memory=args.profile_memory, split=split):
+        if skip:
+            message, reason = skip
+            print(message)
+            skipped_files.append((file_path, reason))
+            continue
+
+        question_count, output_names, warnings_count, log, file_profile = result
+        if log:
+            sys.stdout.write(log)
+        if file_profile:
+            profiles.append(file_profile)
+
+        # 题目数为 None 表示解析失败；为 0 表示题目全部与前面的文件重复，不算失败
+        if question_count is None:
+            failed_files.append((file_path, '解析失败或无题目'))
+            continue
+        generated_files.extend(output_names)
+        output_paths.extend(os.path.abspath(os.path.join(out_dirs[file_path], name)) for name in output_names)
+        total_questions += question_count
+        total_warnings += warnings_count
+        if not question_count:
+            duplicate_files.append(file_path)
+
+    # 总结报告
+    print('\n' + '=' * 60)
+    print('转换报告')
+    print('=' * 60)
+    print(f'处理题目总数: {total_questions} 道')
+
+    if generated_files:
+        print(f'\n✓ 成功生成文件 ({len(generated_files)} 个):')
+        for f in generated_files:
+            print(f'  - {f}')
+
+    if total_warnings > 0:
+        print(f'\n⚠ 数据质量警告: {total_warnings} 个')
+        if not args.verbose:
+            print('  (使用 -v 参数查看详细警告信息)')
+
+    if failed_files:
+        print(f'\n✗ 处理失败 ({len(failed_files)} 个):')
+        for f, reason in failed_files:
+            print(f'  - {f}: {reason}')
+
+    if duplicate_files:
+        print(f'\n○ 全部为重复题，未输出 ({len(duplicate_files)} 个):')
+        for f in duplicate_files:
+            print(f'  - {f}')
+
+    if skipped_files:
+        print(f'\n○ 已跳过 ({len(skipped_files)} 个):')
+        for f, reason in skipped_files:
+            print(f'  - {f}: {reason}')
+
+    if not generated_files and not args.dry_run:
+        print('\n未生成任何文件！')
+
+    if args.profile:
+        elapsed = time.perf_counter() - started
+        keep_slowest_cprofiles(profiles, args.profile_top)
+        if profiles:
+            print_profile_report(profiles, elapsed)
+        try:
+            write_profile_json(args.profile, profiles, elapsed, args)
+            print(f'  剖析数据已保存到: {args.profile}')
+        except OSError as e:
+            print(f'  ✗ 剖析数据保存失败: {e}')
+
+    if cache_dir:
+        removed, remaining = prune_cache(cache_dir, args.cache_max_size * 1024 * 1024,
+                                         args.cache_max_age * 86400)
+        if args.verbose:
+            print(f'\n缓存: {cache_dir}（{remaining / 1024 / 1024:.1f}MB，本次清理 {removed} 个条目）')
+
+    print('=' * 60)
+    return output_paths
+
+
+# ========== 监视模式 ==========
+_WATCH_EXTENSIONS = ('.xlsx', '.docx', '.doc', '.txt', '.tqb')
+
+
+def _is_watch_candidate(name):
+    """可能需要转换的文件：支持的格式，跳过隐藏文件和 Office 锁文件 (~$)"""
+    if name.startswith(('.', '~$')):
+        return False
+    return os.path.splitext(name)[1].lower() in _WATCH_EXTENSIONS
+
+
+def _is_output_path(path, outputs, shard_prefixes):
+    """
+    path 是否为本工具的输出：outputs 中的完整路径，
+    或某个 shard_prefixes 前缀（输入文件的输出路径去掉扩展名 + _）开头的拆分分片
+    """
+    if path in outputs:
+        return True
+    stem, ext = os.path.splitext(path)
+    pos = stem.find('_')
+    while pos != -1:
+        if (stem[:pos + 1], ext) in shard_prefixes:
+            return True
+        pos = stem.find('_', pos + 1)
+    return False
+
+
+def scan_input_tree(root, output_dir=None, split=None, produced=()):
+    """
+    扫描目录树中需要转换的题库文件
+
+    按目录中的每个题库文件算出它在各输出格式下的输出路径（output_dir 为 None 时与输入同目录），
+    这些路径上的文件和 produced 中本次运行实际写出的文件都是本工具的输出，不作为输入；
+    只是文件名以格式后缀结尾、旁边没有对应原文件的文件照常转换。
+    拆分输出（split 见 process_file）的分片名由题目内容决定，按对应原文件的输出路径前缀识别
+
+    Returns:
+        {文件路径: (修改时间ns, 文件大小)}
+    """
+    candidates = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        for name in filenames:
+            if not _is_watch_candidate(name):
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            candidates[path] = (st.st_mtime_ns, st.st_size)
+
+    outputs = set(produced)
+    shard_prefixes = set()
+    for path in candidates:
+        out_dir = output_dir or os.path.dirname(os.path.abspath(path))
+        for emitter in EMITTERS.values():
+            output_path = os.path.abspath(os.path.join(out_dir, output_file_name(path, emitter)))
+            # X_解析.tqb 的 .tqb 输出路径就是它自己，不能因此把它当成输出
+            if output_path != os.path.abspath(path):
+                outputs.add(output_path)
+            if split:
+                shard_prefixes.add((output_path[:-len(emitter.extension)] + '_', emitter.extension))
+    return {path: stat for path, stat in candidates.items()
+            if not _is_output_path(os.path.abspath(path), outputs, shard_prefixes)}
+
+
+def watch_directory(root, args, cache_dir=None, interval=None, debounce=None):
+    """
+    监视目录并转换新增或修改的题库文件，Ctrl+C 退出
+
+    按修改时间和大小轮询检测变动；文件在 debounce 秒内不再变化才开始转换，
+    避免编辑器多次保存时重复转换。启动时先转换一遍全部文件，
+    使用解析缓存（--cache）时，未变化的文件不会重新解析和写出
+    """
+    interval = args.watch_interval if interval is None else interval
+    debounce = args.watch_debounce if debounce is None else debounce
+    split = (args.split_by, args.max_rows) if args.split_by or args.max_rows else None
+
+    if not os.path.isdir(root):
+        print(f'错误: 监视目录不存在 - {root}')
+        return
+
+    print(f'监视目录: {os.path.abspath(root)}（轮询间隔 {interval}s，防抖 {debounce}s，Ctrl+C 退出）')
+    # 本次运行写出的文件，之后扫描时都不作为输入
+    produced = set()
+    known = scan_input_tree(root, args.output, split)
+    if known:
+        produced.update(convert_files(sorted(known), args, cache_dir))
+
+    # 有变动但尚未稳定的文件: {路径: (修改时间ns, 文件大小), 最后变动时间}
+    pending = {}
+    try:
+        while True:
+            time.sleep(interval)
+            now = time.monotonic()
+            snapshot = scan_input_tree(root, args.output, split, produced)
+            for path, stat in snapshot.items():
+                if known.get(path) != stat:
+                    if path not in pending or pending[path][0] != stat:
+                        pending[path] = (stat, now)
+                    known[path] = stat
+            for path in list(known):
+                if path not in snapshot:
+                    del known[path]
+                    pending.pop(path, None)
+
+            ready = sorted(path for path, (_, changed) in pending.items()
+                           if now - changed >= debounce)
+            if ready:
+                for path in ready:
+                    del pending[path]
+                print(f'\n[{time.strftime("%H:%M:%S")}] 检测到 {len(ready)} 个文件变动')
+                produced.update(convert_files(ready, args, cache_dir))
+    except KeyboardInterrupt:
+        print('\n停止监视')
+
+
+def main(prog, description, default_targets=DEFAULT_TARGETS):
+    """主函数，支持命令行参数；各转换脚本传入自己的名称和默认输出格式"""
+    # 解析命令行参数
+    parser = create_argument_parser(prog, description, default_targets)
+    args = parser.parse_args()
+    if args.jobs <= 0:
+        args.jobs = os.cpu_count() or 1
+    cache_dir = args.cache_dir or (default_cache_dir() if args.cache else None)
+    if args.no_cache:
+        cache_dir = None
+    if args.near_dup_drop and args.near_dup is None:
+        args.near_dup = DEFAULT_NEAR_DUP_THRESHOLD
+    if (args.profile_dump or args.profile_memory) and not args.profile:
+        args.profile = DEFAULT_PROFILE_JSON
+
+    # 展开通配符
+    files_to_process = []
+    for pattern in args.files:
+        if '*' in pattern or '?' in pattern:
+            expanded = glob_module.glob(pattern)
+            files_to_process.extend(expanded)
+        else:
+            files_to_process.append(pattern)
+
+    print('=' * 60)
+    print(f'{description} v{__version__}')
+    print('=' * 60)
+
+    # 监视模式：常驻进程，只重新转换有变动的文件
+    if args.watch:
+        watch_directory(args.watch, args, cache_dir)
+        return
+
+    # 如果没有指定文件，显示帮助信息并退出
+    if not files_to_process:
+        print('错误: 未指定要转换的题库文件！\n')
+        parser.print_help()
+        return
+
+    convert_files(files_to_process, args, cache_dir)
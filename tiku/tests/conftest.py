@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+测试共用的夹具
+
+题库由 benchmarks/make_corpus.py 按固定种子生成，每个版式 40 道题，整个测试会话只生成一次。
+"""
+
+import io
+import os
+import sys
+import shutil
+import contextlib
+
+import pytest
+from openpyxl import load_workbook
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+TIKU_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, TIKU_DIR)
+sys.path.insert(0, os.path.join(TIKU_DIR, 'benchmarks'))
+
+import convert_core  # noqa: E402
+import make_corpus  # noqa: E402
+
+CORPUS_ARGS = ['-n', '40', '--seed', '7']
+
+
+@pytest.fixture(scope='session')
+def corpus(tmp_path_factory):
+    """{版式名称: 题库文件路径}"""
+    output_dir = tmp_path_factory.mktemp('corpus')
+    config = make_corpus.create_argument_parser().parse_args(CORPUS_ARGS)
+    return {layout: make_corpus.generate_layout(layout, str(output_dir), config)[0]
+            for layout in make_corpus.LAYOUTS}
+
+
+def parse_quietly(file_path):
+    """用 get_parser_for_file 选出的解析器解析文件，不打印进度"""
+    parser_func = convert_core.get_parser_for_file(file_path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parser_func(file_path)
+
+
+def as_records(questions):
+    """题目转成可与 JSON 比较的字典：Question.items() 的字段，填空题答案为列表"""
+    records = []
+    for q in questions:
+        record = dict(q.items())
+        if 'answers' in record:
+            record['answers'] = list(record['answers'])
+        records.append(record)
+    return records
+
+
+def question_state(q):
+    """题目全部字段（含来源工作表和行号）的元组，用于逐字段比较"""
+    return tuple(getattr(q, name) for name in convert_core.Question.__slots__)
+
+
+@pytest.fixture
+def run_convert(monkeypatch, capsys, tmp_path):
+    """以命令行参数运行转换，返回打印的输出；--cache 时缓存放在本测试的临时目录中"""
+    monkeypatch.setenv('TIKU_CACHE_DIR', str(tmp_path / 'cache'))
+
+    def run(*argv):
+        monkeypatch.setattr(sys, 'argv', ['convert', *argv])
+        capsys.readouterr()
+        convert_core.main('convert', '题库转换测试')
+        return capsys.readouterr().out
+    return run
+
+
+def copy_input(corpus, layout, directory, name=None):
+    """复制生成的题库作为输入；不指定 name 时保留原文件名（部分版式按文件名选择解析器）"""
+    os.makedirs(directory, exist_ok=True)
+    file_name = os.path.basename(corpus[layout])
+    if name:
+        file_name = name + os.path.splitext(file_name)[1]
+    return shutil.copy(corpus[layout], os.path.join(directory, file_name))
+
+
+def output_name(source, suffix, extension):
+    return os.path.splitext(os.path.basename(source))[0] + suffix + extension
+
+
+def output_dir(tmp_path, name):
+    path = tmp_path / name
+    path.mkdir()
+    return str(path)
+
+
+def read_bank(path):
+    return [question_state(q) for q in convert_core.parse_question_bank(path)]
+
+
+def read_rows(path):
+    """工作表各行的值，去掉只读模式按表格尺寸补齐的行尾空单元格"""
+    rows = []
+    for row in load_workbook(path, read_only=True).active.iter_rows(values_only=True):
+        row = list(row)
+        while row and row[-1] is None:
+            row.pop()
+        rows.append(row)
+    return rows
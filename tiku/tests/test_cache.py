@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""解析结果缓存：默认不启用，命中时输出不变，部分解析不缓存，损坏时重新解析"""
+
+import os
+
+import pytest
+
+import convert_core
+from conftest import parse_quietly, question_state, copy_input, output_dir, output_name, read_bank, read_rows
+
+
+def convert_twice(run_convert, tmp_path, source, *options):
+    """用同一缓存转换两次，返回两次的输出"""
+    logs = []
+    for name in ('first', 'second'):
+        out = output_dir(tmp_path, name)
+        logs.append(run_convert('-t', 'tqb', '-o', out, *options, source))
+    return logs
+
+
+def test_cache_off_by_default(run_convert, corpus, tmp_path):
+    source = copy_input(corpus, 'txt', tmp_path / 'in', 'a')
+    logs = convert_twice(run_convert, tmp_path, source)
+    assert logs[0] == logs[1].replace(os.path.join(str(tmp_path), 'second'), os.path.join(str(tmp_path), 'first'))
+    assert '缓存' not in logs[1]
+    assert not os.path.exists(tmp_path / 'cache')
+
+
+@pytest.mark.parametrize('layout', ['summary', 'txt', 'doc'])
+def test_cache_hit_gives_same_output(run_convert, corpus, tmp_path, layout):
+    source = copy_input(corpus, layout, tmp_path / 'in')
+    outputs = []
+    for name, options in (('plain', []), ('first', ['--cache']), ('cached', ['--cache'])):
+        out = output_dir(tmp_path, name)
+        log = run_convert('-t', 'tqb,shuatidadang', '-o', out, *options, source)
+        assert ('使用解析缓存' in log) == (name == 'cached')
+        outputs.append((read_bank(os.path.join(out, output_name(source, '_解析', '.tqb'))),
+                        read_rows(os.path.join(out, output_name(source, '_刷题搭档', '.xlsx')))))
+    assert outputs[0] == outputs[1] == outputs[2]
+    assert os.listdir(tmp_path / 'cache' / 'parsed')
+
+
+def test_cache_dir_enables_cache(run_convert, corpus, tmp_path):
+    source = copy_input(corpus, 'txt', tmp_path / 'in', 'a')
+    cache_dir = str(tmp_path / 'elsewhere')
+    logs = convert_twice(run_convert, tmp_path, source, '--cache-dir', cache_dir)
+    assert '使用解析缓存' in logs[1]
+    assert os.listdir(os.path.join(cache_dir, 'parsed'))
+    assert '使用解析缓存' not in run_convert('-t', 'tqb', '-o', str(tmp_path / 'first'),
+                                            '--cache-dir', cache_dir, '--no-cache', source)
+
+
+def test_unchanged_output_skipped(run_convert, corpus, tmp_path):
+    source = copy_input(corpus, 'txt', tmp_path / 'in', 'a')
+    out = output_dir(tmp_path, 'out')
+    run_convert('-o', out, '--cache', source)
+    assert '输出未变化，跳过' in run_convert('-o', out, '--cache', source)
+    os.remove(os.path.join(out, 'a_磨题帮.xlsx'))
+    assert '输出未变化' not in run_convert('-o', out, '--cache', source)
+
+
+def test_cache_invalidated_when_file_changes(run_convert, corpus, tmp_path):
+    source = copy_input(corpus, 'txt', tmp_path / 'in', 'a')
+    out = output_dir(tmp_path, 'out')
+    run_convert('-t', 'tqb', '-o', out, '--cache', source)
+    with open(source, 'a', encoding='utf-8') as f:
+        f.write('\n99. 新增的判断题。（√）\n')
+    log = run_convert('-t', 'tqb', '-o', out, '--cache', source)
+    assert '使用解析缓存' not in log
+    assert convert_core.parse_question_bank(os.path.join(out, 'a_解析.tqb'))[-1].question.startswith('新增的判断题')
+
+
+def test_corrupt_entry_falls_back_to_parsing(run_convert, corpus, tmp_path):
+    source = copy_input(corpus, 'summary', tmp_path / 'in')
+    expected_name = output_name(source, '_解析', '.tqb')
+    first, second = convert_twice(run_convert, tmp_path, source, '--cache')
+    expected = read_bank(os.path.join(tmp_path, 'first', expected_name))
+
+    # 把中间一道题的题干改成非法 UTF-8：文件头和列目录完好，读到这道题时才出错
+    parsed_dir = tmp_path / 'cache' / 'parsed'
+    entry, = parsed_dir.iterdir()
+    data = entry.read_bytes()
+    middle = convert_core.parse_question_bank(str(entry))[20].question.encode('utf-8')
+    assert data.count(middle) == 1
+    entry.write_bytes(data.replace(middle, b'\xff' + middle[1:]))
+
+    out = output_dir(tmp_path, 'after')
+    log = run_convert('-t', 'tqb', '-o', out, '--cache', source)
+    assert '使用解析缓存' in log and '解析缓存已损坏，重新解析' in log
+    assert '处理失败' not in log
+    assert read_bank(os.path.join(out, expected_name)) == expected
+    # 重新解析时重新写入了完好的缓存
+    assert read_bank(str(entry)) == [question_state(q) for q in parse_quietly(source)]
+
+
+def test_partial_parse_is_not_cached(tmp_path, capsys):
+    cache_dir = str(tmp_path)
+    questions = [convert_core.Question(f'第{i}题', '简答题', answer='略') for i in range(3)]
+
+    def failing_parse():
+        yield from questions[:2]
+        convert_core.report_parse_error('读取文本文件出错: 测试')
+        yield questions[2]
+
+    assert list(convert_core.iter_caching_questions(failing_parse(), cache_dir, 'partial')) == questions
+    assert convert_core.open_cached_questions(cache_dir, 'partial') is None
+
+    # 提前终止遍历同样不留下缓存
+    consumed = convert_core.iter_caching_questions(iter(questions), cache_dir, 'stopped')
+    next(consumed)
+    consumed.close()
+    assert convert_core.open_cached_questions(cache_dir, 'stopped') is None
+
+    assert list(convert_core.iter_caching_questions(iter(questions), cache_dir, 'complete')) == questions
+    assert list(convert_core.open_cached_questions(cache_dir, 'complete')) == questions
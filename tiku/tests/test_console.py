@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+控制台输出与基线脚本逐字节相同
+
+data/motibang_console.txt 是基线提交（de25425）的 convert_all_questions_motibang.py
+转换生成题库中 mid、summary、xlsx、crh6、docx 五个版式时打印的内容，"已保存到" 中去掉了输出目录。
+基线读不对生成的 txt 和 doc（见 test_parsers.py），这两个版式不在其中
+"""
+
+import os
+import sys
+
+import convert_all_questions_motibang
+from conftest import TESTS_DIR, copy_input, output_dir
+
+CONSOLE_LAYOUTS = ('mid', 'summary', 'xlsx', 'crh6', 'docx')
+
+
+def run_script(script, monkeypatch, capsys, *argv):
+    monkeypatch.setattr(sys, 'argv', [script.__name__ + '.py', *argv])
+    capsys.readouterr()
+    script.main()
+    return capsys.readouterr().out
+
+
+def test_motibang_console_matches_baseline(corpus, tmp_path, monkeypatch, capsys):
+    files = [copy_input(corpus, layout, tmp_path / 'in') for layout in CONSOLE_LAYOUTS]
+    out = output_dir(tmp_path, 'out')
+    log = run_script(convert_all_questions_motibang, monkeypatch, capsys, '-o', out, *files)
+    with open(os.path.join(TESTS_DIR, 'data', 'motibang_console.txt'), encoding='utf-8') as f:
+        assert log.replace(out + os.sep, '') == f.read()
+
+
+def test_motibang_reports_fill_in_questions_as_fill_in(tmp_path, monkeypatch, capsys):
+    source = tmp_path / '填空.txt'
+    source.write_text('1. 制动缸活塞行程为____毫米。\n答案：（115）\n'
+                      '2. 制动缸活塞行程为____毫米。\n答案：（115）\n', encoding='utf-8')
+    out = output_dir(tmp_path, 'out')
+    log = run_script(convert_all_questions_motibang, monkeypatch, capsys, '-o', out, str(source))
+    assert '↳ 第2题 [填空题] 与 第1题 重复' in log
+    assert '  - 填空题: 1\n' in log
+    assert '定序填空题' not in log
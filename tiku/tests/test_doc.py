@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+.doc 正文读取
+
+data/题库.doc 只用全角分隔符（基线的文字白名单不含半角 "."），基线解析器能正确读出；
+data/题库.doc.json 是基线提交（de25425）中 convert_all_questions_shuatidadang.py 的
+parse_doc_file 在该文件上的输出
+"""
+
+import os
+import json
+import random
+
+import olefile
+import pytest
+
+import convert_core
+from conftest import TESTS_DIR, parse_quietly, as_records
+
+BASELINE_DOC = os.path.join(TESTS_DIR, 'data', '题库.doc')
+
+
+def test_matches_baseline_parser():
+    with open(BASELINE_DOC + '.json', encoding='utf-8') as f:
+        expected = json.load(f)
+    assert as_records(parse_quietly(BASELINE_DOC)) == expected
+
+
+@pytest.mark.parametrize('path', ['baseline', 'corpus'])
+def test_sector_reads_match_openstream(corpus, path):
+    path = BASELINE_DOC if path == 'baseline' else corpus['doc']
+    ole = olefile.OleFileIO(path)
+    try:
+        data = ole.openstream('WordDocument').read()
+        reader = convert_core._OleStreamReader(ole, 'WordDocument')
+        assert reader._data is None and reader.size == len(data)
+        r = random.Random(1)
+        for _ in range(200):
+            offset = r.randrange(len(data) + 100)
+            length = r.choice((1, 2, 511, 512, 4096, 10000, len(data)))
+            assert reader.read(offset, length) == data[offset:offset + length]
+    finally:
+        ole.close()
+
+
+def test_other_olefile_versions_read_whole_stream(corpus, monkeypatch):
+    expected = as_records(parse_quietly(corpus['doc']))
+    monkeypatch.setattr(olefile, '__version__', '0.48')
+    ole = olefile.OleFileIO(corpus['doc'])
+    try:
+        assert convert_core._OleStreamReader(ole, 'WordDocument')._data is not None
+    finally:
+        ole.close()
+    assert as_records(parse_quietly(corpus['doc'])) == expected
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""--external-dedup：结果与内存去重相同，题目不整体驻留内存"""
+
+import os
+import tracemalloc
+
+import pytest
+
+import make_corpus
+import convert_core
+from convert_core import Question, deduplicate_questions, deduplicate_questions_external
+from conftest import parse_quietly, question_state, copy_input, output_dir, read_bank
+
+
+@pytest.mark.parametrize('layout', list(make_corpus.LAYOUTS))
+def test_same_result_as_in_memory_dedup(corpus, tmp_path, layout):
+    questions = parse_quietly(corpus[layout])
+    # 重复一遍，保证每个版式都有重复题
+    questions = questions + questions[::3]
+    expected, removed, details = deduplicate_questions(questions)
+    unique, external_removed, external_details = deduplicate_questions_external(
+        questions, run_records=7, tmp_dir=str(tmp_path))
+    assert [question_state(q) for q in unique] == [question_state(q) for q in expected]
+    assert (external_removed, external_details) == (removed, details)
+    # 顺串和暂存文件都已删除
+    assert os.listdir(tmp_path) == []
+
+
+def make_questions(count):
+    """逐题生成，最后 50 道与前面的题目重复"""
+    for i in range(count):
+        n = i % (count - 50)
+        yield Question(f'第{n}题 制动缸活塞行程超过规定值时应如何调整（ ）', '单选题',
+                       options={'A': f'选项{n}甲', 'B': f'选项{n}乙', 'C': '调整', 'D': '更换'},
+                       answer='A', source='题库', sheet='选择题', row=i + 2)
+
+
+def traced_peak(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_questions_not_held_in_memory():
+    count = 10000
+    corpus_size = traced_peak(lambda: list(make_questions(count)))
+
+    details = []
+    kept = []
+
+    def dedup():
+        kept.append(sum(1 for _ in convert_core.iter_unique_questions_external(
+            make_questions(count), details, run_records=1000)))
+
+    # 逐题生成、逐题消费时，峰值远小于把全部题目放进列表
+    assert traced_peak(dedup) < corpus_size / 2
+    assert kept == [count - 50] and len(details) == 50
+
+
+def test_cli_output_matches_in_memory_dedup(run_convert, corpus, tmp_path):
+    source = copy_input(corpus, 'txt', tmp_path / 'in', 'a')
+    source_copy = copy_input(corpus, 'txt', tmp_path / 'in', 'b')
+    with open(source, 'a', encoding='utf-8') as f, open(source_copy, encoding='utf-8') as g:
+        f.write('\n' + g.read())
+
+    logs = []
+    for name, options in (('memory', []), ('external', ['--external-dedup', '5'])):
+        out = output_dir(tmp_path, name)
+        logs.append((run_convert('-t', 'tqb', '-o', out, *options, source),
+                     read_bank(os.path.join(out, 'a_解析.tqb'))))
+    (memory_log, memory_bank), (external_log, external_bank) = logs
+    assert external_bank == memory_bank
+    assert external_log.replace(os.path.join(tmp_path, 'external'), '') == \
+        memory_log.replace(os.path.join(tmp_path, 'memory'), '')
+    assert '去除重复题目' in external_log
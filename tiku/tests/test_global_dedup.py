@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""--global-dedup：跨文件去重，后面文件中与前面文件重复的题目不再输出"""
+
+import os
+import re
+
+import convert_core
+from conftest import copy_input, output_dir, read_bank, parse_quietly, question_state
+
+
+def test_global_dedup_skips_fully_duplicated_file(run_convert, corpus, tmp_path):
+    first = copy_input(corpus, 'xlsx', tmp_path / 'in', 'a')
+    second = copy_input(corpus, 'xlsx', tmp_path / 'in', 'b')
+    alone = output_dir(tmp_path, 'alone')
+    run_convert('-t', 'tqb', '-o', alone, first)
+
+    out = output_dir(tmp_path, 'out')
+    log = run_convert('-t', 'tqb', '--global-dedup', '-o', out, first, second)
+    assert sorted(os.listdir(out)) == ['a_解析.tqb']
+    assert '处理失败' not in log
+    assert re.search(r'○ 全部为重复题，未输出 \(1 个\):\n  - .*b\.xlsx', log)
+    # 第一个文件的输出与单独转换时相同
+    assert read_bank(os.path.join(out, 'a_解析.tqb')) == read_bank(os.path.join(alone, 'a_解析.tqb'))
+
+
+def test_global_dedup_across_layouts(run_convert, corpus, tmp_path):
+    # 同一批题目写成不同版式时互不重复，各自输出
+    files = [copy_input(corpus, layout, tmp_path / 'in', layout) for layout in ('txt', 'docx')]
+    out = output_dir(tmp_path, 'out')
+    log = run_convert('-t', 'tqb', '--global-dedup', '-o', out, *files)
+    assert sorted(os.listdir(out)) == ['docx_解析.tqb', 'txt_解析.tqb']
+    assert '处理失败' not in log and '全部为重复题' not in log
+
+
+def test_global_dedup_keeps_new_questions_of_overlapping_file(run_convert, corpus, tmp_path):
+    questions = parse_quietly(corpus['txt'])
+    (tmp_path / 'in').mkdir()
+    first, second = str(tmp_path / 'in' / 'a.tqb'), str(tmp_path / 'in' / 'b.tqb')
+    convert_core.write_question_bank(questions[:20], first)
+    convert_core.write_question_bank(questions[10:30], second)
+
+    out = output_dir(tmp_path, 'out')
+    log = run_convert('-t', 'tqb', '--global-dedup', '-o', out, first, second)
+    assert '处理失败' not in log
+    # 应保留的是两个文件合起来去重后，第二个文件新增的题目
+    first_unique, _, _ = convert_core.deduplicate_questions(questions[:20])
+    all_unique, _, _ = convert_core.deduplicate_questions(questions[:20] + questions[10:30])
+    kept = [question_state(q)[:4] for q in all_unique[len(first_unique):]]
+    assert kept
+    assert [state[:4] for state in read_bank(os.path.join(out, 'b_解析.tqb'))] == kept
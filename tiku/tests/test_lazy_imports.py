@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""格式库按需导入：启动、--help 和纯文本题库不加载 openpyxl、lxml、olefile 和进程池"""
+
+import pytest
+
+import bench_import
+from conftest import copy_input, output_dir
+
+
+def loaded_modules(argv):
+    _, loaded = bench_import.run_child(argv, eager=False)
+    return loaded
+
+
+@pytest.mark.parametrize('argv', [None, ['convert', '--version'], ['convert', '--help']])
+def test_startup_loads_no_format_library(argv):
+    assert loaded_modules(argv) == []
+
+
+def test_text_bank_loads_no_format_library(corpus, tmp_path):
+    source = copy_input(corpus, 'txt', tmp_path / 'in')
+    out = output_dir(tmp_path, 'out')
+    assert loaded_modules(['convert', '--dry-run', source]) == []
+    assert loaded_modules(['convert', '-t', 'tqb', '-o', out, source]) == []
+
+
+def test_formats_load_their_library_on_first_use(corpus, tmp_path):
+    out = output_dir(tmp_path, 'out')
+    # openpyxl 安装了 lxml 时自己会导入它
+    loaded = loaded_modules(['convert', '--dry-run', copy_input(corpus, 'xlsx', tmp_path / 'in')])
+    assert 'openpyxl' in loaded and 'olefile' not in loaded
+    assert loaded_modules(['convert', '--dry-run', copy_input(corpus, 'doc', tmp_path / 'in')]) == ['olefile']
+    assert 'openpyxl' in loaded_modules(['convert', '-o', out, copy_input(corpus, 'txt', tmp_path / 'in')])
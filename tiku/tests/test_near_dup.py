@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""近似重复检测：只差一个字、标点或选项顺序的题目归为一簇，不同题目不合并"""
+
+import random
+
+import make_corpus
+import convert_core
+from convert_core import Question, find_near_duplicates, deduplicate_questions, near_dup_canonical
+from conftest import parse_quietly, copy_input, output_dir
+
+
+def test_one_character_edit_clustered():
+    questions = [
+        Question('列车制动系统日常检修时应检查制动缸活塞行程', '判断题', answer='对'),
+        Question('轴承温度超过规定值时必须立即停车检查处理', '判断题', answer='对'),
+        Question('列车制动系统日常检修时应检查制动缸活塞形程', '判断题', answer='对'),
+    ]
+    assert find_near_duplicates(questions) == [[0, 2]]
+
+
+def test_reordered_options_and_punctuation_clustered():
+    questions = [
+        Question('受电弓升弓后应检查的项目是（ ）', '单选题',
+                 options={'A': '滑板磨耗', 'B': '弓头高度', 'C': '气囊压力'}, answer='B'),
+        Question('轴承温度超过规定值时应如何处理（ ）', '单选题',
+                 options={'A': '继续运行', 'B': '停车检查'}, answer='B'),
+        Question('受电弓升弓后，应检查的项目是( )', '单选题',
+                 options={'A': '气囊压力', 'B': '滑板磨耗', 'C': '弓头高度'}, answer='C'),
+    ]
+    assert find_near_duplicates(questions, threshold=0.95) == [[0, 2]]
+
+
+def test_generated_corpus_variants(corpus):
+    """生成题库中每道题改一个字后都能与原题归为一簇，原来的不同题目之间不合并"""
+    rng = random.Random(7)
+    originals = []
+    for layout in make_corpus.LAYOUTS:
+        originals.extend(deduplicate_questions(parse_quietly(corpus[layout]))[0])
+    originals = list({near_dup_canonical(q): q for q in originals if len(q.question) >= 15}.values())
+    assert find_near_duplicates(originals) == []
+
+    variants = []
+    for q in originals:
+        i = rng.randrange(2, len(q.question) - 2)
+        variants.append(Question(q.question[:i] + ('甲' if q.question[i] != '甲' else '乙') + q.question[i + 1:],
+                                 q.type, options=q.option_items() or None, answer=q.answer, answers=q.answers))
+    clusters = find_near_duplicates(originals + variants)
+    found = {tuple(cluster) for cluster in clusters}
+    assert all(len(cluster) == 2 for cluster in clusters)
+    recall = sum((i, i + len(originals)) in found for i in range(len(originals))) / len(originals)
+    assert recall >= 0.9
+
+
+def test_cli_drops_one_character_variant(run_convert, tmp_path):
+    source = tmp_path / 'in' / '题库.txt'
+    source.parent.mkdir()
+    source.write_text('1. 列车制动系统日常检修时应检查制动缸活塞行程。（√）\n'
+                      '2. 轴承温度超过规定值时必须立即停车检查处理。（√）\n'
+                      '3. 列车制动系统日常检修时应检查制动缸活塞形程。（√）\n', encoding='utf-8')
+    out = output_dir(tmp_path, 'out')
+    log = run_convert('-t', 'tqb', '--near-dup', '--near-dup-drop', '-o', out, str(source))
+    assert f'近似重复: 1 组，共 2 道题（相似度 ≥ {convert_core.DEFAULT_NEAR_DUP_THRESHOLD}）' in log
+    assert '] 第1题、第3题: "列车制动系统日常检修时应检查制动缸活塞行程' in log
+    assert '去除近似重复题目: 1 道，剩余 2 道' in log
+    assert len(convert_core.parse_question_bank(str(tmp_path / 'out' / '题库_解析.tqb'))) == 2
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+normalize_text 的查表转换与 NFKC 规范化的对照
+
+normalize_text 不调用 unicodedata，只用预先生成的 str.translate 表转换全角字母、数字、
+全角空格和几个常用全角标点。这里检查表中每个字符的转换结果都与 NFKC 相同，
+近似重复比较用的规范文本在整个全角 ASCII 区（U+FF01-U+FF5E）和全角空格上也与先做 NFKC 的结果相同
+"""
+
+import unicodedata
+
+import pytest
+
+import convert_core
+from convert_core import normalize_text
+
+MAPPED = [chr(code) for code, value in enumerate(convert_core._FULLWIDTH_TABLE) if value != chr(code)]
+FULLWIDTH_ASCII = [chr(code) for code in range(0xFF01, 0xFF5F)] + ['　']
+
+
+def nfkc(text):
+    return unicodedata.normalize('NFKC', text)
+
+
+def test_table_covers_letters_digits_and_space():
+    assert len(MAPPED) == 26 * 2 + 10 + 1 + 6
+
+
+@pytest.mark.parametrize('char', MAPPED, ids=lambda c: f'U+{ord(c):04X}')
+def test_mapped_characters_match_nfkc(char):
+    assert normalize_text(char) == nfkc(char)
+    assert convert_core._FULLWIDTH_RE.fullmatch(char)
+
+
+def test_other_characters_unchanged():
+    text = '轴承温度超过（　）℃时，应停车检查。答案：Ａ＋Ｂ！'
+    expected = ''.join(nfkc(c) if c in MAPPED else c for c in text)
+    assert normalize_text(text) == expected
+    assert normalize_text(expected) == expected
+
+
+@pytest.mark.parametrize('char', FULLWIDTH_ASCII, ids=lambda c: f'U+{ord(c):04X}')
+def test_near_dup_canonical_matches_nfkc(char):
+    text = f'第{char}题Ab{char}'
+    assert convert_core._near_dup_clean(text) == convert_core._NEAR_DUP_STRIP_RE.sub('', nfkc(text).lower())
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+各解析器在生成题库上的输出与改动前的基线一致
+
+data/<版式>.json 是基线提交（de25425）中 convert_all_questions_shuatidadang.py 的解析器
+在 conftest.CORPUS_ARGS 生成的题库上的输出，有两处例外：
+- txt：基线只用文件前 8KB 检测编码，多字节字符被截断时会误判为 utf-16，
+  生成该文件时把编码固定为 utf-8，解析逻辑仍是基线的
+- doc：基线的文字白名单不含半角 "."，用 "." 作题号、选项分隔符的题目被拆散或丢失，
+  不能作为对照；该文件记录的是按 FIB 片段表读取正文后的输出，只用于发现回归，
+  与基线的对照见 test_doc.py
+"""
+
+import os
+import json
+
+import pytest
+
+import make_corpus
+from conftest import TESTS_DIR, parse_quietly, as_records
+
+
+def load_golden(layout):
+    with open(os.path.join(TESTS_DIR, 'data', f'{layout}.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize('layout', list(make_corpus.LAYOUTS))
+def test_parser_matches_baseline(corpus, layout):
+    assert as_records(parse_quietly(corpus[layout])) == load_golden(layout)
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""--profile：各文件各阶段的耗时写入转换报告和 JSON 指标文件，不影响输出"""
+
+import os
+import json
+
+import convert_core
+from conftest import copy_input, output_dir, read_bank
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_profile_json_lists_stages_per_file(run_convert, corpus, tmp_path):
+    files = [copy_input(corpus, layout, tmp_path / 'in') for layout in ('txt', 'xlsx')]
+    out = output_dir(tmp_path, 'out')
+    report_path = str(tmp_path / '剖析.json')
+    log = run_convert('-t', 'tqb', '--profile', report_path, '-o', out, *files)
+
+    assert '⏱ 性能剖析' in log and '各阶段合计' in log
+    report = load_report(report_path)
+    assert report['targets'] == ['tqb'] and report['jobs'] == 1
+    assert [entry['file'] for entry in report['files']] == files
+    assert report['questions'] == sum(entry['questions'] for entry in report['files'])
+    for entry in report['files']:
+        assert entry['questions'] > 0 and entry['wall'] > 0
+        assert list(entry['stages']) == ['parse', 'validate', 'dedup', 'write', 'save']
+        stage_wall = sum(stage['wall'] for stage in entry['stages'].values())
+        # 各阶段扣除了上游的耗时，合计不超过整个文件的耗时
+        assert stage_wall <= entry['wall'] + 1e-3
+        assert entry['cprofile'] is None and entry['memory'] is None
+
+
+def test_profile_does_not_change_output(run_convert, corpus, tmp_path):
+    source = copy_input(corpus, 'docx', tmp_path / 'in', 'a')
+    plain, profiled = output_dir(tmp_path, 'plain'), output_dir(tmp_path, 'profiled')
+    run_convert('-t', 'tqb', '-o', plain, source)
+    run_convert('-t', 'tqb', '--profile', str(tmp_path / 'p.json'), '--near-dup', '-o', profiled, source)
+    assert read_bank(os.path.join(profiled, 'a_解析.tqb')) == read_bank(os.path.join(plain, 'a_解析.tqb'))
+    stages = load_report(str(tmp_path / 'p.json'))['files'][0]['stages']
+    assert 'near_dup' in stages and set(stages) <= set(convert_core.PROFILE_STAGES)
+
+
+def test_profile_dump_keeps_slowest(run_convert, corpus, tmp_path, monkeypatch):
+    files = [copy_input(corpus, layout, tmp_path / 'in') for layout in ('txt', 'docx', 'mid')]
+    monkeypatch.chdir(tmp_path)
+    dump = tmp_path / 'prof'
+    run_convert('-t', 'tqb', '--profile-dump', str(dump), '--profile-top', '2',
+                '-o', output_dir(tmp_path, 'out'), *files)
+
+    # 只给 --profile-dump 时默认写出 convert_profile.json
+    report = load_report(str(tmp_path / convert_core.DEFAULT_PROFILE_JSON))
+    kept = [entry for entry in report['files'] if entry['cprofile']]
+    assert len(kept) == 2
+    assert sorted(os.listdir(dump)) == sorted(os.path.basename(entry['cprofile']) for entry in kept)
+    slowest = sorted(report['files'], key=lambda entry: entry['wall'], reverse=True)[:2]
+    assert [entry['file'] for entry in kept] == [entry['file'] for entry in report['files'] if entry in slowest]
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""--profile-memory：各文件的峰值内存、各代码段峰值和堆占用最高时各阶段的分配位置"""
+
+import os
+import json
+import tracemalloc
+
+import convert_core
+from conftest import copy_input, output_dir, read_bank
+
+
+def test_profile_memory_report(run_convert, corpus, tmp_path, monkeypatch):
+    source = copy_input(corpus, 'txt', tmp_path / 'in', 'a')
+    monkeypatch.chdir(tmp_path)
+    out = output_dir(tmp_path, 'out')
+    log = run_convert('-t', 'tqb', '--profile-memory', '-o', out, source)
+
+    assert '内存: 峰值RSS' in log and '内存峰值最高: a.txt' in log
+    # 统计结束后不再跟踪分配
+    assert not tracemalloc.is_tracing()
+    # --profile-memory 隐含 --profile，写出默认的 JSON 指标文件
+    with open(tmp_path / convert_core.DEFAULT_PROFILE_JSON, encoding='utf-8') as f:
+        entry, = json.load(f)['files']
+    memory = entry['memory']
+    assert memory['peak_heap_mb'] > 0
+    assert list(memory['segments']) == ['write', 'save']
+    assert all(segment['heap_mb'] <= memory['peak_heap_mb'] for segment in memory['segments'].values())
+    assert {'parse', 'write'} <= set(memory['stages']) <= set(convert_core.MEMORY_STAGES)
+    assert all(stage['top'] for stage in memory['stages'].values() if stage['mb'] > 0)
+
+
+def test_profile_memory_does_not_change_output(run_convert, corpus, tmp_path, monkeypatch):
+    source = copy_input(corpus, 'txt', tmp_path / 'in', 'a')
+    monkeypatch.chdir(tmp_path)
+    plain, measured = output_dir(tmp_path, 'plain'), output_dir(tmp_path, 'measured')
+    run_convert('-t', 'tqb', '-o', plain, source)
+    run_convert('-t', 'tqb', '--profile-memory', '--near-dup', '-o', measured, source)
+    assert read_bank(os.path.join(measured, 'a_解析.tqb')) == read_bank(os.path.join(plain, 'a_解析.tqb'))
+    with open(tmp_path / convert_core.DEFAULT_PROFILE_JSON, encoding='utf-8') as f:
+        segments = json.load(f)['files'][0]['memory']['segments']
+    # 近似重复检测要先汇总全部题目，这两段单独记录
+    assert {'collect', 'near_dup'} <= set(segments)
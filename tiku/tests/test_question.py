@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Question 题目记录：与原来的题目字典兼容"""
+
+import pickle
+
+import pytest
+
+from convert_core import Question
+
+
+def make_choice():
+    return Question('制动系统的作用是', '单选题', options={'B': '加速', 'A': '减速'}, answer='A', source='题库')
+
+
+def test_dict_compatibility():
+    q = make_choice()
+    assert q['question'] == '制动系统的作用是'
+    assert q.get('difficulty', '无') == '无'
+    assert 'answers' not in q and 'answer' in q
+    assert dict(q) == {'question': '制动系统的作用是', 'type': '单选题',
+                       'options': {'A': '减速', 'B': '加速'}, 'answer': 'A', 'source': '题库'}
+    assert q == dict(q.items())
+    with pytest.raises(KeyError):
+        q['difficulty']
+    with pytest.raises(KeyError):
+        q['unknown'] = 1
+
+
+def test_options_mutation_fails_loudly():
+    q = make_choice()
+    with pytest.raises(TypeError):
+        q['options']['C'] = '保持'
+    with pytest.raises(TypeError):
+        del q.get('options')['A']
+    assert q['options'] == {'A': '减速', 'B': '加速'}
+
+    q['options'] = {**q['options'], 'C': '保持'}
+    assert q['options'] == {'A': '减速', 'B': '加速', 'C': '保持'}
+    assert q.option_items() == (('A', '减速'), ('B', '加速'), ('C', '保持'))
+
+
+def test_fill_answers_and_pickle():
+    q = Question('车辆____检修', '填空题', answers=['定期'], source='题库')
+    q['answers'] = ['日常', '定期']
+    assert q['answers'] == ('日常', '定期')
+    for question in (q, make_choice()):
+        restored = pickle.loads(pickle.dumps(question))
+        assert restored == question and restored.option_items() == question.option_items()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+""".tqb 中间文件写出后读回的题目与写出前逐字段相同"""
+
+import io
+import contextlib
+
+import pytest
+
+import make_corpus
+from convert_core import QuestionBank, write_question_bank, parse_question_bank
+from conftest import parse_quietly, as_records, question_state
+
+
+def write_quietly(questions, path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return write_question_bank(questions, str(path))
+
+
+@pytest.mark.parametrize('layout', list(make_corpus.LAYOUTS))
+def test_round_trip(corpus, tmp_path, layout):
+    questions = parse_quietly(corpus[layout])
+    path = tmp_path / 'bank.tqb'
+    assert write_quietly(questions, path) == len(questions)
+
+    expected = [question_state(q) for q in questions]
+    assert [question_state(q) for q in parse_question_bank(str(path))] == expected
+
+    # 随机访问、负数下标、切片和按列读取与顺序读取一致
+    with QuestionBank(str(path)) as bank:
+        assert len(bank) == len(questions)
+        assert [question_state(bank[i]) for i in range(len(bank))] == expected
+        assert question_state(bank[-1]) == expected[-1]
+        assert [question_state(q) for q in bank[3:20:4]] == expected[3:20:4]
+        assert list(bank.column('type')) == [q.type for q in questions]
+
+
+def test_round_trip_dict_questions(tmp_path):
+    questions = [
+        {'question': '轴承温度超过（ ）时应停车检查', 'type': '单选题',
+         'options': {'B': '70℃', 'A': '60℃', 'C': '80℃'}, 'answer': 'B', 'source': '练习'},
+        {'question': '制动缸____、____', 'type': '填空题', 'answers': ['活塞', '缸体'], 'difficulty': '中'},
+        {'question': '空字段\ud800', 'type': '简答题', 'answer': '', '_source_sheet': '表1', '_source_row': 7},
+    ]
+    path = tmp_path / 'bank.tqb'
+    write_quietly(questions, path)
+    assert as_records(parse_question_bank(str(path))) == questions
+
+
+def test_empty_bank(tmp_path):
+    path = tmp_path / 'empty.tqb'
+    assert write_quietly([], path) == 0
+    assert parse_question_bank(str(path)) == []
+
+
+def test_rejects_other_files(corpus):
+    with pytest.raises(ValueError):
+        QuestionBank(corpus['txt'])
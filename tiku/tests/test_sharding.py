@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""大文件分片并行解析：结果与串行解析相同，题目随分片结果陆续产出"""
+
+import pytest
+
+import convert_core
+from conftest import as_records
+
+
+@pytest.fixture
+def small_shards(monkeypatch):
+    """把分片下限调小，让生成的小题库也按多个分片解析"""
+    monkeypatch.setattr(convert_core, '_SHARD_MIN_BYTES', 1024)
+
+
+@pytest.fixture
+def counted_map(monkeypatch):
+    """用串行的 map 代替进程池，记录已取走的分片结果数"""
+    consumed = []
+
+    def fake_map_ordered(func, items, workers):
+        for item in items:
+            consumed.append(item)
+            yield func(item)
+
+    monkeypatch.setattr(convert_core, 'map_ordered', fake_map_ordered)
+    return consumed
+
+
+def serial(parser, path):
+    return as_records(parser(path))
+
+
+@pytest.mark.parametrize('layout', ['docx', 'crh6'])
+def test_docx_shards_match_serial(corpus, small_shards, layout):
+    expected = serial(convert_core.parse_generic_docx, corpus[layout])
+    assert expected
+    assert as_records(convert_core.parse_generic_docx(corpus[layout], workers=2)) == expected
+
+
+def test_text_shards_match_serial(corpus, small_shards):
+    expected = serial(convert_core.parse_text_file, corpus['txt'])
+    assert as_records(convert_core.parse_text_file(corpus['txt'], workers=2)) == expected
+
+
+@pytest.mark.parametrize('layout', ['docx', 'crh6'])
+def test_docx_shards_stream(corpus, small_shards, counted_map, layout):
+    questions = convert_core.iter_generic_docx(corpus[layout], workers=2)
+    first = next(questions)
+    seen = len(counted_map)
+    rest = list(questions)
+    assert len(counted_map) > 2 and seen < len(counted_map)
+    assert as_records([first] + rest) == serial(convert_core.parse_generic_docx, corpus[layout])
+
+
+def test_docx_shard_error_falls_back_after_streamed_questions(corpus, small_shards, monkeypatch):
+    from lxml import etree
+    parse_shard = convert_core._parse_docx_shard
+    calls = []
+
+    def failing_parse(xml):
+        calls.append(xml)
+        if len(calls) == 3:
+            raise etree.XMLSyntaxError('分片不完整', None, 1, 1)
+        return parse_shard(xml)
+
+    monkeypatch.setattr(convert_core, '_parse_docx_shard', failing_parse)
+    monkeypatch.setattr(convert_core, 'map_ordered', lambda func, items, workers: map(func, items))
+    expected = serial(convert_core.parse_generic_docx, corpus['docx'])
+    questions = convert_core.iter_generic_docx(corpus['docx'], workers=2)
+    first = next(questions)
+    assert len(calls) < 3
+    rest = list(questions)
+    assert len(calls) == 3
+    assert as_records([first] + rest) == expected
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""拆分输出：--split-by/--max-rows"""
+
+import os
+import re
+
+import pytest
+
+import convert_core
+from convert_core import Question, _PartitionedSink
+from conftest import copy_input, output_dir, output_name, read_bank, read_rows
+
+
+@pytest.mark.parametrize('split, field', [('type', 'type'), ('sheet', '_source_sheet')])
+def test_split_matches_unsplit_output(run_convert, corpus, tmp_path, split, field):
+    source = copy_input(corpus, 'summary', tmp_path / 'in')
+    base = os.path.splitext(os.path.basename(source))[0]
+    full_dir = output_dir(tmp_path, 'full')
+    run_convert('-t', 'tqb', '-o', full_dir, source)
+    full = read_bank(os.path.join(full_dir, output_name(source, '_解析', '.tqb')))
+    index = convert_core.Question.__slots__.index(field)
+
+    split_dir = output_dir(tmp_path, 'split')
+    run_convert('-t', 'tqb', '--split-by', split, '--max-rows', '4', '-o', split_dir, source)
+    names = sorted(os.listdir(split_dir))
+    shards = {}
+    for name in names:
+        match = re.fullmatch(re.escape(base) + r'_解析_(.+)_(\d{3})\.tqb', name)
+        assert match, name
+        shards.setdefault(match.group(1), []).append((int(match.group(2)), name))
+
+    for label, numbered in shards.items():
+        assert [number for number, _ in sorted(numbered)] == list(range(1, len(numbered) + 1))
+        rows = []
+        for _, name in sorted(numbered):
+            shard = read_bank(os.path.join(split_dir, name))
+            assert 0 < len(shard) <= 4
+            rows.extend(shard)
+        # 每个分区按原顺序排列，只含该分区的题目
+        assert rows == [q for q in full if q[index] == label]
+    assert sum(len(read_bank(os.path.join(split_dir, name))) for name in names) == len(full)
+
+    # 再次转换得到相同的文件名
+    again = output_dir(tmp_path, 'again')
+    run_convert('-t', 'tqb', '--split-by', split, '--max-rows', '4', '-o', again, source)
+    assert sorted(os.listdir(again)) == names
+
+
+def test_max_rows_splits_excel_output(run_convert, corpus, tmp_path):
+    source = copy_input(corpus, 'txt', tmp_path / 'in', 'a')
+    full_dir = output_dir(tmp_path, 'full')
+    run_convert('-o', full_dir, source)
+    split_dir = output_dir(tmp_path, 'split')
+    run_convert('--max-rows', '15', '-o', split_dir, source)
+
+    names = sorted(os.listdir(split_dir))
+    assert names == [f'a_磨题帮_{i:03d}.xlsx' for i in range(1, len(names) + 1)]
+    header, *rows = read_rows(os.path.join(full_dir, 'a_磨题帮.xlsx'))
+    shards = [read_rows(os.path.join(split_dir, name)) for name in names]
+    assert all(shard[0] == header and len(shard) <= 16 for shard in shards)
+    assert [row for shard in shards for row in shard[1:]] == rows
+
+
+def test_labels_that_collide_after_sanitizing_get_suffixes(tmp_path):
+    # "a/b" 和 "a b" 替换字符后都是 "a_b"，后出现的加 _2，各分区写进各自的文件
+    sink = _PartitionedSink('tqb', str(tmp_path / '题库_解析'), ('type', None))
+    for q_type in ('a/b', 'a b', 'a/b', '单选题'):
+        sink.append(Question(f'{q_type}的题目', q_type))
+    assert sink.save() == 4
+    assert sink.output_names == ['题库_解析_a_b.tqb', '题库_解析_a_b_2.tqb', '题库_解析_单选题.tqb']
+    assert [q[1] for q in read_bank(str(tmp_path / '题库_解析_a_b.tqb'))] == ['a/b', 'a/b']
+    assert [q[1] for q in read_bank(str(tmp_path / '题库_解析_a_b_2.tqb'))] == ['a b']
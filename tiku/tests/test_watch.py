@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""--watch：只转换题库文件，跳过本工具为其中文件生成的输出"""
+
+import io
+import os
+import shutil
+import contextlib
+
+import pytest
+
+import convert_core
+from convert_core import scan_input_tree
+from conftest import parse_quietly
+
+
+def touch(directory, *names):
+    for name in names:
+        path = os.path.join(directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(name)
+
+
+def scanned(root, *args):
+    return sorted(os.path.relpath(path, root) for path in scan_input_tree(str(root), *args))
+
+
+def test_skips_outputs_of_inputs_in_tree(tmp_path):
+    touch(tmp_path, '题库.xlsx', '题库_磨题帮.xlsx', '题库_刷题搭档.xlsx', '题库_解析.tqb',
+          '~$题库.xlsx', '.隐藏.txt', '说明.pdf', os.path.join('子目录', '练习.txt'),
+          os.path.join('子目录', '练习_磨题帮.xlsx'))
+    assert scanned(tmp_path) == ['子目录/练习.txt', '题库.xlsx']
+
+
+def test_keeps_files_that_only_look_like_outputs(tmp_path):
+    # 没有对应原文件的 *_磨题帮.xlsx 是用户自己的题库；.tqb 中间文件也是输入
+    touch(tmp_path, '成绩_磨题帮.xlsx', '汇总_刷题搭档.xlsx', '导出.tqb', '其他_解析.tqb')
+    assert scanned(tmp_path) == ['其他_解析.tqb', '导出.tqb', '成绩_磨题帮.xlsx', '汇总_刷题搭档.xlsx']
+    # 它们自己的输出被识别出来
+    touch(tmp_path, '成绩_磨题帮_磨题帮.xlsx', '导出_刷题搭档.xlsx', '其他_磨题帮.xlsx')
+    assert scanned(tmp_path) == ['其他_解析.tqb', '导出.tqb', '成绩_磨题帮.xlsx', '汇总_刷题搭档.xlsx']
+
+
+def test_split_shards_and_output_dir(tmp_path):
+    touch(tmp_path, '题库.txt', '题库_磨题帮_单选题_001.xlsx', '题库_磨题帮_002.xlsx', '题库2_磨题帮_001.xlsx')
+    assert scanned(tmp_path, None, ('type', 100)) == ['题库.txt', '题库2_磨题帮_001.xlsx']
+    # 不拆分时分片名不是任何文件的输出
+    assert len(scanned(tmp_path)) == 4
+
+    # 输出目录在别处时，与输入同目录的同名文件不是输出
+    out_dir = str(tmp_path / '输出')
+    touch(tmp_path, os.path.join('输出', '题库_磨题帮.xlsx'))
+    assert '题库_磨题帮_002.xlsx' in scanned(tmp_path, out_dir, ('type', 100))
+    assert '输出/题库_磨题帮.xlsx' not in scanned(tmp_path, out_dir)
+
+
+def test_produced_paths_skipped(tmp_path):
+    touch(tmp_path, '成绩.xlsx')
+    assert scanned(tmp_path, None, None, {str(tmp_path / '成绩.xlsx')}) == []
+
+
+def test_watch_converts_new_files_only(run_convert, corpus, tmp_path, monkeypatch):
+    root = tmp_path / 'watch'
+    root.mkdir()
+    shutil.copy(corpus['txt'], root / '文本.txt')
+    shutil.copy(corpus['xlsx'], root / '练习_磨题帮.xlsx')
+    with contextlib.redirect_stdout(io.StringIO()):
+        convert_core.write_question_bank(parse_quietly(corpus['docx']), str(root / '导出.tqb'))
+
+    steps = iter([
+        lambda: None,
+        lambda: shutil.copy(corpus['txt'], root / '新增.txt'),
+        lambda: None,
+    ])
+
+    def fake_sleep(_):
+        step = next(steps, None)
+        if step is None:
+            raise KeyboardInterrupt
+        step()
+
+    monkeypatch.setattr(convert_core.time, 'sleep', fake_sleep)
+    log = run_convert('--watch', str(root), '--watch-interval', '0', '--watch-debounce', '0')
+
+    startup, _, changed = log.partition('检测到')
+    assert sorted(line for line in startup.splitlines() if line.startswith('处理 ')) == [
+        '处理 导出.tqb...', '处理 文本.txt...', '处理 练习_磨题帮.xlsx...']
+    assert changed.startswith(' 1 个文件变动')
+    assert [line for line in changed.splitlines() if line.startswith('处理 ')] == ['处理 新增.txt...']
+    assert log.rstrip().endswith('停止监视')
+    assert sorted(os.listdir(root)) == ['导出.tqb', '导出_磨题帮.xlsx', '文本.txt', '文本_磨题帮.xlsx',
+                                        '新增.txt', '新增_磨题帮.xlsx', '练习_磨题帮.xlsx',
+                                        '练习_磨题帮_磨题帮.xlsx']
+
+
+@pytest.mark.parametrize('split', [['--split-by', 'type'], ['--max-rows', '10']])
+def test_watch_ignores_split_shards(run_convert, corpus, tmp_path, monkeypatch, split):
+    root = tmp_path / 'watch'
+    root.mkdir()
+    shutil.copy(corpus['txt'], root / '文本.txt')
+    steps = iter([lambda: None, lambda: None])
+
+    def fake_sleep(_):
+        step = next(steps, None)
+        if step is None:
+            raise KeyboardInterrupt
+        step()
+
+    monkeypatch.setattr(convert_core.time, 'sleep', fake_sleep)
+    log = run_convert('--watch', str(root), '--watch-interval', '0', '--watch-debounce', '0', *split)
+    assert '检测到' not in log
+    assert len(os.listdir(root)) > 2